@@ -0,0 +1,360 @@
+import os
+import re
+import socket
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Controladores.Modelos import CambiosTablero, Tablero, TrelloLista, Tarjeta, User
+from Controladores.Directorio_Usuarios import DirectorioUsuarios
+
+# Tarjetas por columna en la carga inicial y en cada página al hacer scroll
+TAM_PAGINA_TARJETAS = 50
+# Cursor de página: (posicion, id) de la primera tarjeta que falta por leer
+CursorPagina = Tuple[float, str]
+# Qué almacén usa la aplicación: "supabase" (por defecto) o "sqlite" para una instalación local
+VARIABLE_ALMACEN = "MINITRELLO_ALMACEN"
+
+
+_controlador: Optional["AlmacenDatos"] = None
+_lock_controlador = threading.Lock()
+
+
+def obtener_controlador() -> "AlmacenDatos":
+    # Un único almacén (y sesión) por proceso, compartido por el login y la ventana principal.
+    # Cada implementación se importa solo si se usa: SQLite no necesita supabase ni red.
+    global _controlador
+    with _lock_controlador:
+        if _controlador is None:
+            if os.environ.get(VARIABLE_ALMACEN, "").lower() == "sqlite":
+                from Controladores.Almacen_SQLite import SQLiteController
+
+                _controlador = SQLiteController()
+            else:
+                from Controladores.Controller_BD import SupabaseController
+
+                _controlador = SupabaseController()
+        return _controlador
+
+
+def cursor_tarjeta(card: Tarjeta) -> CursorPagina:
+    return card.posicion, card.id
+
+
+def parse_supabase_datetime(date_string: str) -> datetime:
+    if not date_string:
+        return datetime.now()
+    try:
+        date_string = date_string.replace("Z", "+00:00")
+        pattern = r"(\.\d+)([+-]\d{2}:\d{2})"
+        match = re.search(pattern, date_string)
+        if match:
+            microseconds = match.group(1)
+            timezone = match.group(2)
+            micros_digits = microseconds[1:]
+            if len(micros_digits) < 6:
+                micros_digits = micros_digits.ljust(6, "0")
+            elif len(micros_digits) > 6:
+                micros_digits = micros_digits[:6]
+            base_date = date_string[: match.start()]
+            date_string = f"{base_date}.{micros_digits}{timezone}"
+        return datetime.fromisoformat(date_string)
+    except Exception:
+        return datetime.now()
+
+
+class AlmacenDatos(ABC):
+    # Lo que la aplicación necesita de un almacén: sesión, tableros, listas, tarjetas,
+    # asignaciones, papelera y sincronización. Los métodos no lanzan: ante un fallo dejan
+    # el error en `ultimo_error` y devuelven False, None o vacío, como SupabaseController.
+    # Las filas (dicts) que devuelven o aceptan tienen las columnas de las tablas del README.
+
+    # True si los datos están en el propio equipo y no hace falta una caché local delante
+    es_local = False
+
+    def __init__(self):
+        self.current_user = None
+        # Último error por hilo, para distinguir "sin datos" de "fallo de red" en las lecturas
+        self._estado_hilo = threading.local()
+        self.usuarios = DirectorioUsuarios(self._leer_usuarios)
+
+    @abstractmethod
+    def disponible(self) -> bool:
+        ...
+
+    @property
+    def ultimo_error(self) -> Optional[Exception]:
+        return getattr(self._estado_hilo, "error", None)
+
+    def limpiar_error(self):
+        self._estado_hilo.error = None
+
+    def _registrar_error(self, mensaje: str, e: Exception):
+        self._estado_hilo.error = e
+        print(f"{mensaje}: {e}")
+
+    def error_de_conexion(self, e: Exception) -> bool:
+        # El error es de red (sin conexión, DNS, timeout) y no una respuesta del servidor:
+        # la misma escritura puede salir bien más tarde
+        return isinstance(e, (ConnectionError, TimeoutError, socket.gaierror))
+
+    def fallo_de_conexion(self) -> bool:
+        # La última operación de este hilo falló por la red
+        e = self.ultimo_error
+        return e is not None and self.error_de_conexion(e)
+
+    # ===== AUTENTICACIÓN =====
+    # Devuelven {"success": bool, "error": str} o {"success": True, "user": ..., "session": ...}
+    @abstractmethod
+    def registrar_usuario(self, email: str, password: str, username: str = None) -> dict:
+        ...
+
+    @abstractmethod
+    def iniciar_sesion(self, email: str, password: str) -> dict:
+        ...
+
+    @abstractmethod
+    def cerrar_sesion(self) -> bool:
+        ...
+
+    @abstractmethod
+    def obtener_usuario_actual(self) -> Optional[User]:
+        ...
+
+    # ===== TABLEROS =====
+    @abstractmethod
+    def obtener_tableros(self) -> List[Tablero]:
+        ...
+
+    @abstractmethod
+    def crear_tablero(self, titulo: str, es_publico: bool = False) -> Optional[Tablero]:
+        ...
+
+    @abstractmethod
+    def eliminar_tablero(self, board_id: str) -> bool:
+        ...
+
+    # ===== LISTAS =====
+    @abstractmethod
+    def obtener_listas(self, board_id: str) -> List[TrelloLista]:
+        # Listas vivas en orden, cada una con su primera página de tarjetas y su total
+        ...
+
+    @abstractmethod
+    def crear_lista(self, board_id: str, titulo: str, posicion: float, list_id: Optional[str] = None) -> Optional[TrelloLista]:
+        ...
+
+    @abstractmethod
+    def eliminar_lista(self, list_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def actualizar_lista(self, list_id: str, titulo: str = None) -> bool:
+        ...
+
+    # ===== TARJETAS =====
+    @abstractmethod
+    def obtener_tarjetas(self, list_id: str) -> List[Tarjeta]:
+        ...
+
+    @abstractmethod
+    def obtener_pagina_tarjetas(
+        self, list_id: str, desde: Optional[CursorPagina] = None
+    ) -> Optional[Tuple[List[Tarjeta], Optional[CursorPagina], Optional[int]]]:
+        # (tarjetas con (posicion, id) >= desde, (posicion, id) de la siguiente o None, total solo
+        # en la primera). Con el id en el cursor no se repite ni se salta ninguna tarjeta aunque
+        # varias compartan posición en la frontera
+        ...
+
+    @abstractmethod
+    def obtener_descripcion_tarjeta(self, card_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def crear_tarjeta(
+        self, list_id: str, titulo: str, descripcion: str, posicion: float, card_id: Optional[str] = None
+    ) -> Optional[Tarjeta]:
+        ...
+
+    @abstractmethod
+    def eliminar_tarjeta(self, card_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def actualizar_tarjeta(self, card_id: str, titulo: str = None, descripcion: str = None) -> bool:
+        ...
+
+    @abstractmethod
+    def actualizar_posicion_tarjeta(self, card_id: str, new_list_id: str, new_position: float) -> bool:
+        ...
+
+    # ===== USUARIOS / ASIGNACIONES =====
+    def obtener_todos_usuarios(self, forzar: bool = False) -> List[User]:
+        # Sale de la caché del directorio; la tabla se lee como mucho una vez por TTL
+        return self.usuarios.todos(forzar)
+
+    def invalidar_usuarios(self):
+        self.usuarios.invalidar()
+
+    @abstractmethod
+    def _leer_usuarios(self) -> Optional[List[User]]:
+        # Todos los usuarios para el directorio; None si falla
+        ...
+
+    def asignar_usuario_tarjeta(self, card_id: str, user_id: str) -> bool:
+        return self.asignar_usuarios([(card_id, user_id)])
+
+    def desasignar_usuario_tarjeta(self, card_id: str, user_id: str) -> bool:
+        return self.desasignar_usuarios([(card_id, user_id)])
+
+    @abstractmethod
+    def asignar_usuarios(self, pares: Iterable[Tuple[str, str]]) -> bool:
+        ...
+
+    @abstractmethod
+    def desasignar_usuarios(self, pares: Iterable[Tuple[str, str]]) -> bool:
+        ...
+
+    def obtener_asignados_tarjeta(self, card_id: str) -> List[User]:
+        return self.obtener_asignados_tarjetas([card_id]).get(card_id, [])
+
+    @abstractmethod
+    def obtener_asignados_tarjetas(self, card_ids: Iterable[str]) -> Dict[str, List[User]]:
+        ...
+
+    # ===== PAPELERA =====
+    @abstractmethod
+    def obtener_papelera(self, board_id: str) -> List[Tarjeta]:
+        ...
+
+    @abstractmethod
+    def restaurar_tarjeta(self, card_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def eliminar_tarjeta_definitivamente(self, card_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def obtener_papelera_tableros(self) -> List[Tablero]:
+        ...
+
+    @abstractmethod
+    def restaurar_tablero(self, board_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def eliminar_tablero_definitivamente(self, board_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def obtener_papelera_listas(self, board_id: str) -> List[TrelloLista]:
+        ...
+
+    @abstractmethod
+    def restaurar_lista(self, list_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def eliminar_lista_definitivamente(self, list_id: str) -> bool:
+        ...
+
+    # ===== SINCRONIZACIÓN =====
+    @abstractmethod
+    def cursor_cambios(self, board_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def obtener_cambios(self, board_id: str, desde: Optional[str]) -> Optional[CambiosTablero]:
+        ...
+
+    # ===== ESCRITURA EN LOTE =====
+    @abstractmethod
+    def guardar_filas(self, tabla: str, filas: List[dict]) -> bool:
+        # Upsert de filas completas; lo usa la cola de escritura diferida
+        ...
+
+    @abstractmethod
+    def obtener_marcas(self, tabla: str, ids: Iterable[str]) -> Optional[Dict[str, str]]:
+        # updated_at de las filas de `tabla` que existen entre `ids`; None si falla
+        ...
+
+    @staticmethod
+    def fila_lista(lista: TrelloLista, eliminada: bool = False) -> dict:
+        return {
+            "id": lista.id,
+            "tablero_id": lista.tablero_id,
+            "titulo": lista.titulo,
+            "posicion": lista.posicion,
+            "eliminada": eliminada,
+        }
+
+    @staticmethod
+    def fila_tarjeta(card: Tarjeta, eliminada: bool = False) -> dict:
+        fila = {
+            "id": card.id,
+            "lista_id": card.lista_id,
+            "titulo": card.titulo,
+            "posicion": card.posicion,
+            "eliminada": eliminada,
+        }
+        # Sin la descripción en memoria no se envía, para no pisar la del servidor
+        if card.descripcion_cargada:
+            fila["descripcion"] = card.descripcion
+        return fila
+
+    # ===== DECODIFICACIÓN =====
+    @staticmethod
+    def _lista_desde_fila(d: dict) -> TrelloLista:
+        return TrelloLista(
+            titulo=d["titulo"],
+            tablero_id=d["tablero_id"],
+            posicion=d.get("posicion", 0),
+            id=d["id"],
+            created_at=parse_supabase_datetime(d.get("created_at")),
+        )
+
+    def _lista_paginada(self, d: dict) -> TrelloLista:
+        # Lista con la primera página embebida (TAM_PAGINA_TARJETAS + 1 tarjetas) y su total
+        t_list = self._lista_desde_fila(d)
+        tarjetas = self._tarjetas_desde_filas(d.get("tarjetas") or [])
+        t_list.set_cards(tarjetas[:TAM_PAGINA_TARJETAS])
+        if len(tarjetas) > TAM_PAGINA_TARJETAS:
+            t_list.fijar_siguiente(cursor_tarjeta(tarjetas[TAM_PAGINA_TARJETAS]))
+            total = (d.get("total") or [{}])[0].get("count") or 0
+            t_list.tarjetas_sin_cargar = max(total - TAM_PAGINA_TARJETAS, 1)
+        return t_list
+
+    def _asignados_desde_filas(self, items: List[dict]) -> List[User]:
+        # Un usuario que el directorio aún no conoce se muestra como "?" en vez de perder la asignación
+        if not items:
+            return []
+        ids = [item["usuario_id"] for item in items]
+        # Si el directorio no se puede releer quedan los "?", pero su error no es el de la
+        # lectura en curso: no debe hacer descartar un tablero que sí se ha leído bien
+        error = self.ultimo_error
+        usuarios = self.usuarios.resolver(ids)
+        self._estado_hilo.error = error
+        return [u or User(id=i, username="?") for i, u in zip(ids, usuarios)]
+
+    def _tarjetas_desde_filas(self, filas: List[dict]) -> List[Tarjeta]:
+        # Las tarjetas embebidas pueden llegar sin filtrar ni ordenar según la versión de PostgREST
+        return [
+            self._tarjeta_desde_fila(d)
+            for d in sorted(filas, key=lambda f: f.get("posicion") or 0)
+            if d.get("eliminada") is not True
+        ]
+
+    def _tarjeta_desde_fila(self, d: dict) -> Tarjeta:
+        card = Tarjeta(
+            titulo=d["titulo"],
+            lista_id=d["lista_id"],
+            descripcion=d.get("descripcion") or "",
+            posicion=d.get("posicion", 0),
+            id=d["id"],
+            created_at=parse_supabase_datetime(d.get("created_at")),
+            descripcion_cargada="descripcion" in d,
+        )
+        card.assignees = self._asignados_desde_filas(d.get("tarjeta_usuarios") or [])
+        return card
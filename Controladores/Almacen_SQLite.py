@@ -0,0 +1,674 @@
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Controladores.Modelos import CambiosTablero, Tablero, TrelloLista, Tarjeta, User
+from Controladores.Almacen_Datos import (
+    TAM_PAGINA_TARJETAS,
+    AlmacenDatos,
+    CursorPagina,
+    cursor_tarjeta,
+    parse_supabase_datetime,
+)
+from Controladores.Cache_Local import directorio_datos
+
+# Ruta de la base de datos; por defecto en la carpeta de datos de la aplicación
+VARIABLE_RUTA = "MINITRELLO_SQLITE"
+# Parámetros SQLite por sentencia (el límite antiguo es 999)
+MAX_IDS_POR_CONSULTA = 500
+ITERACIONES_CLAVE = 200_000
+
+# Mismas tablas y columnas que en Supabase (ver README). Los índices cubren las consultas
+# de la aplicación: listas de un tablero y páginas de tarjetas de una lista en orden, solo
+# las vivas o solo la papelera, y los cambios desde un updated_at.
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    email TEXT UNIQUE,
+    clave TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tableros (
+    id TEXT PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    es_publico INTEGER NOT NULL DEFAULT 0,
+    eliminada INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tableros_eliminada ON tableros(eliminada, created_at);
+CREATE TABLE IF NOT EXISTS listas (
+    id TEXT PRIMARY KEY,
+    tablero_id TEXT NOT NULL REFERENCES tableros(id) ON DELETE CASCADE,
+    titulo TEXT NOT NULL,
+    posicion REAL NOT NULL DEFAULT 0,
+    eliminada INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_listas_tablero ON listas(tablero_id, eliminada, posicion);
+CREATE INDEX IF NOT EXISTS idx_listas_cambios ON listas(tablero_id, updated_at);
+CREATE TABLE IF NOT EXISTS tarjetas (
+    id TEXT PRIMARY KEY,
+    lista_id TEXT NOT NULL REFERENCES listas(id) ON DELETE CASCADE,
+    titulo TEXT NOT NULL,
+    descripcion TEXT NOT NULL DEFAULT '',
+    posicion REAL NOT NULL DEFAULT 0,
+    eliminada INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tarjetas_lista ON tarjetas(lista_id, eliminada, posicion, id);
+CREATE INDEX IF NOT EXISTS idx_tarjetas_cambios ON tarjetas(lista_id, updated_at);
+CREATE TABLE IF NOT EXISTS tarjeta_usuarios (
+    tarjeta_id TEXT NOT NULL REFERENCES tarjetas(id) ON DELETE CASCADE,
+    usuario_id TEXT NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (tarjeta_id, usuario_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tarjeta_usuarios_usuario ON tarjeta_usuarios(usuario_id);
+"""
+
+# Columnas que se aceptan en guardar_filas y clave de cada tabla
+COLUMNAS = {
+    "usuarios": ("id", "username", "email", "clave", "created_at", "updated_at"),
+    "tableros": ("id", "titulo", "es_publico", "eliminada", "created_at", "updated_at"),
+    "listas": ("id", "tablero_id", "titulo", "posicion", "eliminada", "created_at", "updated_at"),
+    "tarjetas": ("id", "lista_id", "titulo", "descripcion", "posicion", "eliminada", "created_at", "updated_at"),
+    "tarjeta_usuarios": ("tarjeta_id", "usuario_id", "created_at"),
+}
+CLAVES = {"tarjeta_usuarios": ("tarjeta_id", "usuario_id")}
+COLUMNAS_TARJETA_LIGERA = "t.id, t.lista_id, t.titulo, t.posicion, t.eliminada, t.created_at"
+
+
+def _ahora() -> str:
+    # Ancho fijo (microsegundos y UTC) para que comparar updated_at como texto sea cronológico
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _cifrar_clave(password: str, sal: Optional[bytes] = None) -> str:
+    sal = sal or os.urandom(16)
+    resumen = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, ITERACIONES_CLAVE)
+    return f"pbkdf2_sha256${ITERACIONES_CLAVE}${sal.hex()}${resumen.hex()}"
+
+
+def _comprobar_clave(password: str, guardada: Optional[str]) -> bool:
+    try:
+        _, iteraciones, sal, resumen = guardada.split("$")
+        calculado = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(sal), int(iteraciones))
+        return hmac.compare_digest(calculado.hex(), resumen)
+    except (AttributeError, ValueError):
+        return False
+
+
+def _fila(r: sqlite3.Row) -> dict:
+    d = dict(r)
+    for columna in ("eliminada", "es_publico"):
+        if columna in d:
+            d[columna] = bool(d[columna])
+    return d
+
+
+class SQLiteController(AlmacenDatos):
+    # Almacén completo en un fichero SQLite, para uso de un solo usuario o en una red local
+    # sin Supabase: las lecturas no salen del equipo. Las cuentas son locales (contraseña
+    # con PBKDF2). Una conexión compartida por todos los hilos, serializada con un lock.
+    es_local = True
+
+    def __init__(self, ruta: Optional[str] = None):
+        super().__init__()
+        self.ruta = ruta or os.environ.get(VARIABLE_RUTA) or os.path.join(directorio_datos(), "minitrello.sqlite3")
+        self._lock = threading.Lock()
+        self._conexion: Optional[sqlite3.Connection] = None
+        try:
+            conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+            conexion.row_factory = sqlite3.Row
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.execute("PRAGMA foreign_keys=ON")
+            conexion.executescript(ESQUEMA)
+            self._conexion = conexion
+        except sqlite3.Error as e:
+            print(f"✗ Error abriendo la base de datos local {self.ruta}: {e}")
+
+    def disponible(self) -> bool:
+        return self._conexion is not None
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion:
+                self._conexion.close()
+                self._conexion = None
+
+    def _leer(self, sql: str, parametros: Iterable = ()) -> List[dict]:
+        with self._lock:
+            return [_fila(r) for r in self._conexion.execute(sql, tuple(parametros)).fetchall()]
+
+    def _escribir(self, sql: str, parametros: Iterable = ()) -> int:
+        # Filas afectadas
+        with self._lock, self._conexion:
+            return self._conexion.execute(sql, tuple(parametros)).rowcount
+
+    def _por_tramos(self, sql: str, ids: List[str], parametros: Iterable = ()) -> List[dict]:
+        # `sql` con un {ids} donde van los marcadores del IN
+        filas = []
+        for i in range(0, len(ids), MAX_IDS_POR_CONSULTA):
+            tramo = ids[i:i + MAX_IDS_POR_CONSULTA]
+            filas.extend(self._leer(sql.format(ids=", ".join("?" * len(tramo))), [*parametros, *tramo]))
+        return filas
+
+    # ===== AUTENTICACIÓN =====
+    def registrar_usuario(self, email: str, password: str, username: str = None) -> dict:
+        if not self._conexion:
+            return {"success": False, "error": "Base de datos local no disponible"}
+        email = email.strip().lower()
+        usuario = User(username=username or email.split('@')[0])
+        ahora = _ahora()
+        try:
+            self._escribir(
+                "INSERT INTO usuarios (id, username, email, clave, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (usuario.id, usuario.username, email, _cifrar_clave(password), ahora, ahora),
+            )
+        except sqlite3.IntegrityError:
+            return {"success": False, "error": "Ya existe una cuenta con ese email"}
+        except sqlite3.Error as e:
+            return {"success": False, "error": str(e)}
+        usuario.created_at = parse_supabase_datetime(ahora)
+        self.current_user = usuario
+        self.usuarios.invalidar()
+        return {"success": True, "user": usuario, "session": None}
+
+    def iniciar_sesion(self, email: str, password: str) -> dict:
+        if not self._conexion:
+            return {"success": False, "error": "Base de datos local no disponible"}
+        try:
+            filas = self._leer("SELECT id, username, clave, created_at FROM usuarios WHERE email = ?", (email.strip().lower(),))
+        except sqlite3.Error as e:
+            return {"success": False, "error": str(e)}
+        if not filas or not _comprobar_clave(password, filas[0]["clave"]):
+            return {"success": False, "error": "Credenciales inválidas"}
+        d = filas[0]
+        self.current_user = User(username=d["username"], id=d["id"], created_at=parse_supabase_datetime(d["created_at"]))
+        self.usuarios.invalidar()
+        return {"success": True, "user": self.current_user, "session": None}
+
+    def cerrar_sesion(self) -> bool:
+        self.current_user = None
+        self.usuarios.invalidar()
+        return True
+
+    def obtener_usuario_actual(self) -> Optional[User]:
+        return self.current_user
+
+    # ===== TABLEROS =====
+    def obtener_tableros(self) -> List[Tablero]:
+        if not self._conexion:
+            return []
+        try:
+            filas = self._leer(
+                "SELECT b.*, (SELECT COUNT(*) FROM listas l JOIN tarjetas t ON t.lista_id = l.id "
+                "WHERE l.tablero_id = b.id AND l.eliminada = 0 AND t.eliminada = 0) AS num_tarjetas "
+                "FROM tableros b WHERE b.eliminada = 0 ORDER BY b.created_at"
+            )
+            return [
+                Tablero(
+                    titulo=d["titulo"],
+                    es_publico=d["es_publico"],
+                    id=d["id"],
+                    created_at=parse_supabase_datetime(d["created_at"]),
+                    num_tarjetas=d["num_tarjetas"],
+                )
+                for d in filas
+            ]
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo tableros", e)
+            return []
+
+    def crear_tablero(self, titulo: str, es_publico: bool = False) -> Optional[Tablero]:
+        if not self._conexion:
+            return None
+        tablero = Tablero(titulo=titulo, es_publico=es_publico)
+        ahora = _ahora()
+        try:
+            self._escribir(
+                "INSERT INTO tableros (id, titulo, es_publico, eliminada, created_at, updated_at) VALUES (?, ?, ?, 0, ?, ?)",
+                (tablero.id, titulo, int(bool(es_publico)), ahora, ahora),
+            )
+            tablero.created_at = parse_supabase_datetime(ahora)
+            return tablero
+        except sqlite3.Error as e:
+            self._registrar_error("Error creando tablero", e)
+            return None
+
+    def eliminar_tablero(self, board_id: str) -> bool:
+        return self._marcar("tableros", board_id, True, "Error enviando tablero a papelera")
+
+    # ===== LISTAS =====
+    def obtener_listas(self, board_id: str) -> List[TrelloLista]:
+        if not self._conexion:
+            return []
+        try:
+            filas = self._leer(
+                "SELECT * FROM listas WHERE tablero_id = ? AND eliminada = 0 ORDER BY posicion", (board_id,)
+            )
+            return self._listas_paginadas(filas)
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo listas", e)
+            return []
+
+    def crear_lista(self, board_id: str, titulo: str, posicion: float, list_id: Optional[str] = None) -> Optional[TrelloLista]:
+        if not self._conexion:
+            return None
+        lista = TrelloLista(titulo=titulo, tablero_id=board_id, posicion=posicion)
+        lista.id = list_id or lista.id
+        ahora = _ahora()
+        try:
+            self._escribir(
+                "INSERT INTO listas (id, tablero_id, titulo, posicion, eliminada, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                (lista.id, board_id, titulo, posicion, ahora, ahora),
+            )
+            lista.created_at = parse_supabase_datetime(ahora)
+            return lista
+        except sqlite3.Error as e:
+            self._registrar_error("Error creando lista/columna", e)
+            return None
+
+    def eliminar_lista(self, list_id: str) -> bool:
+        return self._marcar("listas", list_id, True, "Error enviando lista a papelera")
+
+    def actualizar_lista(self, list_id: str, titulo: str = None) -> bool:
+        if not self._conexion:
+            return False
+        if titulo is None or not titulo.strip():
+            return False
+        try:
+            self._escribir("UPDATE listas SET titulo = ?, updated_at = ? WHERE id = ?", (titulo, _ahora(), list_id))
+            return True
+        except sqlite3.Error as e:
+            self._registrar_error("Error actualizando lista", e)
+            return False
+
+    # ===== TARJETAS =====
+    def obtener_tarjetas(self, list_id: str) -> List[Tarjeta]:
+        if not self._conexion:
+            return []
+        try:
+            filas = self._leer(
+                f"SELECT {COLUMNAS_TARJETA_LIGERA} FROM tarjetas t WHERE t.lista_id = ? AND t.eliminada = 0 "
+                "ORDER BY t.posicion, t.id",
+                (list_id,),
+            )
+            return self._tarjetas_desde_filas(self._con_asignados(filas))
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo tarjetas", e)
+            return []
+
+    def obtener_pagina_tarjetas(
+        self, list_id: str, desde: Optional[CursorPagina] = None
+    ) -> Optional[Tuple[List[Tarjeta], Optional[CursorPagina], Optional[int]]]:
+        if not self._conexion:
+            return None
+        try:
+            filas = self._pagina(list_id, desde)
+            total = self._contar_tarjetas(list_id) if desde is None else None
+            tarjetas = self._tarjetas_desde_filas(self._con_asignados(filas))
+            siguiente = cursor_tarjeta(tarjetas[TAM_PAGINA_TARJETAS]) if len(tarjetas) > TAM_PAGINA_TARJETAS else None
+            return tarjetas[:TAM_PAGINA_TARJETAS], siguiente, total
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo tarjetas", e)
+            return None
+
+    def obtener_descripcion_tarjeta(self, card_id: str) -> Optional[str]:
+        if not self._conexion:
+            return None
+        try:
+            filas = self._leer("SELECT descripcion FROM tarjetas WHERE id = ?", (card_id,))
+            return (filas[0]["descripcion"] or "") if filas else ""
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo descripcion", e)
+            return None
+
+    def crear_tarjeta(
+        self, list_id: str, titulo: str, descripcion: str, posicion: float, card_id: Optional[str] = None
+    ) -> Optional[Tarjeta]:
+        if not self._conexion:
+            return None
+        card = Tarjeta(titulo=titulo, lista_id=list_id, descripcion=descripcion or "", posicion=posicion)
+        card.id = card_id or card.id
+        ahora = _ahora()
+        try:
+            self._escribir(
+                "INSERT INTO tarjetas (id, lista_id, titulo, descripcion, posicion, eliminada, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (card.id, list_id, titulo, card.descripcion, posicion, ahora, ahora),
+            )
+            card.created_at = parse_supabase_datetime(ahora)
+            return card
+        except sqlite3.Error as e:
+            self._registrar_error("Error creando tarjeta", e)
+            return None
+
+    def eliminar_tarjeta(self, card_id: str) -> bool:
+        return self._marcar("tarjetas", card_id, True, "Error enviando a papelera")
+
+    def actualizar_tarjeta(self, card_id: str, titulo: str = None, descripcion: str = None) -> bool:
+        if not self._conexion:
+            return False
+        data = {}
+        if titulo is not None and titulo.strip():
+            data["titulo"] = titulo
+        if descripcion is not None:
+            data["descripcion"] = descripcion
+        if not data:
+            return False
+        try:
+            asignaciones = ", ".join(f"{c} = ?" for c in data)
+            self._escribir(
+                f"UPDATE tarjetas SET {asignaciones}, updated_at = ? WHERE id = ?", [*data.values(), _ahora(), card_id]
+            )
+            return True
+        except sqlite3.Error as e:
+            self._registrar_error("Error actualizando tarjeta", e)
+            return False
+
+    def actualizar_posicion_tarjeta(self, card_id: str, new_list_id: str, new_position: float) -> bool:
+        if not self._conexion:
+            return False
+        try:
+            self._escribir(
+                "UPDATE tarjetas SET lista_id = ?, posicion = ?, updated_at = ? WHERE id = ?",
+                (new_list_id, new_position, _ahora(), card_id),
+            )
+            return True
+        except sqlite3.Error as e:
+            self._registrar_error("Error moviendo tarjeta", e)
+            return False
+
+    # ===== USUARIOS / ASIGNACIONES =====
+    def _leer_usuarios(self) -> Optional[List[User]]:
+        if not self._conexion:
+            return None
+        try:
+            return [User(username=d["username"] or "?", id=d["id"]) for d in self._leer("SELECT id, username FROM usuarios")]
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo usuarios", e)
+            return None
+
+    def asignar_usuarios(self, pares: Iterable[Tuple[str, str]]) -> bool:
+        return self._cambiar_asignaciones(
+            "INSERT OR IGNORE INTO tarjeta_usuarios (tarjeta_id, usuario_id, created_at) VALUES (?, ?, ?)",
+            pares, "Error asignando", con_fecha=True,
+        )
+
+    def desasignar_usuarios(self, pares: Iterable[Tuple[str, str]]) -> bool:
+        return self._cambiar_asignaciones(
+            "DELETE FROM tarjeta_usuarios WHERE tarjeta_id = ? AND usuario_id = ?", pares, "Error desasignando"
+        )
+
+    def _cambiar_asignaciones(self, sql: str, pares: Iterable[Tuple[str, str]], mensaje: str, con_fecha: bool = False) -> bool:
+        # Todas las parejas en una transacción; como el trigger del README, toca updated_at de
+        # sus tarjetas para que la sincronización las vea
+        if not self._conexion:
+            return False
+        pares = list(dict.fromkeys(pares))
+        if not pares:
+            return True
+        ahora = _ahora()
+        try:
+            with self._lock, self._conexion:
+                self._conexion.executemany(sql, [(c, u, ahora) if con_fecha else (c, u) for c, u in pares])
+                self._conexion.executemany(
+                    "UPDATE tarjetas SET updated_at = ? WHERE id = ?", [(ahora, c) for c in dict.fromkeys(c for c, _ in pares)]
+                )
+            return True
+        except sqlite3.Error as e:
+            self._registrar_error(mensaje, e)
+            return False
+
+    def obtener_asignados_tarjetas(self, card_ids: Iterable[str]) -> Dict[str, List[User]]:
+        card_ids = list(dict.fromkeys(card_ids))
+        if not self._conexion or not card_ids:
+            return {}
+        try:
+            filas_por_tarjeta: Dict[str, List[dict]] = {card_id: [] for card_id in card_ids}
+            for d in self._por_tramos(
+                "SELECT tarjeta_id, usuario_id FROM tarjeta_usuarios WHERE tarjeta_id IN ({ids}) ORDER BY rowid", card_ids
+            ):
+                filas_por_tarjeta[d["tarjeta_id"]].append(d)
+            return {card_id: self._asignados_desde_filas(filas) for card_id, filas in filas_por_tarjeta.items()}
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo asignados", e)
+            return {}
+
+    # ===== PAPELERA =====
+    def _marcar(self, tabla: str, fila_id: str, eliminada: bool, mensaje: str) -> bool:
+        if not self._conexion:
+            return False
+        try:
+            self._escribir(
+                f"UPDATE {tabla} SET eliminada = ?, updated_at = ? WHERE id = ?", (int(eliminada), _ahora(), fila_id)
+            )
+            return True
+        except sqlite3.Error as e:
+            self._registrar_error(mensaje, e)
+            return False
+
+    def _borrar(self, tabla: str, fila_id: str, mensaje: str) -> bool:
+        # Las filas hijas (listas, tarjetas, asignaciones) se borran en cascada
+        if not self._conexion:
+            return False
+        try:
+            self._escribir(f"DELETE FROM {tabla} WHERE id = ?", (fila_id,))
+            return True
+        except sqlite3.Error as e:
+            self._registrar_error(mensaje, e)
+            return False
+
+    def obtener_papelera(self, board_id: str) -> List[Tarjeta]:
+        if not self._conexion:
+            return []
+        try:
+            filas = self._leer(
+                "SELECT t.* FROM tarjetas t JOIN listas l ON l.id = t.lista_id "
+                "WHERE l.tablero_id = ? AND t.eliminada = 1",
+                (board_id,),
+            )
+            return [
+                Tarjeta(
+                    titulo=d["titulo"],
+                    lista_id=d["lista_id"],
+                    descripcion=d["descripcion"] or "",
+                    posicion=d["posicion"],
+                    id=d["id"],
+                    created_at=parse_supabase_datetime(d["created_at"]),
+                )
+                for d in filas
+            ]
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo papelera", e)
+            return []
+
+    def restaurar_tarjeta(self, card_id: str) -> bool:
+        return self._marcar("tarjetas", card_id, False, "Error restaurando tarjeta")
+
+    def eliminar_tarjeta_definitivamente(self, card_id: str) -> bool:
+        return self._borrar("tarjetas", card_id, "Error eliminando definitivamente")
+
+    def obtener_papelera_tableros(self) -> List[Tablero]:
+        if not self._conexion:
+            return []
+        try:
+            return [Tablero(titulo=d["titulo"], id=d["id"]) for d in self._leer("SELECT id, titulo FROM tableros WHERE eliminada = 1")]
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo papelera tableros", e)
+            return []
+
+    def restaurar_tablero(self, board_id: str) -> bool:
+        return self._marcar("tableros", board_id, False, "Error restaurando tablero")
+
+    def eliminar_tablero_definitivamente(self, board_id: str) -> bool:
+        return self._borrar("tableros", board_id, "Error eliminando tablero definitivamente")
+
+    def obtener_papelera_listas(self, board_id: str) -> List[TrelloLista]:
+        if not self._conexion:
+            return []
+        try:
+            filas = self._leer("SELECT * FROM listas WHERE tablero_id = ? AND eliminada = 1", (board_id,))
+            return [self._lista_desde_fila(d) for d in filas]
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo papelera de listas", e)
+            return []
+
+    def restaurar_lista(self, list_id: str) -> bool:
+        return self._marcar("listas", list_id, False, "Error restaurando lista")
+
+    def eliminar_lista_definitivamente(self, list_id: str) -> bool:
+        return self._borrar("listas", list_id, "Error eliminando lista definitivamente")
+
+    # ===== SINCRONIZACIÓN =====
+    # Con varios procesos sobre el mismo fichero, cada escritura deja su updated_at
+    def cursor_cambios(self, board_id: str) -> Optional[str]:
+        if not self._conexion:
+            return None
+        try:
+            filas = self._leer(
+                "SELECT MAX(updated_at) AS marca FROM listas WHERE tablero_id = ? "
+                "UNION ALL SELECT MAX(t.updated_at) FROM tarjetas t JOIN listas l ON l.id = t.lista_id WHERE l.tablero_id = ?",
+                (board_id, board_id),
+            )
+            marcas = [d["marca"] for d in filas if d["marca"]]
+            return max(marcas) if marcas else None
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo cursor de cambios", e)
+            return None
+
+    def obtener_cambios(self, board_id: str, desde: Optional[str]) -> Optional[CambiosTablero]:
+        if not self._conexion:
+            return None
+        try:
+            filas_listas = self._leer(
+                "SELECT * FROM listas WHERE tablero_id = ? AND updated_at >= ?", (board_id, desde or "")
+            )
+            filas_tarjetas = self._leer(
+                f"SELECT {COLUMNAS_TARJETA_LIGERA}, t.updated_at FROM tarjetas t JOIN listas l ON l.id = t.lista_id "
+                "WHERE l.tablero_id = ? AND t.updated_at >= ?",
+                (board_id, desde or ""),
+            )
+
+            cambios = CambiosTablero(cursor=desde)
+            cambios.listas_eliminadas = [d["id"] for d in filas_listas if d["eliminada"]]
+            cambios.listas = self._listas_paginadas([d for d in filas_listas if not d["eliminada"]])
+            vivas = [d for d in filas_tarjetas if not d["eliminada"]]
+            cambios.tarjetas_eliminadas = [d["id"] for d in filas_tarjetas if d["eliminada"]]
+            cambios.tarjetas = [self._tarjeta_desde_fila(d) for d in self._con_asignados(vivas)]
+
+            marcas = [d["updated_at"] for d in filas_listas + filas_tarjetas]
+            if marcas:
+                cambios.cursor = max(marcas + ([desde] if desde else []))
+            return cambios
+        except sqlite3.Error as e:
+            self._registrar_error("Error obteniendo cambios", e)
+            return None
+
+    # ===== ESCRITURA EN LOTE =====
+    def guardar_filas(self, tabla: str, filas: List[dict]) -> bool:
+        # Upsert: una fila nueva recibe created_at; una existente solo cambia las columnas que
+        # trae. updated_at es el de la fila si lo trae (importaciones) y si no, el de ahora.
+        if not self._conexion:
+            return False
+        if not filas:
+            return True
+        try:
+            permitidas = COLUMNAS.get(tabla)
+            if permitidas is None:
+                raise ValueError(f"tabla desconocida: {tabla}")
+            clave = CLAVES.get(tabla, ("id",))
+            ahora = _ahora()
+            grupos = {}
+            for fila in filas:
+                fila = dict(fila)
+                desconocidas = set(fila) - set(permitidas)
+                if desconocidas:
+                    raise ValueError(f"columnas desconocidas en {tabla}: {', '.join(sorted(desconocidas))}")
+                fila.setdefault("created_at", ahora)
+                if "updated_at" in permitidas:
+                    fila.setdefault("updated_at", ahora)
+                grupos.setdefault(tuple(sorted(fila)), []).append(fila)
+            with self._lock, self._conexion:
+                for columnas, grupo in grupos.items():
+                    cambiar = [c for c in columnas if c not in clave and c != "created_at"]
+                    accion = (
+                        "DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in cambiar) if cambiar else "DO NOTHING"
+                    )
+                    self._conexion.executemany(
+                        f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))}) "
+                        f"ON CONFLICT ({', '.join(clave)}) {accion}",
+                        [[f[c] for c in columnas] for f in grupo],
+                    )
+            return True
+        except (sqlite3.Error, ValueError) as e:
+            self._registrar_error(f"Error guardando {tabla}", e)
+            return False
+
+    def obtener_marcas(self, tabla: str, ids: Iterable[str]) -> Optional[Dict[str, str]]:
+        if not self._conexion:
+            return None
+        try:
+            if "updated_at" not in COLUMNAS.get(tabla, ()):
+                raise ValueError(f"tabla sin updated_at: {tabla}")
+            filas = self._por_tramos(f"SELECT id, updated_at FROM {tabla} WHERE id IN ({{ids}})", list(dict.fromkeys(ids)))
+            return {d["id"]: d["updated_at"] for d in filas}
+        except (sqlite3.Error, ValueError) as e:
+            self._registrar_error(f"Error obteniendo marcas de {tabla}", e)
+            return None
+
+    # ===== CONSULTAS AUXILIARES =====
+    def _pagina(self, list_id: str, desde: Optional[CursorPagina] = None) -> List[dict]:
+        # TAM_PAGINA_TARJETAS + 1 tarjetas vivas con (posicion, id) >= desde, por el índice de la lista
+        if desde is None:
+            return self._leer(
+                f"SELECT {COLUMNAS_TARJETA_LIGERA} FROM tarjetas t WHERE t.lista_id = ? AND t.eliminada = 0 "
+                "ORDER BY t.posicion, t.id LIMIT ?",
+                (list_id, TAM_PAGINA_TARJETAS + 1),
+            )
+        return self._leer(
+            f"SELECT {COLUMNAS_TARJETA_LIGERA} FROM tarjetas t WHERE t.lista_id = ? AND t.eliminada = 0 "
+            "AND (t.posicion > ? OR (t.posicion = ? AND t.id >= ?)) ORDER BY t.posicion, t.id LIMIT ?",
+            (list_id, desde[0], desde[0], desde[1], TAM_PAGINA_TARJETAS + 1),
+        )
+
+    def _contar_tarjetas(self, list_id: str) -> int:
+        return self._leer(
+            "SELECT COUNT(*) AS total FROM tarjetas WHERE lista_id = ? AND eliminada = 0", (list_id,)
+        )[0]["total"]
+
+    def _listas_paginadas(self, filas: List[dict]) -> List[TrelloLista]:
+        # Cada fila de lista con la forma que espera _lista_paginada (tarjetas y total
+        # embebidos); los asignados de todas las páginas se leen juntos
+        for d in filas:
+            d["tarjetas"] = self._pagina(d["id"])
+            if len(d["tarjetas"]) > TAM_PAGINA_TARJETAS:
+                d["total"] = [{"count": self._contar_tarjetas(d["id"])}]
+        self._con_asignados([t for d in filas for t in d["tarjetas"]])
+        return [self._lista_paginada(d) for d in filas]
+
+    def _con_asignados(self, filas: List[dict]) -> List[dict]:
+        # Añade a cada fila de tarjeta sus tarjeta_usuarios, con una consulta por tramo de ids
+        if not filas:
+            return filas
+        por_tarjeta: Dict[str, List[dict]] = {}
+        for d in self._por_tramos(
+            "SELECT tarjeta_id, usuario_id FROM tarjeta_usuarios WHERE tarjeta_id IN ({ids}) ORDER BY rowid",
+            [d["id"] for d in filas],
+        ):
+            por_tarjeta.setdefault(d["tarjeta_id"], []).append(d)
+        for d in filas:
+            d["tarjeta_usuarios"] = por_tarjeta.get(d["id"], [])
+        return filas
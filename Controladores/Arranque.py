@@ -0,0 +1,49 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Referencia del arranque: el punto de entrada importa este módulo antes que nada
+_inicio = time.perf_counter()
+# Duración de cada fase del arranque, en el orden en que terminan; solo cuenta la primera vez
+_fases: Dict[str, float] = {}
+_abiertas: Dict[str, float] = {}
+_publicado = False
+
+
+def empezar(fase: str):
+    if fase not in _fases:
+        _abiertas.setdefault(fase, time.perf_counter())
+
+
+def terminar(fase: str, desde_inicio: bool = False):
+    # Con `desde_inicio` la fase se mide desde que arrancó el proceso
+    if fase in _fases:
+        return
+    comienzo = _inicio if desde_inicio else _abiertas.pop(fase, None)
+    if comienzo is not None:
+        _fases[fase] = time.perf_counter() - comienzo
+
+
+@contextmanager
+def medir(fase: str):
+    empezar(fase)
+    try:
+        yield
+    finally:
+        terminar(fase)
+
+
+def tiempos() -> List[Tuple[str, float]]:
+    # (fase, segundos)
+    return list(_fases.items())
+
+
+def publicar():
+    # Desglose por consola, una sola vez por proceso
+    global _publicado
+    if _publicado or not _fases:
+        return
+    _publicado = True
+    print("Arranque:")
+    for fase, segundos in _fases.items():
+        print(f"  {fase:<24}{segundos * 1000:8.1f} ms")
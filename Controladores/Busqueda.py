@@ -0,0 +1,226 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from itertools import chain, islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from Controladores.Modelos import Tablero, Tarjeta
+
+PESO_TITULO = 3
+PESO_DESCRIPCION = 1
+# Bonificación cuando el término coincide entero y no solo como prefijo
+PESO_EXACTO = 2
+
+
+_PALABRA = re.compile(r"\w+")
+# Marcas diacríticas combinables que deja la descomposición NFD
+_MARCAS = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]+")
+
+
+def normalizar(texto: str) -> str:
+    # "Revisión" y "revision" deben encontrarse igual: sin tildes ni mayúsculas (la ñ se queda en n)
+    texto = texto or ""
+    if not texto.isascii():
+        texto = _MARCAS.sub("", unicodedata.normalize("NFD", texto))
+    return texto.casefold()
+
+
+def terminos(texto: str) -> List[str]:
+    return _PALABRA.findall(normalizar(texto))
+
+
+def _terminos_consulta(consulta: str) -> List[str]:
+    return list(dict.fromkeys(terminos(consulta)))
+
+
+class IndiceBusqueda:
+    # Índice invertido término -> ids de tarjeta, separado por campo (título / descripción).
+    # El vocabulario se guarda ordenado para resolver prefijos con bisect, y los conjuntos de
+    # cada prefijo se memorizan hasta el siguiente cambio: al teclear solo se calcula el último.
+    # Los prefijos de una letra abarcan medio vocabulario, así que esos van precalculados por inicial.
+    def __init__(self):
+        self._titulo: Dict[str, Set[str]] = {}
+        self._descripcion: Dict[str, Set[str]] = {}
+        # Inicial -> ids con algún término que empieza por ella (en cualquier campo / en el título)
+        self._por_inicial: Dict[str, Set[str]] = {}
+        self._por_inicial_titulo: Dict[str, Set[str]] = {}
+        self._vocabulario: List[str] = []
+        self._por_tarjeta: Dict[str, Tuple[frozenset, frozenset]] = {}
+        self._cache_prefijos: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        # Ids tocados mientras se construye un índice nuevo en segundo plano (ver adoptar)
+        self._tocadas: Optional[Set[str]] = None
+
+    def __len__(self):
+        return len(self._por_tarjeta)
+
+    def reindexar(self, tarjetas: Iterable[Tarjeta]):
+        self._titulo, self._descripcion, self._por_tarjeta = {}, {}, {}
+        self._por_inicial, self._por_inicial_titulo = {}, {}
+        self._cache_prefijos = {}
+        for card in tarjetas:
+            en_titulo, en_descripcion = self._por_tarjeta[card.id] = self._terminos_tarjeta(card)
+            for termino in en_titulo:
+                self._titulo.setdefault(termino, set()).add(card.id)
+                self._por_inicial_titulo.setdefault(termino[0], set()).add(card.id)
+                self._por_inicial.setdefault(termino[0], set()).add(card.id)
+            for termino in en_descripcion:
+                self._descripcion.setdefault(termino, set()).add(card.id)
+                self._por_inicial.setdefault(termino[0], set()).add(card.id)
+        self._vocabulario = sorted(self._titulo.keys() | self._descripcion.keys())
+
+    def empezar_reconstruccion(self):
+        # A partir de aquí se apuntan las tarjetas que cambian hasta que llegue el índice nuevo
+        self._tocadas = set()
+
+    def adoptar(self, nuevo: "IndiceBusqueda", tablero: Tablero):
+        # Sustituye el contenido por el de un índice construido aparte y vuelve a aplicar
+        # los cambios hechos mientras tanto, que ese índice no vio
+        tocadas, self._tocadas = self._tocadas or set(), None
+        self._titulo, self._descripcion = nuevo._titulo, nuevo._descripcion
+        self._vocabulario, self._por_tarjeta = nuevo._vocabulario, nuevo._por_tarjeta
+        self._por_inicial, self._por_inicial_titulo = nuevo._por_inicial, nuevo._por_inicial_titulo
+        self._cache_prefijos = {}
+        for card_id in tocadas:
+            card = tablero.get_card(card_id)
+            if card is None:
+                self.quitar_tarjeta(card_id)
+            else:
+                self.indexar_tarjeta(card)
+
+    def indexar_tarjeta(self, card: Tarjeta):
+        # Alta o cambio de texto de una tarjeta
+        if self._tocadas is not None:
+            self._tocadas.add(card.id)
+        nuevos = self._terminos_tarjeta(card)
+        viejos = self._por_tarjeta.get(card.id)
+        if nuevos == viejos:
+            return
+        if viejos:
+            self._quitar(card.id, viejos)
+        self._poner(card.id, nuevos)
+        self._por_tarjeta[card.id] = nuevos
+        self._cache_prefijos.clear()
+
+    def quitar_tarjeta(self, card_id: str):
+        if self._tocadas is not None:
+            self._tocadas.add(card_id)
+        viejos = self._por_tarjeta.pop(card_id, None)
+        if viejos:
+            self._quitar(card_id, viejos)
+            self._cache_prefijos.clear()
+
+    def coincidencias(self, consulta: str) -> Optional[Set[str]]:
+        # Ids que contienen todos los términos de la consulta (como prefijo); None si está vacía
+        prefijos = _terminos_consulta(consulta)
+        if not prefijos:
+            return None
+        conjuntos = sorted((self._ids_prefijo(p)[0] for p in prefijos), key=len)
+        resultado = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            resultado &= conjunto
+            if not resultado:
+                break
+        return resultado
+
+    def buscar(self, consulta: str, limite: Optional[int] = None, ids: Optional[Set[str]] = None) -> List[str]:
+        # Ids ordenados por relevancia: cuenta más aparecer en el título y coincidir entero.
+        # `ids` es el resultado de coincidencias() para la misma consulta, si ya se tiene.
+        if ids is None:
+            ids = self.coincidencias(consulta)
+        if not ids:
+            return []
+        prefijos = _terminos_consulta(consulta)
+        if limite is not None:
+            # Las que suman todos los puntos que alguien puede sumar van primero: si hay bastantes,
+            # no hace falta puntuar el resto
+            mejores = ids
+            for prefijo in prefijos:
+                en_titulo = self._ids_prefijo(prefijo)[1]
+                en_titulo_exacto, en_descripcion_exacto = self._titulo.get(prefijo), self._descripcion.get(prefijo)
+                if en_titulo:
+                    mejores = mejores & en_titulo
+                if en_titulo_exacto or en_descripcion_exacto:
+                    mejores = (mejores & (en_titulo_exacto or set())) | (mejores & (en_descripcion_exacto or set()))
+                if len(mejores) < limite:
+                    break
+            else:
+                return list(islice(mejores, limite))
+
+        # En vez de puntuar tarjeta a tarjeta, se parte el conjunto en grupos con los mismos
+        # puntos (dentro o fuera de cada conjunto que puntúa): son pocos y todo son operaciones de set
+        grupos = [(0, ids)]
+        for prefijo in prefijos:
+            en_titulo = self._ids_prefijo(prefijo)[1]
+            exactos = self._titulo.get(prefijo, set()) | self._descripcion.get(prefijo, set())
+            for conjunto, peso in ((en_titulo, PESO_TITULO - PESO_DESCRIPCION), (exactos, PESO_EXACTO)):
+                if not conjunto:
+                    continue
+                divididos = []
+                for puntos, grupo in grupos:
+                    dentro = grupo & conjunto
+                    if dentro:
+                        divididos.append((puntos + peso, dentro))
+                    if len(dentro) < len(grupo):
+                        divididos.append((puntos, grupo - dentro if dentro else grupo))
+                grupos = divididos
+        # Dentro de un mismo grupo el orden es cualquiera
+        grupos.sort(key=lambda g: g[0], reverse=True)
+        return list(islice(chain.from_iterable(g for _, g in grupos), limite))
+
+    def _ids_prefijo(self, prefijo: str) -> Tuple[Set[str], Set[str]]:
+        # (ids con el prefijo en cualquier campo, ids con el prefijo en el título)
+        if len(prefijo) == 1:
+            return self._por_inicial.get(prefijo, set()), self._por_inicial_titulo.get(prefijo, set())
+        cacheado = self._cache_prefijos.get(prefijo)
+        if cacheado is None:
+            inicio = bisect_left(self._vocabulario, prefijo)
+            fin = bisect_left(self._vocabulario, prefijo + "\uffff", inicio)
+            encontrados = self._vocabulario[inicio:fin]
+            en_titulo = set().union(*(self._titulo.get(t, ()) for t in encontrados))
+            todos = en_titulo.union(*(self._descripcion.get(t, ()) for t in encontrados))
+            cacheado = self._cache_prefijos[prefijo] = (todos, en_titulo)
+        return cacheado
+
+    def _poner(self, card_id: str, terminos_tarjeta: Tuple[frozenset, frozenset]):
+        en_titulo, en_descripcion = terminos_tarjeta
+        for inicial in {t[0] for t in en_titulo}:
+            self._por_inicial_titulo.setdefault(inicial, set()).add(card_id)
+        for inicial in {t[0] for t in en_titulo | en_descripcion}:
+            self._por_inicial.setdefault(inicial, set()).add(card_id)
+        for indice, termino_s in zip((self._titulo, self._descripcion), terminos_tarjeta):
+            for termino in termino_s:
+                ids = indice.get(termino)
+                if ids is None:
+                    if termino not in self._titulo and termino not in self._descripcion:
+                        insort(self._vocabulario, termino)
+                    ids = indice[termino] = set()
+                ids.add(card_id)
+
+    def _quitar(self, card_id: str, terminos_tarjeta: Tuple[frozenset, frozenset]):
+        # Se quitan todos los términos de la tarjeta a la vez, así que sus iniciales dejan de valer
+        en_titulo, en_descripcion = terminos_tarjeta
+        iniciales = ((self._por_inicial_titulo, en_titulo), (self._por_inicial, en_titulo | en_descripcion))
+        for por_inicial, termino_s in iniciales:
+            for inicial in {t[0] for t in termino_s}:
+                ids = por_inicial.get(inicial)
+                if ids is not None:
+                    ids.discard(card_id)
+                    if not ids:
+                        del por_inicial[inicial]
+        for indice, termino_s in zip((self._titulo, self._descripcion), terminos_tarjeta):
+            for termino in termino_s:
+                ids = indice.get(termino)
+                if ids is None:
+                    continue
+                ids.discard(card_id)
+                if ids:
+                    continue
+                del indice[termino]
+                if termino not in self._titulo and termino not in self._descripcion:
+                    idx = bisect_left(self._vocabulario, termino)
+                    if idx < len(self._vocabulario) and self._vocabulario[idx] == termino:
+                        del self._vocabulario[idx]
+
+    @staticmethod
+    def _terminos_tarjeta(card: Tarjeta) -> Tuple[frozenset, frozenset]:
+        return frozenset(terminos(card.titulo)), frozenset(terminos(card.descripcion))
@@ -0,0 +1,226 @@
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from Controladores.Modelos import Tablero, TrelloLista, Tarjeta, User
+
+
+def directorio_datos() -> str:
+    # Carpeta de datos de usuario de la aplicación según el sistema operativo
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    ruta = os.path.join(base, "MiniTrello")
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def _fecha(texto: Optional[str]) -> datetime:
+    try:
+        return datetime.fromisoformat(texto) if texto else datetime.now()
+    except ValueError:
+        return datetime.now()
+
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tableros (
+    id TEXT PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    es_publico INTEGER NOT NULL DEFAULT 0,
+    num_tarjetas INTEGER,
+    orden INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS listas (
+    id TEXT PRIMARY KEY,
+    tablero_id TEXT NOT NULL,
+    titulo TEXT NOT NULL,
+    posicion REAL NOT NULL DEFAULT 0,
+    posicion_siguiente REAL,
+    id_siguiente TEXT,
+    tarjetas_sin_cargar INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_listas_tablero ON listas(tablero_id);
+CREATE TABLE IF NOT EXISTS tarjetas (
+    id TEXT PRIMARY KEY,
+    tablero_id TEXT NOT NULL,
+    lista_id TEXT NOT NULL,
+    titulo TEXT NOT NULL,
+    descripcion TEXT,
+    posicion REAL NOT NULL DEFAULT 0,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tarjetas_tablero ON tarjetas(tablero_id);
+CREATE TABLE IF NOT EXISTS asignados (
+    tablero_id TEXT NOT NULL,
+    tarjeta_id TEXT NOT NULL,
+    usuario_id TEXT NOT NULL,
+    username TEXT,
+    orden INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_asignados_tablero ON asignados(tablero_id);
+CREATE TABLE IF NOT EXISTS tableros_cacheados (
+    tablero_id TEXT PRIMARY KEY,
+    guardado_en TEXT
+);
+"""
+
+# Columnas añadidas después de la primera versión: las cachés ya creadas las reciben con ALTER TABLE
+COLUMNAS_NUEVAS = {
+    "listas": (
+        ("posicion_siguiente", "REAL"),
+        ("id_siguiente", "TEXT"),
+        ("tarjetas_sin_cargar", "INTEGER NOT NULL DEFAULT 0"),
+    ),
+}
+
+
+class CacheLocal:
+    # Copia local (SQLite) de tableros, listas, tarjetas y asignados por tablero.
+    # Permite pintar al instante y revalidar contra Supabase en segundo plano.
+    def __init__(self, ruta: Optional[str] = None):
+        self.ruta = ruta or os.path.join(directorio_datos(), "cache.sqlite3")
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        self._migrar()
+
+    def _migrar(self):
+        for tabla, columnas in COLUMNAS_NUEVAS.items():
+            existentes = {f[1] for f in self._conexion.execute(f"PRAGMA table_info({tabla})")}
+            for nombre, tipo in columnas:
+                if nombre not in existentes:
+                    self._conexion.execute(f"ALTER TABLE {tabla} ADD COLUMN {nombre} {tipo}")
+        self._conexion.commit()
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+    # ===== TABLEROS =====
+    def cargar_tableros(self) -> Optional[List[Tablero]]:
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT id, titulo, es_publico, num_tarjetas, created_at FROM tableros ORDER BY orden"
+            ).fetchall()
+            hay_datos = self._conexion.execute("SELECT 1 FROM tableros_cacheados WHERE tablero_id = ''").fetchone()
+        if not filas and not hay_datos:
+            return None
+        return [
+            Tablero(titulo=t, es_publico=bool(p), id=i, num_tarjetas=n, created_at=_fecha(c))
+            for i, t, p, n, c in filas
+        ]
+
+    def guardar_tableros(self, tableros: List[Tablero]):
+        filas = [
+            (t.id, t.titulo, int(bool(t.es_publico)), t.get_card_count(), orden, t.created_at.isoformat())
+            for orden, t in enumerate(tableros)
+        ]
+        with self._lock, self._conexion:
+            self._conexion.execute("DELETE FROM tableros")
+            self._conexion.executemany(
+                "INSERT INTO tableros (id, titulo, es_publico, num_tarjetas, orden, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                filas,
+            )
+            # La clave vacía marca que la lista de tableros ya se guardó alguna vez (aunque esté vacía)
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO tableros_cacheados (tablero_id, guardado_en) VALUES ('', ?)",
+                (datetime.now().isoformat(),),
+            )
+
+    # ===== CONTENIDO DE UN TABLERO =====
+    def cargar_listas(self, board_id: str) -> Optional[List[TrelloLista]]:
+        with self._lock:
+            if not self._conexion.execute(
+                "SELECT 1 FROM tableros_cacheados WHERE tablero_id = ?", (board_id,)
+            ).fetchone():
+                return None
+            filas_listas = self._conexion.execute(
+                "SELECT id, titulo, posicion, posicion_siguiente, id_siguiente, tarjetas_sin_cargar, created_at FROM listas "
+                "WHERE tablero_id = ? ORDER BY posicion",
+                (board_id,),
+            ).fetchall()
+            filas_tarjetas = self._conexion.execute(
+                "SELECT id, lista_id, titulo, descripcion, posicion, created_at FROM tarjetas "
+                "WHERE tablero_id = ? ORDER BY posicion",
+                (board_id,),
+            ).fetchall()
+            filas_asignados = self._conexion.execute(
+                "SELECT tarjeta_id, usuario_id, username FROM asignados WHERE tablero_id = ? ORDER BY orden",
+                (board_id,),
+            ).fetchall()
+
+        asignados = {}
+        for tarjeta_id, usuario_id, username in filas_asignados:
+            asignados.setdefault(tarjeta_id, []).append(User(username=username or "?", id=usuario_id))
+
+        listas = {}
+        for i, t, p, siguiente, id_siguiente, sin_cargar, c in filas_listas:
+            listas[i] = TrelloLista(titulo=t, tablero_id=board_id, posicion=p, id=i, created_at=_fecha(c))
+            # Una columna cargada a medias vuelve a medias: con su botón de "cargar más" y su límite de rangos
+            listas[i].fijar_siguiente(None if siguiente is None else (siguiente, id_siguiente or ""))
+            listas[i].tarjetas_sin_cargar = sin_cargar or 0
+        for i, lista_id, t, d, p, c in filas_tarjetas:
+            lista = listas.get(lista_id)
+            if lista is None:
+                continue
+            card = Tarjeta(
+                titulo=t, lista_id=lista_id, descripcion=d or "", posicion=p, id=i, created_at=_fecha(c),
+                descripcion_cargada=d is not None,
+            )
+            card.assignees = asignados.get(i, [])
+            lista.add_card(card)
+        return list(listas.values())
+
+    def guardar_listas(self, board_id: str, listas: List[TrelloLista]):
+        filas_listas, filas_tarjetas, filas_asignados = [], [], []
+        for l in listas:
+            filas_listas.append(
+                (l.id, board_id, l.titulo, l.posicion, l.posicion_siguiente, l.id_siguiente, l.tarjetas_sin_cargar,
+                 l.created_at.isoformat())
+            )
+            for c in l.cards:
+                filas_tarjetas.append(
+                    (c.id, board_id, l.id, c.titulo, c.descripcion if c.descripcion_cargada else None,
+                     c.posicion, c.created_at.isoformat())
+                )
+                for orden, u in enumerate(getattr(c, "assignees", [])):
+                    filas_asignados.append((board_id, c.id, u.id, u.username, orden))
+
+        with self._lock, self._conexion:
+            for tabla in ("listas", "tarjetas", "asignados"):
+                self._conexion.execute(f"DELETE FROM {tabla} WHERE tablero_id = ?", (board_id,))
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO listas "
+                "(id, tablero_id, titulo, posicion, posicion_siguiente, id_siguiente, tarjetas_sin_cargar, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                filas_listas,
+            )
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO tarjetas (id, tablero_id, lista_id, titulo, descripcion, posicion, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                filas_tarjetas,
+            )
+            self._conexion.executemany(
+                "INSERT INTO asignados (tablero_id, tarjeta_id, usuario_id, username, orden) VALUES (?, ?, ?, ?, ?)",
+                filas_asignados,
+            )
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO tableros_cacheados (tablero_id, guardado_en) VALUES (?, ?)",
+                (board_id, datetime.now().isoformat()),
+            )
+
+    def olvidar_tablero(self, board_id: str):
+        with self._lock, self._conexion:
+            for tabla in ("listas", "tarjetas", "asignados"):
+                self._conexion.execute(f"DELETE FROM {tabla} WHERE tablero_id = ?", (board_id,))
+            self._conexion.execute("DELETE FROM tableros_cacheados WHERE tablero_id = ?", (board_id,))
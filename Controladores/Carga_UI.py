@@ -0,0 +1,64 @@
+import hashlib
+import importlib.util
+import io
+import os
+from glob import glob
+
+from Controladores.Cache_Local import directorio_datos
+
+
+def _directorio_compiladas() -> str:
+    ruta = os.path.join(directorio_datos(), "ui_compiladas")
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def _compilar(ruta_ui: str, destino: str):
+    # uic (y su compilador) solo se importan cuando hay que regenerar un módulo
+    from PyQt5 import uic
+
+    salida = io.StringIO()
+    with open(ruta_ui, "r", encoding="utf-8") as f:
+        uic.compileUi(f, salida)
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(salida.getvalue())
+    os.replace(temporal, destino)
+
+
+def clase_ui(ruta_ui: str):
+    # Clase Ui_* generada desde el .ui. El nombre del módulo lleva la huella del contenido:
+    # si el .ui cambia se compila uno nuevo y los anteriores se borran.
+    with open(ruta_ui, "rb") as f:
+        huella = hashlib.sha1(f.read()).hexdigest()[:12]
+    base = f"ui_{os.path.splitext(os.path.basename(ruta_ui))[0]}"
+    directorio = _directorio_compiladas()
+    destino = os.path.join(directorio, f"{base}_{huella}.py")
+    if not os.path.exists(destino):
+        for viejo in glob(os.path.join(directorio, f"{base}_*.py")):
+            os.remove(viejo)
+        _compilar(ruta_ui, destino)
+
+    spec = importlib.util.spec_from_file_location(f"{base}_{huella}", destino)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return next(v for k, v in vars(modulo).items() if k.startswith("Ui_"))
+
+
+def cargar_ui(widget, ruta_ui: str):
+    # Como uic.loadUi(ruta_ui, widget), pero con el módulo ya compilado y su .pyc: sin parsear
+    # XML en cada arranque. Los hijos quedan como atributos del widget igual que con loadUi.
+    if not os.path.exists(ruta_ui):
+        raise FileNotFoundError(ruta_ui)
+    try:
+        clase = clase_ui(ruta_ui)
+    except Exception as e:
+        print(f"No se pudo usar la interfaz compilada de {ruta_ui}: {e}")
+        from PyQt5 import uic
+
+        uic.loadUi(ruta_ui, widget)
+        return
+    ui = clase()
+    ui.setupUi(widget)
+    for nombre, valor in vars(ui).items():
+        setattr(widget, nombre, valor)
@@ -0,0 +1,226 @@
+from typing import Any, Callable, List, Optional, Tuple
+
+from PyQt5 import QtCore
+
+from Controladores.Almacen_Datos import AlmacenDatos
+from Controladores.Diario_Offline import LLAMADAS_DIARIO, DiarioOffline
+from Controladores.Tareas import GestorTareas
+
+# Sin conexión, cada cuánto se intenta reproducir el diario aunque no haya escrituras nuevas
+INTERVALO_REINTENTO_MS = 15000
+
+
+class _Entrada:
+    def __init__(
+        self,
+        tabla: Optional[str] = None,
+        fila: Optional[dict] = None,
+        funcion: Optional[Callable] = None,
+        llamada: Optional[Tuple[str, list]] = None,
+        filas: Optional[List[dict]] = None,
+    ):
+        self.tabla = tabla
+        self.fila = fila
+        self.funcion = funcion
+        # Filas de guardar_filas(): un upsert que no se parte ni se fusiona con otras entradas
+        self.filas = filas
+        # (método del almacén, pares) si la llamada puede esperar en el diario
+        self.llamada = llamada
+        self.callbacks: List[Callable[[Any], None]] = []
+
+
+def _agrupar_tramos(lote: List[_Entrada]) -> List[List[_Entrada]]:
+    # Filas seguidas de la misma tabla van en un solo upsert; cada llamada suelta es su propio tramo
+    tramos = []
+    for entrada in lote:
+        if tramos and entrada.funcion is None and tramos[-1][0].funcion is None and tramos[-1][0].tabla == entrada.tabla:
+            tramos[-1].append(entrada)
+        else:
+            tramos.append([entrada])
+    return tramos
+
+
+class ColaEscritura(QtCore.QObject):
+    # Escritura diferida delante del almacén (AlmacenDatos). Las filas completas de una misma
+    # tabla se fusionan por id mientras esperan y se envían juntas en un upsert, cada poco
+    # tiempo o al llegar a `max_entradas`. El orden entre tablas y llamadas se respeta
+    # (crear una lista y luego sus tarjetas), y si un tramo falla también fallan los siguientes.
+    # Con un `diario`, lo que falla por la red no se deshace: se anota en él y se reproduce
+    # antes de cada escritura posterior (y cada INTERVALO_REINTENTO_MS) hasta que vuelve la red.
+    pendientes_cambiado = QtCore.pyqtSignal(int)
+    # Mensajes de los conflictos encontrados al reproducir el diario
+    conflictos_diario = QtCore.pyqtSignal(list)
+
+    def __init__(
+        self,
+        db_controller: AlmacenDatos,
+        gestor: GestorTareas,
+        intervalo_ms: int = 300,
+        max_entradas: int = 50,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.db = db_controller
+        self.gestor = gestor
+        self.max_entradas = max_entradas
+        self._cola: List[_Entrada] = []
+        self._en_vuelo = 0
+        self._lotes_en_vuelo = 0
+        self.diario: Optional[DiarioOffline] = None
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(intervalo_ms)
+        self._timer.timeout.connect(self.vaciar)
+
+        self._timer_diario = QtCore.QTimer(self)
+        self._timer_diario.setSingleShot(True)
+        self._timer_diario.setInterval(INTERVALO_REINTENTO_MS)
+        self._timer_diario.timeout.connect(self.vaciar)
+
+    def usar_diario(self, diario: Optional[DiarioOffline]):
+        # El diario es de un usuario: se cambia al cambiar de sesión. Si trae escrituras de
+        # una sesión anterior se reproducen en cuanto se pueda.
+        if diario is self.diario:
+            return
+        self.diario = diario
+        self.pendientes_cambiado.emit(self.pendientes())
+        if self.en_diario():
+            self.vaciar()
+
+    def guardar(self, tabla: str, fila: dict, al_terminar: Optional[Callable[[Any], None]] = None):
+        entrada = self._fusionable(tabla, fila["id"])
+        if entrada is None:
+            entrada = _Entrada(tabla=tabla, fila=dict(fila))
+            self._cola.append(entrada)
+        else:
+            entrada.fila.update(fila)
+        if al_terminar:
+            entrada.callbacks.append(al_terminar)
+        self._programar()
+
+    def ejecutar(self, funcion: Callable[[], Any], al_terminar: Optional[Callable[[Any], None]] = None):
+        entrada = _Entrada(funcion=funcion)
+        if al_terminar:
+            entrada.callbacks.append(al_terminar)
+        self._cola.append(entrada)
+        self._programar()
+
+    def guardar_filas(self, tabla: str, filas: List[dict], al_terminar: Optional[Callable[[Any], None]] = None):
+        # Varias filas que se confirman o fallan juntas (p. ej. repartir una lista entera): van
+        # en un único upsert aunque superen `max_entradas`, con un solo resultado para todas
+        filas = [dict(f) for f in filas]
+        entrada = _Entrada(tabla=tabla, funcion=lambda: self.db.guardar_filas(tabla, filas), filas=filas)
+        if al_terminar:
+            entrada.callbacks.append(al_terminar)
+        self._cola.append(entrada)
+        self._programar()
+
+    def llamar(self, metodo: str, pares: List[Tuple[str, str]], al_terminar: Optional[Callable[[Any], None]] = None):
+        # Como ejecutar(), para una llamada del almacén que sin conexión puede esperar en el diario
+        entrada = _Entrada(funcion=lambda: getattr(self.db, metodo)(pares), llamada=(metodo, pares))
+        if al_terminar:
+            entrada.callbacks.append(al_terminar)
+        self._cola.append(entrada)
+        self._programar()
+
+    def pendientes(self) -> int:
+        return len(self._cola) + self._en_vuelo + self.en_diario()
+
+    def en_diario(self) -> int:
+        return self.diario.pendientes() if self.diario else 0
+
+    def vaciar(self):
+        self._timer.stop()
+        self._timer_diario.stop()
+        # Sin nada nuevo solo se lanza si hay diario que reproducir y ningún lote lo va a hacer ya
+        if not self._cola and (not self.en_diario() or self._lotes_en_vuelo):
+            return
+        lote, self._cola = self._cola, []
+        self._en_vuelo += len(lote)
+        self._lotes_en_vuelo += 1
+        self.gestor.ejecutar(
+            self._escribir,
+            _agrupar_tramos(lote),
+            al_terminar=lambda resultado: self._al_escribir(lote, *resultado),
+            al_fallar=lambda _: self._al_escribir(lote, [], []),
+        )
+
+    def _fusionable(self, tabla: str, fila_id: str) -> Optional[_Entrada]:
+        # Solo se fusiona dentro del último tramo de esa tabla: adelantar una fila por
+        # delante de otra tabla podría romper una dependencia (p. ej. mover a una lista nueva)
+        for entrada in reversed(self._cola):
+            if entrada.funcion is not None or entrada.tabla != tabla:
+                return None
+            if entrada.fila["id"] == fila_id:
+                return entrada
+        return None
+
+    def _programar(self):
+        self.pendientes_cambiado.emit(self.pendientes())
+        if len(self._cola) >= self.max_entradas:
+            self.vaciar()
+        elif not self._timer.isActive():
+            self._timer.start()
+
+    def _escribir(self, tramos: List[List[_Entrada]]) -> Tuple[list, List[str]]:
+        # Se ejecuta en el hilo de escrituras; devuelve un resultado por entrada confirmada (o
+        # anotada en el diario) y los conflictos del diario. Lo anotado antes va primero: si no
+        # se puede reproducir entero, lo nuevo se anota detrás para no adelantarlo.
+        diario = self.diario
+        en_linea, conflictos = diario.reproducir(self.db) if diario else (True, [])
+        resultados = []
+        for tramo in tramos:
+            if en_linea:
+                self.db.limpiar_error()
+                confirmados = self._escribir_tramo(tramo)
+                if confirmados is not None:
+                    resultados.extend(confirmados)
+                    continue
+                if not (diario and self.db.fallo_de_conexion()):
+                    break
+                en_linea = False
+            if not self._anotar(diario, tramo):
+                break
+            resultados.extend([True] * len(tramo))
+        return resultados, conflictos
+
+    def _escribir_tramo(self, tramo: List[_Entrada]) -> Optional[list]:
+        if tramo[0].funcion is not None:
+            resultado = tramo[0].funcion()
+            return [resultado] if resultado else None
+        if not self.db.guardar_filas(tramo[0].tabla, [e.fila for e in tramo]):
+            return None
+        return [True] * len(tramo)
+
+    @staticmethod
+    def _anotar(diario: DiarioOffline, tramo: List[_Entrada]) -> bool:
+        # Las llamadas sueltas (restaurar, que además lee) no pueden esperar: fallan como siempre
+        entrada = tramo[0]
+        if entrada.funcion is None:
+            diario.anotar_filas(entrada.tabla, [e.fila for e in tramo])
+            return True
+        if entrada.filas is not None:
+            diario.anotar_filas(entrada.tabla, entrada.filas)
+            return True
+        if entrada.llamada and entrada.llamada[0] in LLAMADAS_DIARIO:
+            diario.anotar_llamada(*entrada.llamada)
+            return True
+        return False
+
+    def _al_escribir(self, lote: List[_Entrada], resultados: list, conflictos: List[str]):
+        self._en_vuelo -= len(lote)
+        self._lotes_en_vuelo -= 1
+        self.pendientes_cambiado.emit(self.pendientes())
+        if conflictos:
+            self.conflictos_diario.emit(conflictos)
+        if self.en_diario() and not self._cola:
+            self._timer_diario.start()
+
+        for entrada, resultado in zip(lote, resultados):
+            for callback in entrada.callbacks:
+                callback(resultado)
+        # Lo no confirmado se deshace en orden inverso para que cada paso encuentre su estado previo
+        for entrada in reversed(lote[len(resultados):]):
+            for callback in reversed(entrada.callbacks):
+                callback(None)
@@ -1,15 +1,19 @@
 import os
-from typing import List, Optional
-from datetime import datetime
-import re
-
-try:
-    from supabase import create_client, Client
-except ImportError:
-    create_client = None
-    Client = None
-
-from Controladores.Modelos import Tablero, TrelloLista, Tarjeta, User
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+# supabase (y con él httpx, gotrue, postgrest...) se importa al crear el cliente, no al arrancar
+if TYPE_CHECKING:
+    from supabase import Client
+
+from Controladores.Modelos import CambiosTablero, Tablero, TrelloLista, Tarjeta, User
+from Controladores.Almacen_Datos import (
+    TAM_PAGINA_TARJETAS,
+    AlmacenDatos,
+    CursorPagina,
+    cursor_tarjeta,
+    parse_supabase_datetime,
+)
 
 try:
     from Controladores.KEYBD import Config
@@ -19,42 +23,59 @@ except ImportError:
     SUPABASE_URL_DEFAULT = None
     SUPABASE_KEY_DEFAULT = None
 
+# Proyección de tarjeta para pintar el tablero: sin descripción, para que el tamaño de la
+# respuesta no crezca con ella, y con los ids de sus asignados embebidos (sin consultas N+1).
+# Los nombres salen del directorio de usuarios en memoria, no de cada fila.
+SELECT_TARJETA_LIGERA = "id, lista_id, titulo, posicion, eliminada, created_at, tarjeta_usuarios(usuario_id)"
+# Tope de ids por filtro in_(): van en la URL y PostgREST tiene límite de longitud
+MAX_IDS_POR_CONSULTA = 200
 
-def parse_supabase_datetime(date_string: str) -> datetime:
-    if not date_string:
-        return datetime.now()
-    try:
-        date_string = date_string.replace("Z", "+00:00")
-        pattern = r"(\.\d+)([+-]\d{2}:\d{2})"
-        match = re.search(pattern, date_string)
-        if match:
-            microseconds = match.group(1)
-            timezone = match.group(2)
-            micros_digits = microseconds[1:]
-            if len(micros_digits) < 6:
-                micros_digits = micros_digits.ljust(6, "0")
-            elif len(micros_digits) > 6:
-                micros_digits = micros_digits[:6]
-            base_date = date_string[: match.start()]
-            date_string = f"{base_date}.{micros_digits}{timezone}"
-        return datetime.fromisoformat(date_string)
-    except Exception:
-        return datetime.now()
-
-
-class SupabaseController:
+
+class SupabaseController(AlmacenDatos):
     def __init__(self, url: str = None, key: str = None):
+        super().__init__()
         self.url = url or SUPABASE_URL_DEFAULT or os.environ.get("SUPABASE_URL")
         self.key = key or SUPABASE_KEY_DEFAULT or os.environ.get("SUPABASE_KEY")
-        self.client: Optional[Client] = None
-        self.current_user = None
-
-        if self.url and self.key and create_client:
+        # El cliente se crea con el primer uso (ver `client`), no al construir el controlador
+        self._client: Optional["Client"] = None
+        self._conexion_intentada = False
+        self._lock_conexion = threading.Lock()
+
+    @property
+    def client(self) -> Optional["Client"]:
+        if not self._conexion_intentada:
+            with self._lock_conexion:
+                if not self._conexion_intentada:
+                    self._conectar()
+        return self._client
+
+    @client.setter
+    def client(self, cliente: Optional["Client"]):
+        self._client = cliente
+        self._conexion_intentada = True
+
+    def _conectar(self):
+        # Un solo cliente por controlador: reutiliza la sesión HTTP (keep-alive) y el token
+        if self.url and self.key:
             try:
-                self.client = create_client(self.url, self.key)
+                from supabase import create_client
+
+                self._client = create_client(self.url, self.key)
                 print("✓ Conexión a Supabase establecida correctamente")
             except Exception as e:
                 print(f"✗ Error conectando a Supabase: {e}")
+        self._conexion_intentada = True
+
+    def disponible(self) -> bool:
+        return self.client is not None
+
+    def error_de_conexion(self, e: Exception) -> bool:
+        # postgrest deja pasar los errores de transporte de httpx (sin red, DNS, timeouts)
+        try:
+            import httpx
+        except ImportError:
+            return super().error_de_conexion(e)
+        return super().error_de_conexion(e) or isinstance(e, httpx.TransportError)
 
     # ===== AUTENTICACIÓN =====
     def registrar_usuario(self, email: str, password: str, username: str = None) -> dict:
@@ -71,6 +92,7 @@ class SupabaseController:
                 except Exception:
                     pass
                 self.current_user = response.user
+                self.usuarios.invalidar()
                 return {"success": True, "user": response.user, "session": response.session}
             return {"success": False, "error": "No se pudo crear el usuario"}
         except Exception as e:
@@ -83,6 +105,7 @@ class SupabaseController:
             response = self.client.auth.sign_in_with_password({"email": email, "password": password})
             if response.user:
                 self.current_user = response.user
+                self.usuarios.invalidar()
                 return {"success": True, "user": response.user, "session": response.session}
             return {"success": False, "error": "Credenciales inválidas"}
         except Exception as e:
@@ -94,6 +117,7 @@ class SupabaseController:
         try:
             self.client.auth.sign_out()
             self.current_user = None
+            self.usuarios.invalidar()
             return True
         except Exception:
             return False
@@ -118,57 +142,38 @@ class SupabaseController:
 
     # ===== TABLEROS =====
     def obtener_tableros(self) -> List[Tablero]:
+        # Solo el recuento de tarjetas vivas por lista (agregado en el servidor): la respuesta
+        # crece con el número de listas, no con el de tarjetas, y no se construye ninguna
         if not self.client:
             return []
         try:
             response = (
                 self.client.table("tableros")
-                .select("*, listas(id, eliminada, tarjetas(id, eliminada))")
+                .select("*, listas(total:tarjetas(count))")
                 .eq("eliminada", False)
+                .eq("listas.eliminada", False)
+                .eq("listas.total.eliminada", False)
                 .order("created_at")
                 .execute()
             )
-            
+
             boards = []
             for d in response.data:
-                board = Tablero(
-                    titulo=d["titulo"],
-                    es_publico=d.get("es_publico", False),
-                    id=d["id"],
-                    created_at=parse_supabase_datetime(d.get("created_at")),
-                )
-                
-                raw_lists = d.get('listas', [])
-                for l_data in raw_lists:
-                    if l_data.get('eliminada') is True: 
-                        continue
-                    
-                    lista_temp = TrelloLista(
-                        titulo="temp", 
-                        tablero_id=board.id, 
-                        posicion=0, 
-                        id=l_data['id']
+                boards.append(
+                    Tablero(
+                        titulo=d["titulo"],
+                        es_publico=d.get("es_publico", False),
+                        id=d["id"],
+                        created_at=parse_supabase_datetime(d.get("created_at")),
+                        num_tarjetas=sum(
+                            ((l.get("total") or [{}])[0].get("count") or 0) for l in d.get("listas") or []
+                        ),
                     )
-                    
-                    raw_cards = l_data.get('tarjetas', [])
-                    for c_data in raw_cards:
-                        if c_data.get('eliminada') is True:
-                            continue
-                            
-                        card_temp = Tarjeta(
-                            titulo="temp",
-                            lista_id=lista_temp.id,
-                            id=c_data['id']
-                        )
-                        lista_temp.cards.append(card_temp)
-                    
-                    board.lists.append(lista_temp)
-                
-                boards.append(board)
+                )
             return boards
-            
+
         except Exception as e:
-            print(f"Error obteniendo tableros: {e}")
+            self._registrar_error("Error obteniendo tableros", e)
             return []
 
     def crear_tablero(self, titulo: str, es_publico: bool = False) -> Optional[Tablero]:
@@ -186,7 +191,7 @@ class SupabaseController:
                     created_at=parse_supabase_datetime(d.get("created_at")),
                 )
         except Exception as e:
-            print(f"Error creando tablero: {e}")
+            self._registrar_error("Error creando tablero", e)
         return None
 
     def eliminar_tablero(self, board_id: str) -> bool:
@@ -196,40 +201,35 @@ class SupabaseController:
             self.client.table("tableros").update({"eliminada": True}).eq("id", board_id).execute()
             return True
         except Exception as e:
-            print(f"Error enviando tablero a papelera: {e}")
+            self._registrar_error("Error enviando tablero a papelera", e)
             return False
 
     # ===== LISTAS =====
     def obtener_listas(self, board_id: str) -> List[TrelloLista]:
+        # Hidrata el tablero (listas, primera página de tarjetas de cada una con sus asignados y
+        # el total real de tarjetas por lista) en una sola consulta embebida
         if not self.client:
             return []
         try:
             response = (
                 self.client.table("listas")
-                .select("*")
+                .select(f"*, tarjetas({SELECT_TARJETA_LIGERA}), total:tarjetas(count)")
                 .eq("tablero_id", board_id)
                 .eq("eliminada", False)
+                .eq("tarjetas.eliminada", False)
+                .eq("total.eliminada", False)
                 .order("posicion")
+                .order("posicion", foreign_table="tarjetas")
+                .order("id", foreign_table="tarjetas")
+                .limit(TAM_PAGINA_TARJETAS + 1, foreign_table="tarjetas")
                 .execute()
             )
-
-            lists: List[TrelloLista] = []
-            for d in response.data:
-                t_list = TrelloLista(
-                    titulo=d["titulo"],
-                    tablero_id=d["tablero_id"],
-                    posicion=d.get("posicion", 0),
-                    id=d["id"],
-                    created_at=parse_supabase_datetime(d.get("created_at")),
-                )
-                t_list.cards = self.obtener_tarjetas(t_list.id)
-                lists.append(t_list)
-            return lists
+            return [self._lista_paginada(d) for d in response.data]
         except Exception as e:
-            print(f"Error obteniendo listas: {e}")
+            self._registrar_error("Error obteniendo listas", e)
             return []
 
-    def crear_lista(self, board_id: str, titulo: str, posicion: int) -> Optional[TrelloLista]:
+    def crear_lista(self, board_id: str, titulo: str, posicion: float, list_id: Optional[str] = None) -> Optional[TrelloLista]:
         if not self.client:
             return None
         try:
@@ -239,6 +239,9 @@ class SupabaseController:
                 "posicion": posicion,
                 "eliminada": False,
             }
+            # Id generado en el cliente para poder pintar la lista antes de que responda el servidor
+            if list_id:
+                data["id"] = list_id
             response = self.client.table("listas").insert(data).execute()
             if response.data:
                 d = response.data[0]
@@ -250,7 +253,7 @@ class SupabaseController:
                     created_at=parse_supabase_datetime(d.get("created_at")),
                 )
         except Exception as e:
-            print(f"Error creando lista/columna: {e}")
+            self._registrar_error("Error creando lista/columna", e)
         return None
 
     def eliminar_lista(self, list_id: str) -> bool:
@@ -260,7 +263,7 @@ class SupabaseController:
             self.client.table("listas").update({"eliminada": True}).eq("id", list_id).execute()
             return True
         except Exception as e:
-            print(f"Error enviando lista a papelera: {e}")
+            self._registrar_error("Error enviando lista a papelera", e)
             return False
 
     def actualizar_lista(self, list_id: str, titulo: str = None) -> bool:
@@ -272,7 +275,7 @@ class SupabaseController:
             self.client.table("listas").update({"titulo": titulo}).eq("id", list_id).execute()
             return True
         except Exception as e:
-            print(f"Error actualizando lista: {e}")
+            self._registrar_error("Error actualizando lista", e)
             return False
 
     # ===== TARJETAS =====
@@ -282,31 +285,57 @@ class SupabaseController:
         try:
             response = (
                 self.client.table("tarjetas")
-                .select("*")
+                .select(SELECT_TARJETA_LIGERA)
                 .eq("lista_id", list_id)
                 .eq("eliminada", False)
                 .order("posicion")
                 .execute()
             )
-
-            cards: List[Tarjeta] = []
-            for d in response.data:
-                card = Tarjeta(
-                    titulo=d["titulo"],
-                    lista_id=d["lista_id"],
-                    descripcion=d.get("descripcion", ""),
-                    posicion=d.get("posicion", 0),
-                    id=d["id"],
-                    created_at=parse_supabase_datetime(d.get("created_at")),
-                )
-                card.assignees = self.obtener_asignados_tarjeta(card.id)
-                cards.append(card)
-            return cards
+            return self._tarjetas_desde_filas(response.data)
         except Exception as e:
-            print(f"Error obteniendo tarjetas: {e}")
+            self._registrar_error("Error obteniendo tarjetas", e)
             return []
 
-    def crear_tarjeta(self, list_id: str, titulo: str, descripcion: str, posicion: int) -> Optional[Tarjeta]:
+    def obtener_pagina_tarjetas(
+        self, list_id: str, desde: Optional[CursorPagina] = None
+    ) -> Optional[Tuple[List[Tarjeta], Optional[CursorPagina], Optional[int]]]:
+        # Página de tarjetas con (posicion, id) >= desde, en orden. Devuelve (tarjetas, cursor de
+        # la siguiente o None si no hay más, total de la lista solo al pedir la primera página).
+        # Se pide una de más para saber si hay siguiente sin contar toda la lista cada vez.
+        if not self.client:
+            return None
+        try:
+            consulta = (
+                self.client.table("tarjetas")
+                .select(SELECT_TARJETA_LIGERA, count="exact" if desde is None else None)
+                .eq("lista_id", list_id)
+                .eq("eliminada", False)
+            )
+            if desde is not None:
+                posicion, card_id = desde
+                consulta = consulta.or_(f"posicion.gt.{posicion!r},and(posicion.eq.{posicion!r},id.gte.{card_id})")
+            response = consulta.order("posicion").order("id").limit(TAM_PAGINA_TARJETAS + 1).execute()
+            tarjetas = self._tarjetas_desde_filas(response.data)
+            siguiente = cursor_tarjeta(tarjetas[TAM_PAGINA_TARJETAS]) if len(tarjetas) > TAM_PAGINA_TARJETAS else None
+            return tarjetas[:TAM_PAGINA_TARJETAS], siguiente, response.count
+        except Exception as e:
+            self._registrar_error("Error obteniendo tarjetas", e)
+            return None
+
+    def obtener_descripcion_tarjeta(self, card_id: str) -> Optional[str]:
+        # None si falla, para no confundirlo con una descripción vacía
+        if not self.client:
+            return None
+        try:
+            response = self.client.table("tarjetas").select("descripcion").eq("id", card_id).execute()
+            return (response.data[0].get("descripcion") or "") if response.data else ""
+        except Exception as e:
+            self._registrar_error("Error obteniendo descripcion", e)
+            return None
+
+    def crear_tarjeta(
+        self, list_id: str, titulo: str, descripcion: str, posicion: float, card_id: Optional[str] = None
+    ) -> Optional[Tarjeta]:
         if not self.client:
             return None
         try:
@@ -317,6 +346,8 @@ class SupabaseController:
                 "posicion": posicion,
                 "eliminada": False,
             }
+            if card_id:
+                data["id"] = card_id
             response = self.client.table("tarjetas").insert(data).execute()
             if response.data:
                 d = response.data[0]
@@ -331,7 +362,7 @@ class SupabaseController:
                 card.assignees = []
                 return card
         except Exception as e:
-            print(f"Error creando tarjeta: {e}")
+            self._registrar_error("Error creando tarjeta", e)
         return None
 
     def eliminar_tarjeta(self, card_id: str) -> bool:
@@ -341,7 +372,7 @@ class SupabaseController:
             self.client.table("tarjetas").update({"eliminada": True}).eq("id", card_id).execute()
             return True
         except Exception as e:
-            print(f"Error enviando a papelera: {e}")
+            self._registrar_error("Error enviando a papelera", e)
             return False
 
     def actualizar_tarjeta(self, card_id: str, titulo: str = None, descripcion: str = None) -> bool:
@@ -358,70 +389,90 @@ class SupabaseController:
             self.client.table("tarjetas").update(data).eq("id", card_id).execute()
             return True
         except Exception as e:
-            print(f"Error actualizando tarjeta: {e}")
+            self._registrar_error("Error actualizando tarjeta", e)
             return False
 
-    def actualizar_posicion_tarjeta(self, card_id: str, new_list_id: str, new_position: int) -> bool:
+    def actualizar_posicion_tarjeta(self, card_id: str, new_list_id: str, new_position: float) -> bool:
         if not self.client:
             return False
         try:
             self.client.table("tarjetas").update({"lista_id": new_list_id, "posicion": new_position}).eq("id", card_id).execute()
             return True
         except Exception as e:
-            print(f"Error moviendo tarjeta: {e}")
+            self._registrar_error("Error moviendo tarjeta", e)
             return False
 
     # ===== USUARIOS / ASIGNACIONES =====
-    def obtener_todos_usuarios(self) -> List[User]:
+    def _leer_usuarios(self) -> Optional[List[User]]:
         if not self.client:
-            return []
+            return None
         try:
-            response = self.client.table("usuarios").select("*").execute()
-            return [User(username=d.get("username", "?"), id=d["id"]) for d in response.data]
+            response = self.client.table("usuarios").select("id, username").execute()
+            return [User(username=d.get("username") or "?", id=d["id"]) for d in response.data]
         except Exception as e:
-            print(f"Error obteniendo usuarios: {e}")
-            return []
+            self._registrar_error("Error obteniendo usuarios", e)
+            return None
 
-    def asignar_usuario_tarjeta(self, card_id: str, user_id: str) -> bool:
+    def asignar_usuarios(self, pares: Iterable[Tuple[str, str]]) -> bool:
+        # Todas las parejas (tarjeta, usuario) en un único upsert; las que ya existían se ignoran
         if not self.client:
             return False
+        filas = [{"tarjeta_id": card_id, "usuario_id": user_id} for card_id, user_id in dict.fromkeys(pares)]
+        if not filas:
+            return True
         try:
-            self.client.table("tarjeta_usuarios").insert({"tarjeta_id": card_id, "usuario_id": user_id}).execute()
+            (
+                self.client.table("tarjeta_usuarios")
+                .upsert(filas, on_conflict="tarjeta_id,usuario_id", ignore_duplicates=True)
+                .execute()
+            )
             return True
         except Exception as e:
-            if "unique" not in str(e).lower():
-                print(f"Error asignando: {e}")
+            self._registrar_error("Error asignando", e)
             return False
 
-    def desasignar_usuario_tarjeta(self, card_id: str, user_id: str) -> bool:
+    def desasignar_usuarios(self, pares: Iterable[Tuple[str, str]]) -> bool:
+        # Un único delete: in_() si todas son del mismo usuario (el caso habitual), si no or_()
         if not self.client:
             return False
+        pares = list(dict.fromkeys(pares))
+        if not pares:
+            return True
         try:
-            self.client.table("tarjeta_usuarios").delete().match({"tarjeta_id": card_id, "usuario_id": user_id}).execute()
+            consulta = self.client.table("tarjeta_usuarios").delete()
+            usuarios = {user_id for _, user_id in pares}
+            if len(usuarios) == 1:
+                consulta = consulta.eq("usuario_id", usuarios.pop()).in_("tarjeta_id", [c for c, _ in pares])
+            else:
+                consulta = consulta.or_(
+                    ",".join(f"and(tarjeta_id.eq.{card_id},usuario_id.eq.{user_id})" for card_id, user_id in pares)
+                )
+            consulta.execute()
             return True
         except Exception as e:
-            print(f"Error desasignando: {e}")
+            self._registrar_error("Error desasignando", e)
             return False
 
-    def obtener_asignados_tarjeta(self, card_id: str) -> List[User]:
-        if not self.client:
-            return []
+    def obtener_asignados_tarjetas(self, card_ids: Iterable[str]) -> Dict[str, List[User]]:
+        # Asignados de muchas tarjetas con una consulta in_() por cada MAX_IDS_POR_CONSULTA ids
+        card_ids = list(dict.fromkeys(card_ids))
+        if not self.client or not card_ids:
+            return {}
         try:
-            response = (
-                self.client.table("tarjeta_usuarios")
-                .select("usuario_id, usuarios(username)")
-                .eq("tarjeta_id", card_id)
-                .execute()
-            )
-            users: List[User] = []
-            for item in response.data:
-                udata = item.get("usuarios")
-                if udata:
-                    users.append(User(username=udata.get("username", "?"), id=item["usuario_id"]))
-            return users
+            filas_por_tarjeta: Dict[str, List[dict]] = {card_id: [] for card_id in card_ids}
+            for i in range(0, len(card_ids), MAX_IDS_POR_CONSULTA):
+                response = (
+                    self.client.table("tarjeta_usuarios")
+                    .select("tarjeta_id, usuario_id")
+                    .in_("tarjeta_id", card_ids[i:i + MAX_IDS_POR_CONSULTA])
+                    .execute()
+                )
+                for d in response.data:
+                    filas_por_tarjeta[d["tarjeta_id"]].append(d)
+            return {card_id: self._asignados_desde_filas(filas) for card_id, filas in filas_por_tarjeta.items()}
         except Exception as e:
-            print(f"Error obteniendo asignados: {e}")
-            return []
+            self._registrar_error("Error obteniendo asignados", e)
+            return {}
 
     # ===== PAPELERA TARJETAS =====
     def obtener_papelera(self, board_id: str) -> List[Tarjeta]:
@@ -449,7 +500,7 @@ class SupabaseController:
                 )
             return cards
         except Exception as e:
-            print(f"Error obteniendo papelera: {e}")
+            self._registrar_error("Error obteniendo papelera", e)
             return []
 
     def restaurar_tarjeta(self, card_id: str) -> bool:
@@ -459,7 +510,7 @@ class SupabaseController:
             self.client.table("tarjetas").update({"eliminada": False}).eq("id", card_id).execute()
             return True
         except Exception as e:
-            print(f"Error restaurando tarjeta: {e}")
+            self._registrar_error("Error restaurando tarjeta", e)
             return False
 
     def eliminar_tarjeta_definitivamente(self, card_id: str) -> bool:
@@ -469,7 +520,7 @@ class SupabaseController:
             self.client.table("tarjetas").delete().eq("id", card_id).execute()
             return True
         except Exception as e:
-            print(f"Error eliminando definitivamente: {e}")
+            self._registrar_error("Error eliminando definitivamente", e)
             return False
 
     # ===== PAPELERA TABLEROS =====
@@ -480,7 +531,7 @@ class SupabaseController:
             response = self.client.table("tableros").select("*").eq("eliminada", True).execute()
             return [Tablero(titulo=d["titulo"], id=d["id"]) for d in response.data]
         except Exception as e:
-            print(f"Error obteniendo papelera tableros: {e}")
+            self._registrar_error("Error obteniendo papelera tableros", e)
             return []
 
     def restaurar_tablero(self, board_id: str) -> bool:
@@ -526,7 +577,7 @@ class SupabaseController:
                 )
             return lists
         except Exception as e:
-            print(f"Error obteniendo papelera de listas: {e}")
+            self._registrar_error("Error obteniendo papelera de listas", e)
             return []
 
     def restaurar_lista(self, list_id: str) -> bool:
@@ -536,7 +587,7 @@ class SupabaseController:
             self.client.table("listas").update({"eliminada": False}).eq("id", list_id).execute()
             return True
         except Exception as e:
-            print(f"Error restaurando lista: {e}")
+            self._registrar_error("Error restaurando lista", e)
             return False
 
     def eliminar_lista_definitivamente(self, list_id: str) -> bool:
@@ -546,5 +597,123 @@ class SupabaseController:
             self.client.table("listas").delete().eq("id", list_id).execute()
             return True
         except Exception as e:
-            print(f"Error eliminando lista definitivamente: {e}")
-            return False
\ No newline at end of file
+            self._registrar_error("Error eliminando lista definitivamente", e)
+            return False
+
+    # ===== SINCRONIZACIÓN =====
+    # Requiere una columna updated_at en listas y tarjetas que el servidor mantenga en cada
+    # cambio, y que asignar o desasignar usuarios toque la de la tarjeta (ver README)
+    def cursor_cambios(self, board_id: str) -> Optional[str]:
+        # Marca de agua actual del tablero: el updated_at más reciente de sus listas y tarjetas
+        if not self.client:
+            return None
+        try:
+            listas = (
+                self.client.table("listas")
+                .select("updated_at")
+                .eq("tablero_id", board_id)
+                .order("updated_at", desc=True)
+                .limit(1)
+                .execute()
+            )
+            tarjetas = (
+                self.client.table("tarjetas")
+                .select("updated_at, listas!inner(tablero_id)")
+                .eq("listas.tablero_id", board_id)
+                .order("updated_at", desc=True)
+                .limit(1)
+                .execute()
+            )
+            marcas = [d["updated_at"] for d in listas.data + tarjetas.data if d.get("updated_at")]
+            return max(marcas, key=parse_supabase_datetime) if marcas else None
+        except Exception as e:
+            self._registrar_error("Error obteniendo cursor de cambios", e)
+            return None
+
+    def obtener_cambios(self, board_id: str, desde: Optional[str]) -> Optional[CambiosTablero]:
+        # Listas y tarjetas del tablero con updated_at >= desde, papelera incluida. Con >= se
+        # repiten las filas del propio cursor, pero aplicarlas otra vez no cambia nada.
+        # None si falla, para no avanzar el cursor.
+        if not self.client:
+            return None
+        try:
+            consulta_listas = (
+                self.client.table("listas")
+                .select(f"*, tarjetas({SELECT_TARJETA_LIGERA}), total:tarjetas(count)")
+                .eq("tablero_id", board_id)
+                .eq("tarjetas.eliminada", False)
+                .eq("total.eliminada", False)
+                .order("posicion", foreign_table="tarjetas")
+                .order("id", foreign_table="tarjetas")
+                .limit(TAM_PAGINA_TARJETAS + 1, foreign_table="tarjetas")
+            )
+            consulta_tarjetas = (
+                self.client.table("tarjetas")
+                .select(f"{SELECT_TARJETA_LIGERA}, listas!inner(tablero_id)")
+                .eq("listas.tablero_id", board_id)
+            )
+            if desde:
+                consulta_listas = consulta_listas.gte("updated_at", desde)
+                consulta_tarjetas = consulta_tarjetas.gte("updated_at", desde)
+            filas_listas = consulta_listas.execute().data
+            filas_tarjetas = consulta_tarjetas.execute().data
+
+            cambios = CambiosTablero(cursor=desde)
+            for d in filas_listas:
+                if d.get("eliminada"):
+                    cambios.listas_eliminadas.append(d["id"])
+                else:
+                    # Las tarjetas embebidas sirven si la lista es nueva para el cliente (restaurada)
+                    cambios.listas.append(self._lista_paginada(d))
+            for d in filas_tarjetas:
+                if d.get("eliminada"):
+                    cambios.tarjetas_eliminadas.append(d["id"])
+                else:
+                    cambios.tarjetas.append(self._tarjeta_desde_fila(d))
+
+            marcas = [d["updated_at"] for d in filas_listas + filas_tarjetas if d.get("updated_at")]
+            if marcas:
+                cambios.cursor = max(marcas + ([desde] if desde else []), key=parse_supabase_datetime)
+            return cambios
+        except Exception as e:
+            self._registrar_error("Error obteniendo cambios", e)
+            return None
+
+    # ===== ESCRITURA EN LOTE =====
+    def guardar_filas(self, tabla: str, filas: List[dict]) -> bool:
+        # Upsert de filas completas (mismas columnas en todas); lo usa la cola de escritura diferida
+        if not self.client:
+            return False
+        if not filas:
+            return True
+        # Un upsert exige las mismas columnas en todas las filas: las que no llevan alguna
+        # (tarjetas sin descripción cargada) van en otro
+        grupos = {}
+        for fila in filas:
+            grupos.setdefault(tuple(sorted(fila)), []).append(fila)
+        try:
+            for grupo in grupos.values():
+                self.client.table(tabla).upsert(grupo).execute()
+            return True
+        except Exception as e:
+            self._registrar_error(f"Error guardando {tabla}", e)
+            return False
+
+    def obtener_marcas(self, tabla: str, ids: Iterable[str]) -> Optional[Dict[str, str]]:
+        if not self.client:
+            return None
+        ids = list(dict.fromkeys(ids))
+        try:
+            marcas = {}
+            for i in range(0, len(ids), MAX_IDS_POR_CONSULTA):
+                response = (
+                    self.client.table(tabla)
+                    .select("id, updated_at")
+                    .in_("id", ids[i:i + MAX_IDS_POR_CONSULTA])
+                    .execute()
+                )
+                marcas.update((d["id"], d.get("updated_at")) for d in response.data)
+            return marcas
+        except Exception as e:
+            self._registrar_error(f"Error obteniendo marcas de {tabla}", e)
+            return None
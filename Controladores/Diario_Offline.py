@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from Controladores.Almacen_Datos import AlmacenDatos, parse_supabase_datetime
+
+# Llamadas del almacén que pueden esperar en el diario: reciben solo pares (tarjeta, usuario)
+LLAMADAS_DIARIO = ("asignar_usuarios", "desasignar_usuarios")
+NOMBRES_TABLA = {"listas": "Lista", "tarjetas": "Tarjeta"}
+
+
+def _ahora() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _agrupar(entradas: List[dict]) -> List[List[dict]]:
+    # Entradas seguidas de la misma tabla (o de la misma llamada) se reproducen juntas
+    tramos = []
+    for e in entradas:
+        clave = (e["tipo"], e.get("tabla") or e.get("metodo"))
+        if tramos and (tramos[-1][0]["tipo"], tramos[-1][0].get("tabla") or tramos[-1][0].get("metodo")) == clave:
+            tramos[-1].append(e)
+        else:
+            tramos.append([e])
+    return tramos
+
+
+def _describir(tabla: str, fila: dict) -> str:
+    return f"{NOMBRES_TABLA.get(tabla, tabla)} '{fila.get('titulo') or fila['id']}'"
+
+
+class DiarioOffline:
+    # Escrituras que no llegaron al servidor por falta de conexión, en un fichero de una
+    # entrada JSON por línea al que solo se añade (con fsync: sobrevive a cerrar la
+    # aplicación). Cada entrada lleva un número y la hora a la que se anotó; al confirmarse
+    # un tramo se añade una marca {"hecho": n} y cuando no queda nada pendiente el fichero
+    # se vacía. Se anota y se reproduce desde el hilo de escrituras; la interfaz solo cuenta.
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._pendientes: List[dict] = []
+        self._siguiente = 1
+        self._cargar()
+
+    def _cargar(self):
+        if not os.path.exists(self.ruta):
+            return
+        hecho, entradas = 0, []
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    d = json.loads(linea)
+                except ValueError:
+                    # La última línea puede haber quedado a medias si se cortó la escritura
+                    continue
+                if "hecho" in d:
+                    hecho = max(hecho, d["hecho"])
+                else:
+                    entradas.append(d)
+        self._pendientes = [e for e in entradas if e["n"] > hecho]
+        self._siguiente = max([hecho] + [e["n"] for e in entradas]) + 1
+
+    def pendientes(self) -> int:
+        with self._lock:
+            return len(self._pendientes)
+
+    def anotar_filas(self, tabla: str, filas: List[dict]):
+        self._anotar({"tipo": "filas", "tabla": tabla, "filas": filas})
+
+    def anotar_llamada(self, metodo: str, pares: List[Tuple[str, str]]):
+        if metodo not in LLAMADAS_DIARIO:
+            raise ValueError(f"{metodo} no se puede anotar en el diario")
+        self._anotar({"tipo": "llamada", "metodo": metodo, "pares": [list(p) for p in pares]})
+
+    def _anotar(self, entrada: dict):
+        with self._lock:
+            entrada["n"] = self._siguiente
+            entrada["en"] = _ahora()
+            self._escribir_linea(entrada)
+            self._siguiente += 1
+            self._pendientes.append(entrada)
+
+    def _escribir_linea(self, d: dict):
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(d, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _confirmar(self, hasta: int):
+        with self._lock:
+            self._pendientes = [e for e in self._pendientes if e["n"] > hasta]
+            if self._pendientes:
+                self._escribir_linea({"hecho": hasta})
+            else:
+                with open(self.ruta, "w", encoding="utf-8"):
+                    pass
+
+    # ===== REPRODUCCIÓN =====
+    def reproducir(self, db: AlmacenDatos) -> Tuple[bool, List[str]]:
+        # Envía lo pendiente en orden, un upsert por tramo de filas y una llamada por tramo de
+        # asignaciones. Devuelve (True si ya no queda nada, conflictos encontrados). Si la red
+        # vuelve a fallar se para y lo que falta se reintenta la próxima vez.
+        conflictos: List[str] = []
+        with self._lock:
+            pendientes = list(self._pendientes)
+        for tramo in _agrupar(pendientes):
+            if tramo[0]["tipo"] == "filas":
+                ok = self._reproducir_filas(db, tramo[0]["tabla"], tramo, conflictos)
+            else:
+                ok = self._reproducir_llamada(db, tramo[0]["metodo"], tramo, conflictos)
+            if not ok:
+                return False, conflictos
+            self._confirmar(tramo[-1]["n"])
+        return True, conflictos
+
+    def _reproducir_filas(self, db: AlmacenDatos, tabla: str, tramo: List[dict], conflictos: List[str]) -> bool:
+        # Las versiones de una misma fila se fusionan; cuenta la hora de la última
+        filas = {}
+        for e in tramo:
+            for fila in e["filas"]:
+                anterior = filas.get(fila["id"])
+                filas[fila["id"]] = ({**anterior[0], **fila} if anterior else dict(fila), e["en"])
+
+        db.limpiar_error()
+        marcas = db.obtener_marcas(tabla, list(filas))
+        if marcas is None:
+            if db.fallo_de_conexion():
+                return False
+            marcas = {}
+
+        aplicar = []
+        for fila_id, (fila, en) in filas.items():
+            marca = marcas.get(fila_id)
+            if marca is not None and parse_supabase_datetime(marca) > parse_supabase_datetime(en):
+                # Otro cliente la cambió después que aquí: gana la versión más reciente, la suya
+                conflictos.append(f"{_describir(tabla, fila)}: se cambió en el servidor después; se conserva esa versión")
+            elif fila_id in marcas or not fila.get("eliminada"):
+                aplicar.append(fila)
+        if not aplicar or db.guardar_filas(tabla, aplicar):
+            return True
+        if db.fallo_de_conexion():
+            return False
+
+        # El servidor rechaza el lote (p. ej. su lista ya no existe): fila a fila, para no perder las demás
+        for fila in aplicar:
+            db.limpiar_error()
+            if not db.guardar_filas(tabla, [fila]):
+                if db.fallo_de_conexion():
+                    return False
+                conflictos.append(f"{_describir(tabla, fila)}: el servidor la ha rechazado ({db.ultimo_error})")
+        return True
+
+    def _reproducir_llamada(self, db: AlmacenDatos, metodo: str, tramo: List[dict], conflictos: List[str]) -> bool:
+        pares = [tuple(p) for e in tramo for p in e["pares"]]
+        llamada = getattr(db, metodo)
+        db.limpiar_error()
+        if llamada(pares):
+            return True
+        if db.fallo_de_conexion():
+            return False
+        for par in pares:
+            db.limpiar_error()
+            if not llamada([par]):
+                if db.fallo_de_conexion():
+                    return False
+                conflictos.append(f"Asignación en la tarjeta {par[0]}: el servidor la ha rechazado ({db.ultimo_error})")
+        return True
@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from Controladores.Modelos import User
+
+# Cuánto se da por buena la tabla usuarios antes de volver a pedirla
+TTL_USUARIOS_S = 300.0
+# Tras una lectura fallida no se reintenta hasta pasado este tiempo
+REINTENTO_USUARIOS_S = 10.0
+# Un id desconocido (usuario registrado después de leer la tabla) fuerza como mucho una lectura cada tanto
+RECARGA_DESCONOCIDO_S = 5.0
+
+
+class DirectorioUsuarios:
+    # Caché en memoria de la tabla usuarios, compartida por el combo de filtros, el diálogo
+    # de detalle y la decodificación de asignados. Se usa desde varios hilos: si llegan
+    # varias peticiones con la caché caducada, solo una lee del servidor.
+    def __init__(self, cargar: Callable[[], Optional[List[User]]], ttl: float = TTL_USUARIOS_S):
+        # `cargar` devuelve None si la lectura falla, para no guardar un directorio vacío
+        self._cargar = cargar
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._por_id: Dict[str, User] = {}
+        self._cargado_en: Optional[float] = None
+        self._fallo_en: Optional[float] = None
+        self._desconocido_en: Optional[float] = None
+
+    def todos(self, forzar: bool = False) -> List[User]:
+        with self._lock:
+            if forzar or not self._vigente():
+                self._recargar()
+            return list(self._por_id.values())
+
+    def obtener(self, user_id: str) -> Optional[User]:
+        return self.resolver([user_id])[0]
+
+    def resolver(self, ids: Iterable[str]) -> List[Optional[User]]:
+        # Un id desconocido provoca una lectura si la caché ha caducado o, aunque no lo haya
+        # hecho, si no se ha releído por otro desconocido en los últimos RECARGA_DESCONOCIDO_S
+        ids = list(ids)
+        with self._lock:
+            if any(i not in self._por_id for i in ids):
+                if not self._vigente():
+                    self._recargar()
+                elif self._puede_releer():
+                    self._desconocido_en = time.monotonic()
+                    self._recargar()
+            return [self._por_id.get(i) for i in ids]
+
+    def invalidar(self):
+        with self._lock:
+            self._cargado_en = None
+            self._fallo_en = None
+
+    def _vigente(self) -> bool:
+        ahora = time.monotonic()
+        if self._cargado_en is not None and ahora - self._cargado_en < self.ttl:
+            return True
+        return self._fallo_en is not None and ahora - self._fallo_en < REINTENTO_USUARIOS_S
+
+    def _puede_releer(self) -> bool:
+        ahora = time.monotonic()
+        if self._fallo_en is not None and ahora - self._fallo_en < REINTENTO_USUARIOS_S:
+            return False
+        return self._desconocido_en is None or ahora - self._desconocido_en >= RECARGA_DESCONOCIDO_S
+
+    def _recargar(self):
+        usuarios = self._cargar()
+        if usuarios is None:
+            self._fallo_en = time.monotonic()
+            return
+        self._por_id = {u.id: u for u in usuarios}
+        self._cargado_en = time.monotonic()
+        self._fallo_en = None
@@ -1,139 +1,492 @@
-from typing import List, Optional
-from Controladores.Modelos import Tablero, TrelloLista, Tarjeta, User
-from Controladores.Controller_BD import SupabaseController
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from Controladores.Modelos import CambiosTablero, Tablero, TrelloLista, Tarjeta, User
+from Controladores.Almacen_Datos import AlmacenDatos, CursorPagina
+from Controladores.Rangos import necesita_rebalanceo, rango_en_indice, rangos_repartidos
+
+
+class _EscrituraDirecta:
+    # Misma interfaz que ColaEscritura pero escribiendo en el acto, para usar el controlador sin Qt
+    def __init__(self, db_controller: AlmacenDatos):
+        self.db = db_controller
+
+    def guardar(self, tabla: str, fila: dict, al_terminar: Optional[Callable[[Any], None]] = None):
+        ok = self.db.guardar_filas(tabla, [fila])
+        if al_terminar:
+            al_terminar(True if ok else None)
+
+    def ejecutar(self, funcion: Callable[[], Any], al_terminar: Optional[Callable[[Any], None]] = None):
+        resultado = funcion()
+        if al_terminar:
+            al_terminar(resultado)
+
+    def guardar_filas(self, tabla: str, filas: List[dict], al_terminar: Optional[Callable[[Any], None]] = None):
+        ok = self.db.guardar_filas(tabla, filas)
+        if al_terminar:
+            al_terminar(True if ok else None)
+
+    def llamar(self, metodo: str, pares: List[Tuple[str, str]], al_terminar: Optional[Callable[[Any], None]] = None):
+        self.ejecutar(lambda: getattr(self.db, metodo)(pares), al_terminar)
+
+
+def _indice_por_posicion(elementos: list, posicion: float) -> int:
+    return next((i for i, x in enumerate(elementos) if x.posicion > posicion), len(elementos))
+
 
 class ListasController:
-    def __init__(self, tablero: Tablero, db_controller: SupabaseController):
+    # Los cambios se aplican primero sobre el Tablero en memoria y la escritura en el almacén
+    # se confirma después a través de `cola` (normalmente una ColaEscritura). Si el servidor
+    # la rechaza se deshace el cambio local, se avisa con `al_cambio` para repintar y con
+    # `al_error` para informar.
+    def __init__(
+        self,
+        tablero: Tablero,
+        db_controller: AlmacenDatos,
+        cola=None,
+        al_cambio: Optional[Callable[[], None]] = None,
+        al_error: Optional[Callable[[str], None]] = None,
+        indice=None,
+    ):
         self.tablero = tablero
         self.db = db_controller
+        self.cola = cola or _EscrituraDirecta(db_controller)
+        self.al_cambio = al_cambio
+        self.al_error = al_error
+        # IndiceBusqueda opcional que se mantiene al día con cada cambio de texto
+        self.indice = indice
+
+    def _guardar_lista(self, l: TrelloLista, deshacer: Callable[[], None], mensaje_error: str, eliminada: bool = False):
+        self.cola.guardar("listas", self.db.fila_lista(l, eliminada), self._al_confirmar(deshacer, mensaje_error))
+
+    def _guardar_tarjeta(self, c: Tarjeta, deshacer: Callable[[], None], mensaje_error: str, eliminada: bool = False):
+        self.cola.guardar("tarjetas", self.db.fila_tarjeta(c, eliminada), self._al_confirmar(deshacer, mensaje_error))
+
+    def _confirmar(self, escritura: Callable[[], Any], deshacer: Callable[[], None], mensaje_error: str,
+                   al_confirmar: Optional[Callable[[Any], None]] = None):
+        self.cola.ejecutar(escritura, self._al_confirmar(deshacer, mensaje_error, al_confirmar))
+
+    def _al_confirmar(self, deshacer: Callable[[], None], mensaje_error: str,
+                      al_confirmar: Optional[Callable[[Any], None]] = None) -> Callable[[Any], None]:
+        def al_terminar(resultado):
+            if resultado:
+                if al_confirmar:
+                    al_confirmar(resultado)
+                    self._notificar_cambio()
+                return
+            deshacer()
+            self._notificar_cambio()
+            if self.al_error:
+                self.al_error(mensaje_error)
+
+        return al_terminar
+
+    def _notificar_cambio(self):
+        if self.al_cambio:
+            self.al_cambio()
+
+    def _indexar(self, *cards: Tarjeta):
+        if self.indice is not None:
+            for c in cards:
+                self.indice.indexar_tarjeta(c)
+
+    def _desindexar(self, *cards: Tarjeta):
+        if self.indice is not None:
+            for c in cards:
+                self.indice.quitar_tarjeta(c.id)
 
     def crear_lista(self, name: str) -> Optional[TrelloLista]:
-        current_max_pos = max([l.posicion for l in self.tablero.lists], default=-1)
-        new_list = self.db.crear_lista(self.tablero.id, name, current_max_pos + 1)
-        if new_list:
-            self.tablero.add_list(new_list)
-            return new_list
-        return None
+        pos = rango_en_indice(self.tablero.lists, len(self.tablero.lists))
+        new_list = TrelloLista(titulo=name, tablero_id=self.tablero.id, posicion=pos)
+        self.tablero.add_list(new_list)
+
+        self._guardar_lista(new_list, lambda: self.tablero.remove_list(new_list.id), f"No se pudo crear la lista '{name}'")
+        return new_list
 
     def eliminar_lista(self, list_id: str) -> bool:
-        if self.db.eliminar_lista(list_id):
-            self.tablero.remove_list(list_id)
-            return True
-        return False
+        l = self._obtener_lista_por_id(list_id)
+        if not l:
+            return False
+        self.tablero.remove_list(list_id)
+        self._desindexar(*l.cards)
+
+        def deshacer():
+            self.tablero.add_list(l, _indice_por_posicion(self.tablero.lists, l.posicion))
+            self._indexar(*l.cards)
+
+        self._guardar_lista(l, deshacer, f"No se pudo eliminar la lista '{l.titulo}'", eliminada=True)
+        return True
 
     def renombrar_lista(self, list_id: str, new_name: str) -> bool:
-        if self.db.actualizar_lista(list_id, titulo=new_name):
-            l = self._obtener_lista_por_id(list_id)
-            if l:
-                l.titulo = new_name
-                return True
-        return False
+        l = self._obtener_lista_por_id(list_id)
+        if not l:
+            return False
+        old_name, l.titulo = l.titulo, new_name
+
+        def deshacer():
+            # Solo si nadie lo ha vuelto a cambiar mientras tanto
+            if l.titulo == new_name:
+                l.titulo = old_name
+
+        self._guardar_lista(l, deshacer, "No se pudo renombrar la lista")
+        return True
 
     def agregar_tarjeta(self, list_id: str, title: str, description: str = "", user: Optional[User] = None) -> Optional[Tarjeta]:
         l = self._obtener_lista_por_id(list_id)
-        if l:
-            pos = max([c.posicion for c in l.cards], default=-1) + 1
-            new_card = self.db.crear_tarjeta(list_id, title, description, pos)
-            if new_card:
-                l.add_card(new_card)
-                return new_card
-        return None
+        if not l:
+            return None
+        # Con la lista a medio cargar, la nueva va al final de lo cargado (antes de lo que falta)
+        pos = rango_en_indice(l.cards, len(l.cards), l.posicion_siguiente)
+        new_card = Tarjeta(titulo=title, lista_id=list_id, descripcion=description, posicion=pos)
+        l.add_card(new_card)
+        self._indexar(new_card)
+
+        def deshacer():
+            l.remove_card(new_card.id)
+            self._desindexar(new_card)
+
+        self._guardar_tarjeta(new_card, deshacer, f"No se pudo crear la tarjeta '{title}'")
+        # Cada alta en una lista a medias parte por la mitad el hueco hasta la página siguiente
+        if necesita_rebalanceo(l.cards, len(l.cards) - 1, l.posicion_siguiente):
+            self._rebalancear_tarjetas(l)
+        return new_card
 
     def eliminar_tarjeta(self, list_id: str, card_id: str) -> bool:
-        if self.db.eliminar_tarjeta(card_id):
-            l = self._obtener_lista_por_id(list_id)
-            if l:
-                l.remove_card(card_id)
-                return True
-        return False
+        l, c = self._obtener_tarjeta(list_id, card_id)
+        if not c:
+            return False
+        l.remove_card(card_id)
+        self._desindexar(c)
+
+        def deshacer():
+            l.add_card(c, _indice_por_posicion(l.cards, c.posicion))
+            self._indexar(c)
+
+        self._guardar_tarjeta(c, deshacer, f"No se pudo eliminar la tarjeta '{c.titulo}'", eliminada=True)
+        return True
 
     def renombrar_tarjeta(self, list_id: str, card_id: str, new_title: str) -> bool:
-        if self.db.actualizar_tarjeta(card_id, titulo=new_title):
-            l = self._obtener_lista_por_id(list_id)
-            if l:
-                c = next((x for x in l.cards if x.id == card_id), None)
-                if c:
-                    c.titulo = new_title
-                    return True
-        return False
+        _, c = self._obtener_tarjeta(list_id, card_id)
+        if not c:
+            return False
+        old_title, c.titulo = c.titulo, new_title
+        self._indexar(c)
+
+        def deshacer():
+            if c.titulo == new_title:
+                c.titulo = old_title
+                self._indexar(c)
+
+        self._guardar_tarjeta(c, deshacer, "No se pudo renombrar la tarjeta")
+        return True
 
     def actualizar_contenido_tarjeta(self, list_id: str, card_id: str, new_title: str, new_description: str) -> bool:
-        if self.db.actualizar_tarjeta(card_id, titulo=new_title, descripcion=new_description):
-            l = self._obtener_lista_por_id(list_id)
-            if l:
-                c = next((x for x in l.cards if x.id == card_id), None)
-                if c:
-                    c.titulo = new_title
-                    c.descripcion = new_description
-                    return True
-        return False
-
-    def mover_tarjeta(self, source_list_id: str, dest_list_id: str, card_id: str) -> bool:
-        s_list = self._obtener_lista_por_id(source_list_id)
+        _, c = self._obtener_tarjeta(list_id, card_id)
+        if not c:
+            return False
+        anterior = (c.titulo, c.descripcion, c.descripcion_cargada)
+        c.titulo, c.descripcion, c.descripcion_cargada = new_title, new_description, True
+        self._indexar(c)
+
+        def deshacer():
+            if (c.titulo, c.descripcion) == (new_title, new_description):
+                c.titulo, c.descripcion, c.descripcion_cargada = anterior
+                self._indexar(c)
+
+        self._guardar_tarjeta(c, deshacer, "No se pudo guardar la tarjeta")
+        return True
+
+    def mover_tarjeta(self, source_list_id: str, dest_list_id: str, card_id: str, indice: Optional[int] = None) -> bool:
+        # `indice` es la posición final en la lista destino; por defecto, al final
+        s_list, card = self._obtener_tarjeta(source_list_id, card_id)
         d_list = self._obtener_lista_por_id(dest_list_id)
-        
-        if s_list and d_list:
-            card = next((c for c in s_list.cards if c.id == card_id), None)
-            if card:
-                new_pos = max([c.posicion for c in d_list.cards], default=-1) + 1
-                if self.db.actualizar_posicion_tarjeta(card_id, dest_list_id, new_pos):
-                    s_list.remove_card(card_id)
-                    card.lista_id = dest_list_id
-                    card.posicion = new_pos
-                    d_list.add_card(card)
-                    return True
-        return False
+        if not card or not d_list:
+            return False
+
+        old_pos = card.posicion
+        s_list.remove_card(card_id)
+        indice = len(d_list.cards) if indice is None else max(0, min(indice, len(d_list.cards)))
+        card.posicion = rango_en_indice(d_list.cards, indice, d_list.posicion_siguiente)
+        card.lista_id = d_list.id
+        d_list.add_card(card, indice)
+
+        def deshacer():
+            if d_list.get_card(card_id) is not card:
+                return
+            d_list.remove_card(card_id)
+            card.lista_id = s_list.id
+            card.posicion = old_pos
+            s_list.add_card(card, _indice_por_posicion(s_list.cards, old_pos))
+
+        # Una sola fila escrita: la posición nueva cae entre sus dos vecinos
+        self._guardar_tarjeta(card, deshacer, "Fallo al mover")
+        if necesita_rebalanceo(d_list.cards, indice, d_list.posicion_siguiente):
+            self._rebalancear_tarjetas(d_list)
+        return True
+
+    def reordenar_tarjeta(self, list_id: str, card_id: str, indice: int) -> bool:
+        l, card = self._obtener_tarjeta(list_id, card_id)
+        if not card:
+            return False
+        if l.card_index(card_id) == max(0, min(indice, len(l.cards) - 1)):
+            return True
+        return self.mover_tarjeta(list_id, list_id, card_id, indice)
+
+    def _rebalancear_tarjetas(self, l: TrelloLista):
+        # Los huecos se han quedado sin precisión: se reparte la lista entera de nuevo.
+        # Va en un único upsert por la cola, aunque sean más filas de las que caben en un lote
+        # normal; si falla se recuperan las posiciones anteriores de todas.
+        anteriores = [(c, c.posicion) for c in l.cards]
+        for c, pos in zip(l.cards, rangos_repartidos(len(l.cards), l.posicion_siguiente)):
+            c.posicion = pos
+
+        def deshacer():
+            for c, pos in anteriores:
+                c.posicion = pos
+
+        self.cola.guardar_filas(
+            "tarjetas",
+            [self.db.fila_tarjeta(c) for c in l.cards],
+            self._al_confirmar(deshacer, "No se pudo reordenar la lista"),
+        )
 
     def obtener_listas(self) -> List[TrelloLista]:
         # Recargar desde BD
-        self.tablero.lists = self.db.obtener_listas(self.tablero.id)
+        self.tablero.set_lists(self.db.obtener_listas(self.tablero.id))
+        if self.indice is not None:
+            self.indice.reindexar(c for l in self.tablero.lists for c in l.cards)
         return self.tablero.lists
 
+    def agregar_pagina(
+        self, list_id: str, desde: CursorPagina, tarjetas: List[Tarjeta], siguiente: Optional[CursorPagina], total: Optional[int]
+    ) -> bool:
+        # Añade al final de la lista la página leída con db.obtener_pagina_tarjetas(list_id, desde).
+        # Si la lista ha cambiado de frontera mientras tanto (recarga, otra página) se descarta.
+        l = self._obtener_lista_por_id(list_id)
+        if l is None or l.cursor_siguiente() is None or l.cursor_siguiente() != desde:
+            return False
+        nuevas = [c for c in tarjetas if self.tablero.get_card(c.id) is None]
+        for c in nuevas:
+            l.add_card(c)
+        self._indexar(*nuevas)
+        l.fijar_siguiente(siguiente)
+        if siguiente is None:
+            l.tarjetas_sin_cargar = 0
+        elif total is not None:
+            l.tarjetas_sin_cargar = max(total - len(l.cards), 1)
+        else:
+            l.tarjetas_sin_cargar = max(l.tarjetas_sin_cargar - len(tarjetas), 1)
+        return True
+
+    def aplicar_cambios(self, cambios: CambiosTablero) -> bool:
+        # Mezcla en el tablero en memoria lo que otros clientes han cambiado en el servidor.
+        # Devuelve True si algo ha cambiado de verdad (las filas propias ya están aplicadas).
+        hubo_cambios = False
+
+        for list_id in cambios.listas_eliminadas:
+            l = self.tablero.remove_list(list_id)
+            if l:
+                self._desindexar(*l.cards)
+                hubo_cambios = True
+
+        for remota in cambios.listas:
+            l = self._obtener_lista_por_id(remota.id)
+            if l is None:
+                remota.set_cards([c for c in remota.cards if self.tablero.get_card(c.id) is None])
+                self.tablero.add_list(remota, _indice_por_posicion(self.tablero.lists, remota.posicion))
+                self._indexar(*remota.cards)
+                hubo_cambios = True
+                continue
+            if l.titulo != remota.titulo:
+                l.titulo = remota.titulo
+                hubo_cambios = True
+            if l.posicion != remota.posicion:
+                self.tablero.remove_list(l.id)
+                l.posicion = remota.posicion
+                self.tablero.add_list(l, _indice_por_posicion(self.tablero.lists, l.posicion))
+                hubo_cambios = True
+
+        for card_id in cambios.tarjetas_eliminadas:
+            l = self.tablero.get_list_of_card(card_id)
+            c = l.remove_card(card_id) if l else None
+            if c:
+                self._desindexar(c)
+                hubo_cambios = True
+
+        for remota in cambios.tarjetas:
+            hubo_cambios = self._aplicar_tarjeta_remota(remota) or hubo_cambios
+        return hubo_cambios
+
+    def _aplicar_tarjeta_remota(self, remota: Tarjeta) -> bool:
+        d_list = self._obtener_lista_por_id(remota.lista_id)
+        s_list = self.tablero.get_list_of_card(remota.id)
+        c = s_list.get_card(remota.id) if s_list else None
+        if c is None:
+            # Sin su lista en memoria (borrada o aún no vista) no hay dónde ponerla
+            # Ni si cae en la parte de una lista que todavía no se ha cargado: llegará con su página
+            if d_list is None or not d_list.admite_posicion(remota.posicion, remota.id):
+                return False
+            d_list.add_card(remota, _indice_por_posicion(d_list.cards, remota.posicion))
+            self._indexar(remota)
+            return True
+
+        asignados = [u.id for u in c.assignees] != [u.id for u in remota.assignees]
+        # La fila ha cambiado y no trae descripción: la que hubiera en memoria puede ser vieja
+        descripcion = c.descripcion_cargada and (
+            not remota.descripcion_cargada or c.descripcion != remota.descripcion
+        )
+        texto = c.titulo != remota.titulo or descripcion
+        lugar = (c.lista_id, c.posicion) != (remota.lista_id, remota.posicion)
+        if not (asignados or texto or lugar):
+            return False
+
+        c.assignees = remota.assignees
+        if texto:
+            c.titulo = remota.titulo
+            c.descripcion, c.descripcion_cargada = remota.descripcion, remota.descripcion_cargada
+            self._indexar(c)
+        if lugar:
+            s_list.remove_card(c.id)
+            if d_list is None or not d_list.admite_posicion(remota.posicion, remota.id):
+                self._desindexar(c)
+                if d_list is not None:
+                    d_list.tarjetas_sin_cargar += 1
+                return True
+            c.lista_id, c.posicion = remota.lista_id, remota.posicion
+            d_list.add_card(c, _indice_por_posicion(d_list.cards, c.posicion))
+        return True
+
+    def leer_descripcion(self, card_id: str) -> Optional[str]:
+        # Lectura pura, para lanzarla en segundo plano; el resultado se guarda con recordar_descripcion
+        return self.db.obtener_descripcion_tarjeta(card_id)
+
+    def recordar_descripcion(self, card_id: str, descripcion: str):
+        c = self.tablero.get_card(card_id)
+        if c and not c.descripcion_cargada:
+            c.descripcion, c.descripcion_cargada = descripcion, True
+            self._indexar(c)
+
     def _obtener_lista_por_id(self, list_id: str) -> Optional[TrelloLista]:
-        return next((l for l in self.tablero.lists if l.id == list_id), None)
+        return self.tablero.get_list(list_id)
+
+    def _obtener_tarjeta(self, list_id: str, card_id: str):
+        # El índice del tablero sabe en qué lista está la tarjeta; list_id queda como comprobación
+        l = self.tablero.get_list_of_card(card_id)
+        if l is None or l.id != list_id:
+            return None, None
+        return l, l.get_card(card_id)
 
     # ===== ASIGNACIÓN DE USUARIOS =====
     def obtener_todos_usuarios(self) -> List[User]:
         return self.db.obtener_todos_usuarios()
 
-    def gestionar_asignacion(self, list_id: str, card_id: str, user_id: str, asignar: bool) -> bool:
-        exito = False
-        if asignar:
-            exito = self.db.asignar_usuario_tarjeta(card_id, user_id)
-        else:
-            exito = self.db.desasignar_usuario_tarjeta(card_id, user_id)
-            
-        if exito:
-            l = self._obtener_lista_por_id(list_id)
-            if l:
-                c = next((x for x in l.cards if x.id == card_id), None)
-                if c:
-                    c.assignees = self.db.obtener_asignados_tarjeta(card_id)
-            return True
-        return False
-        
+    def gestionar_asignacion(self, list_id: str, card_id: str, user_id: str, asignar: bool, username: str = "?") -> bool:
+        return bool(self.gestionar_asignaciones([(list_id, card_id)], user_id, asignar, username))
+
+    def gestionar_asignaciones(
+        self, tarjetas: Iterable[Tuple[str, str]], user_id: str, asignar: bool, username: str = "?"
+    ) -> Dict[str, List[User]]:
+        # Asigna o quita un usuario en varias tarjetas (list_id, card_id) con una sola escritura.
+        # Devuelve los asignados resultantes de cada tarjeta encontrada, sin volver a leerlos.
+        resultado: Dict[str, List[User]] = {}
+        cambiadas = []
+        for list_id, card_id in tarjetas:
+            _, c = self._obtener_tarjeta(list_id, card_id)
+            if not c:
+                continue
+            anteriores = list(c.assignees)
+            if asignar != any(u.id == user_id for u in anteriores):
+                if asignar:
+                    c.assignees = anteriores + [User(username=username, id=user_id)]
+                else:
+                    c.assignees = [u for u in anteriores if u.id != user_id]
+                cambiadas.append((c, anteriores))
+            resultado[c.id] = c.assignees
+
+        if cambiadas:
+            pares = [(c.id, user_id) for c, _ in cambiadas]
+
+            def deshacer():
+                for c, anteriores in cambiadas:
+                    c.assignees = anteriores
+
+            # Por nombre y no como función: así la cola puede guardarla en el diario sin conexión
+            self.cola.llamar(
+                "asignar_usuarios" if asignar else "desasignar_usuarios",
+                pares,
+                self._al_confirmar(deshacer, "No se pudo actualizar la asignacion"),
+            )
+        return resultado
+
     def cargar_asignados_iniciales(self):
-        if not self.tablero.lists:
+        tarjetas = [card for lista in self.tablero.lists for card in lista.cards]
+        if not tarjetas:
             return
-        for lista in self.tablero.lists:
-            for card in lista.cards:
-                card.assignees = self.db.obtener_asignados_tarjeta(card.id)
+        asignados = self.db.obtener_asignados_tarjetas(c.id for c in tarjetas)
+        for card in tarjetas:
+            if card.id in asignados:
+                card.assignees = asignados[card.id]
+
 
-    
     def obtener_papelera(self) -> List[Tarjeta]:
         return self.db.obtener_papelera(self.tablero.id)
 
     def obtener_papelera_listas(self) -> List[TrelloLista]:
         return self.db.obtener_papelera_listas(self.tablero.id)
 
-    def restaurar_tarjeta(self, card_id: str) -> bool:
-        return self.db.restaurar_tarjeta(card_id)
+    def restaurar_tarjeta(self, card_id: str, tarjeta: Optional[Tarjeta] = None) -> bool:
+        # Con la tarjeta de la papelera se puede devolver al tablero sin esperar al servidor
+        l = self._obtener_lista_por_id(tarjeta.lista_id) if tarjeta else None
+        if l and self.tablero.get_card(card_id) is None:
+            l.add_card(tarjeta, _indice_por_posicion(l.cards, tarjeta.posicion))
+            self._indexar(tarjeta)
+
+        def escritura():
+            if not self.db.restaurar_tarjeta(card_id):
+                return None
+            return (self.db.obtener_asignados_tarjeta(card_id),)
+
+        def al_confirmar(resultado):
+            if l:
+                tarjeta.assignees = resultado[0]
+
+        def deshacer():
+            if l and l.remove_card(card_id):
+                self._desindexar(tarjeta)
+
+        self._confirmar(escritura, deshacer, "No se pudo restaurar la tarjeta", al_confirmar)
+        return True
 
     def eliminar_definitivamente(self, card_id: str) -> bool:
         return self.db.eliminar_tarjeta_definitivamente(card_id)
 
-    def restaurar_lista_papelera(self, list_id: str) -> bool:
-        return self.db.restaurar_lista(list_id)
+    def restaurar_lista_papelera(self, list_id: str, lista: Optional[TrelloLista] = None) -> bool:
+        # La columna aparece vacía al momento y sus tarjetas llegan con la confirmación.
+        # Si ya estaba (p. ej. la trajo una sincronización) no es esta llamada quien la deshace
+        anadida = bool(lista) and not self._obtener_lista_por_id(list_id)
+        if anadida:
+            lista.set_cards([])
+            self.tablero.add_list(lista, _indice_por_posicion(self.tablero.lists, lista.posicion))
+
+        def escritura():
+            if not self.db.restaurar_lista(list_id):
+                return None
+            return self.db.obtener_pagina_tarjetas(list_id)
+
+        def al_confirmar(resultado):
+            l = self._obtener_lista_por_id(list_id)
+            if l:
+                tarjetas, siguiente, total = resultado
+                l.set_cards(tarjetas)
+                l.fijar_siguiente(siguiente)
+                l.tarjetas_sin_cargar = max((total or 0) - len(tarjetas), 1) if siguiente is not None else 0
+                self._indexar(*l.cards)
+
+        self._confirmar(
+            escritura,
+            lambda: anadida and self.tablero.remove_list(list_id),
+            "No se pudo restaurar la lista",
+            al_confirmar,
+        )
+        return True
 
     def eliminar_lista_definitivamente(self, list_id: str) -> bool:
-        return self.db.eliminar_lista_definitivamente(list_id)
\ No newline at end of file
+        return self.db.eliminar_lista_definitivamente(list_id)
@@ -0,0 +1,196 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+from Controladores.Modelos import CambiosTablero
+
+# Límites superiores (ms) de los tramos del histograma de latencias; el último es "más"
+LIMITES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Muestras recientes por operación con las que se calculan los percentiles
+MAX_MUESTRAS = 2048
+# Con esta variable de entorno a 1 se mide desde el arranque
+VARIABLE_ENTORNO = "MINITRELLO_METRICAS"
+
+
+def _filas(resultado) -> Optional[int]:
+    # Tamaño de la respuesta en filas, cuando tiene sentido
+    if isinstance(resultado, CambiosTablero):
+        return (
+            len(resultado.listas) + len(resultado.tarjetas)
+            + len(resultado.listas_eliminadas) + len(resultado.tarjetas_eliminadas)
+        )
+    if isinstance(resultado, tuple) and resultado and isinstance(resultado[0], list):
+        return len(resultado[0])
+    if isinstance(resultado, (list, dict, set)):
+        return len(resultado)
+    return None
+
+
+def _percentil(ordenadas: List[float], p: float) -> Optional[float]:
+    if not ordenadas:
+        return None
+    return ordenadas[min(len(ordenadas) - 1, int(p * len(ordenadas)))]
+
+
+class _Operacion:
+    __slots__ = ("llamadas", "errores", "filas", "total_ms", "max_ms", "tramos", "muestras")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.filas = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.tramos = [0] * (len(LIMITES_MS) + 1)
+        self.muestras = deque(maxlen=MAX_MUESTRAS)
+
+
+class RegistroMetricas:
+    # Contadores por operación ("db.obtener_listas", "listas.mover_tarjeta"...): llamadas,
+    # errores, filas devueltas e histograma de latencias. Se llama desde varios hilos.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operaciones: Dict[str, _Operacion] = {}
+        self.desde = time.time()
+
+    def registrar(self, operacion: str, ms: float, error: bool = False, filas: Optional[int] = None):
+        with self._lock:
+            op = self._operaciones.get(operacion)
+            if op is None:
+                op = self._operaciones[operacion] = _Operacion()
+            op.llamadas += 1
+            op.errores += error
+            op.filas += filas or 0
+            op.total_ms += ms
+            op.max_ms = max(op.max_ms, ms)
+            op.tramos[bisect_left(LIMITES_MS, ms)] += 1
+            op.muestras.append(ms)
+
+    def reiniciar(self):
+        with self._lock:
+            self._operaciones = {}
+            self.desde = time.time()
+
+    def resumen(self) -> List[dict]:
+        # Una fila por operación, de más a menos tiempo total
+        with self._lock:
+            copia = [(nombre, op, sorted(op.muestras)) for nombre, op in self._operaciones.items()]
+        filas = []
+        for nombre, op, ordenadas in copia:
+            filas.append({
+                "operacion": nombre,
+                "llamadas": op.llamadas,
+                "errores": op.errores,
+                "tasa_error": op.errores / op.llamadas,
+                "filas": op.filas,
+                "filas_por_llamada": op.filas / op.llamadas,
+                "total_ms": op.total_ms,
+                "media_ms": op.total_ms / op.llamadas,
+                "p50_ms": _percentil(ordenadas, 0.50),
+                "p95_ms": _percentil(ordenadas, 0.95),
+                "p99_ms": _percentil(ordenadas, 0.99),
+                "max_ms": op.max_ms,
+                "histograma": dict(zip([f"<{l}ms" for l in LIMITES_MS] + [f">={LIMITES_MS[-1]}ms"], op.tramos)),
+            })
+        filas.sort(key=lambda f: f["total_ms"], reverse=True)
+        return filas
+
+    def exportar_json(self, ruta: str, extra: Optional[dict] = None):
+        datos = {"desde": self.desde, "hasta": time.time(), "operaciones": self.resumen()}
+        datos.update(extra or {})
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+def _envolver(funcion: Callable, operacion: str, registro: RegistroMetricas) -> Callable:
+    @functools.wraps(funcion)
+    def medida(self, *args, **kwargs):
+        # Los almacenes no lanzan: un error es que hayan dejado uno nuevo en ultimo_error
+        error_previo = getattr(self, "ultimo_error", None)
+        inicio = time.perf_counter()
+        try:
+            resultado = funcion(self, *args, **kwargs)
+        except Exception:
+            registro.registrar(operacion, (time.perf_counter() - inicio) * 1000, error=True)
+            raise
+        error = getattr(self, "ultimo_error", None)
+        registro.registrar(
+            operacion,
+            (time.perf_counter() - inicio) * 1000,
+            error=error is not None and error is not error_previo,
+            filas=_filas(resultado),
+        )
+        return resultado
+
+    medida._sin_medir = funcion
+    return medida
+
+
+class Instrumentacion:
+    # Envuelve los métodos públicos de las clases indicadas solo mientras está activa: al
+    # desactivarla se devuelven los originales y no queda ningún coste en cada llamada
+    def __init__(self, registro: Optional[RegistroMetricas] = None):
+        self.registro = registro or RegistroMetricas()
+        self._clases: List[tuple] = []
+        self.activa = False
+
+    def registrar_clase(self, clase: type, prefijo: str, excluir: Iterable[str] = ()):
+        self._clases.append((clase, prefijo, set(excluir)))
+        if self.activa:
+            self._envolver_clase(clase, prefijo, set(excluir))
+
+    def activar(self):
+        if self.activa:
+            return
+        self.activa = True
+        for clase, prefijo, excluir in self._clases:
+            self._envolver_clase(clase, prefijo, excluir)
+
+    def desactivar(self):
+        if not self.activa:
+            return
+        self.activa = False
+        for clase, _, _ in self._clases:
+            for nombre, valor in list(vars(clase).items()):
+                original = getattr(valor, "_sin_medir", None)
+                if original is not None:
+                    setattr(clase, nombre, original)
+
+    def _envolver_clase(self, clase: type, prefijo: str, excluir: set):
+        for nombre, valor in list(vars(clase).items()):
+            # Solo funciones normales: ni propiedades ni estáticos, y nada privado
+            if nombre.startswith("_") or nombre in excluir or not callable(valor) or isinstance(valor, type):
+                continue
+            if isinstance(valor, (staticmethod, classmethod)) or hasattr(valor, "_sin_medir"):
+                continue
+            # Los abstractos nunca se ejecutan: se mide la implementación de cada subclase
+            if getattr(valor, "__isabstractmethod__", False):
+                continue
+            setattr(clase, nombre, _envolver(valor, f"{prefijo}.{nombre}", self.registro))
+
+
+_instrumentacion: Optional[Instrumentacion] = None
+
+
+def obtener_instrumentacion() -> Instrumentacion:
+    # Una por proceso; registra las clases de la capa de datos la primera vez
+    global _instrumentacion
+    if _instrumentacion is None:
+        from Controladores.Almacen_Datos import AlmacenDatos
+        from Controladores.Almacen_SQLite import SQLiteController
+        from Controladores.Controller_BD import SupabaseController
+        from Controladores.Listas import ListasController
+
+        _instrumentacion = Instrumentacion()
+        # Los métodos comunes están en AlmacenDatos y el resto en cada almacén
+        for clase in (AlmacenDatos, SupabaseController, SQLiteController):
+            _instrumentacion.registrar_clase(clase, "db", excluir={"limpiar_error", "disponible", "error_de_conexion", "fallo_de_conexion"})
+        _instrumentacion.registrar_clase(ListasController, "listas")
+        if os.environ.get(VARIABLE_ENTORNO) == "1":
+            _instrumentacion.activar()
+    return _instrumentacion
@@ -1,7 +1,7 @@
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -18,25 +18,90 @@ class Tarjeta:
     titulo: str
     lista_id: str
     descripcion: str = ""
-    posicion: int = 0
+    posicion: float = 0
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = field(default_factory=datetime.now)
     assignees: List[User] = field(default_factory=list) 
+    # El tablero se carga sin descripciones; se piden al abrir el detalle de la tarjeta
+    descripcion_cargada: bool = field(default=True, repr=False, compare=False)
 
 @dataclass
 class TrelloLista:
     titulo: str
     tablero_id: str
-    posicion: int = 0
+    posicion: float = 0
     cards: List[Tarjeta] = field(default_factory=list)
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = field(default_factory=datetime.now)
+    # Índice id -> tarjeta y tablero al que pertenece; se mantienen con los métodos de abajo
+    _tarjetas_por_id: Dict[str, Tarjeta] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _tablero: Optional["Tablero"] = field(default=None, init=False, repr=False, compare=False)
+    # Paginación: posición e id de la primera tarjeta del servidor que aún no está en `cards`
+    # (None si la lista está completa) y cuántas quedan por cargar. Las páginas se piden por
+    # (posicion, id): varias tarjetas pueden compartir posición en la frontera
+    posicion_siguiente: Optional[float] = field(default=None, repr=False, compare=False)
+    id_siguiente: Optional[str] = field(default=None, repr=False, compare=False)
+    tarjetas_sin_cargar: int = field(default=0, repr=False, compare=False)
 
-    def add_card(self, tarjeta: Tarjeta):
-        self.cards.append(tarjeta)
-        
-    def remove_card(self, tarjeta_id: str):
-        self.cards = [c for c in self.cards if c.id != tarjeta_id]
+    def __post_init__(self):
+        self.set_cards(self.cards)
+
+    def hay_mas(self) -> bool:
+        return self.posicion_siguiente is not None
+
+    def total_tarjetas(self) -> int:
+        return len(self.cards) + self.tarjetas_sin_cargar
+
+    def cursor_siguiente(self) -> Optional[Tuple[float, str]]:
+        return None if self.posicion_siguiente is None else (self.posicion_siguiente, self.id_siguiente or "")
+
+    def fijar_siguiente(self, cursor: Optional[Tuple[float, str]]):
+        self.posicion_siguiente, self.id_siguiente = cursor if cursor is not None else (None, None)
+
+    def admite_posicion(self, posicion: float, tarjeta_id: Optional[str] = None) -> bool:
+        # Una tarjeta con esta posición (e id, si se sabe) cae dentro de la parte ya cargada
+        if self.posicion_siguiente is None:
+            return True
+        if tarjeta_id is None:
+            return posicion < self.posicion_siguiente
+        return (posicion, tarjeta_id) < self.cursor_siguiente()
+
+    def set_cards(self, tarjetas: List[Tarjeta]):
+        if self._tablero is not None:
+            self._tablero._desindexar_tarjetas(self)
+        self.cards = list(tarjetas)
+        self._tarjetas_por_id = {c.id: c for c in self.cards}
+        if self._tablero is not None:
+            self._tablero._indexar_tarjetas(self)
+
+    def add_card(self, tarjeta: Tarjeta, indice: Optional[int] = None):
+        if indice is None:
+            self.cards.append(tarjeta)
+        else:
+            self.cards.insert(indice, tarjeta)
+        self._tarjetas_por_id[tarjeta.id] = tarjeta
+        if self._tablero is not None:
+            self._tablero._lista_de_tarjeta[tarjeta.id] = self
+
+    def remove_card(self, tarjeta_id: str) -> Optional[Tarjeta]:
+        tarjeta = self._tarjetas_por_id.pop(tarjeta_id, None)
+        if tarjeta is None:
+            return None
+        del self.cards[self._indice_de(tarjeta)]
+        if self._tablero is not None:
+            self._tablero._lista_de_tarjeta.pop(tarjeta_id, None)
+        return tarjeta
+
+    def get_card(self, tarjeta_id: str) -> Optional[Tarjeta]:
+        return self._tarjetas_por_id.get(tarjeta_id)
+
+    def card_index(self, tarjeta_id: str) -> int:
+        tarjeta = self._tarjetas_por_id.get(tarjeta_id)
+        return -1 if tarjeta is None else self._indice_de(tarjeta)
+
+    def _indice_de(self, tarjeta: Tarjeta) -> int:
+        # Por identidad: el __eq__ del dataclass compararía campo a campo
+        return next(i for i, c in enumerate(self.cards) if c is tarjeta)
 
 @dataclass
 class Tablero:
@@ -45,12 +110,76 @@ class Tablero:
     lists: List[TrelloLista] = field(default_factory=list)
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = field(default_factory=datetime.now)
+    # Número de tarjetas conocido sin tener las listas cargadas (recuento del servidor o caché local)
+    num_tarjetas: Optional[int] = None
+    # Índices id -> lista y id de tarjeta -> lista, sincronizados por los métodos de mutación
+    _listas_por_id: Dict[str, TrelloLista] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _lista_de_tarjeta: Dict[str, TrelloLista] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.set_lists(self.lists)
+
+    def set_lists(self, listas: List[TrelloLista]):
+        for l in self.lists:
+            l._tablero = None
+        self.lists = []
+        self._listas_por_id = {}
+        self._lista_de_tarjeta = {}
+        for l in listas:
+            self.add_list(l)
+
+    def add_list(self, trello_list: TrelloLista, indice: Optional[int] = None):
+        if indice is None:
+            self.lists.append(trello_list)
+        else:
+            self.lists.insert(indice, trello_list)
+        self._listas_por_id[trello_list.id] = trello_list
+        trello_list._tablero = self
+        self._indexar_tarjetas(trello_list)
+
+    def remove_list(self, list_id: str) -> Optional[TrelloLista]:
+        lista = self._listas_por_id.pop(list_id, None)
+        if lista is None:
+            return None
+        del self.lists[next(i for i, l in enumerate(self.lists) if l is lista)]
+        self._desindexar_tarjetas(lista)
+        lista._tablero = None
+        return lista
+
+    def get_list(self, list_id: str) -> Optional[TrelloLista]:
+        return self._listas_por_id.get(list_id)
+
+    def get_card(self, card_id: str) -> Optional[Tarjeta]:
+        lista = self._lista_de_tarjeta.get(card_id)
+        return lista.get_card(card_id) if lista else None
+
+    def get_list_of_card(self, card_id: str) -> Optional[TrelloLista]:
+        return self._lista_de_tarjeta.get(card_id)
+
+    def _indexar_tarjetas(self, lista: TrelloLista):
+        for card_id in lista._tarjetas_por_id:
+            self._lista_de_tarjeta[card_id] = lista
+
+    def _desindexar_tarjetas(self, lista: TrelloLista):
+        for card_id in lista._tarjetas_por_id:
+            if self._lista_de_tarjeta.get(card_id) is lista:
+                del self._lista_de_tarjeta[card_id]
+
 
-    def add_list(self, trello_list: TrelloLista):
-        self.lists.append(trello_list)
-    
-    def remove_list(self, list_id: str):
-        self.lists = [l for l in self.lists if l.id != list_id]
-        
     def get_card_count(self):
-        return sum(len(l.cards) for l in self.lists)
+        if not self.lists and self.num_tarjetas is not None:
+            return self.num_tarjetas
+        return sum(l.total_tarjetas() for l in self.lists)
+
+
+@dataclass
+class CambiosTablero:
+    # Filas de un tablero modificadas desde un cursor de updated_at (ver obtener_cambios)
+    listas: List[TrelloLista] = field(default_factory=list)
+    tarjetas: List[Tarjeta] = field(default_factory=list)
+    listas_eliminadas: List[str] = field(default_factory=list)
+    tarjetas_eliminadas: List[str] = field(default_factory=list)
+    cursor: Optional[str] = None
+
+    def vacio(self) -> bool:
+        return not (self.listas or self.tarjetas or self.listas_eliminadas or self.tarjetas_eliminadas)
@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+# Separación entre posiciones al añadir al final o al repartir de nuevo una lista
+PASO_RANGO = 1024.0
+# Por debajo de este hueco el punto medio pierde precisión y conviene rebalancear
+HUECO_MINIMO = 1e-6
+
+
+def rango_entre(anterior: Optional[float], siguiente: Optional[float]) -> float:
+    # Posición fraccional para colocar un elemento entre dos vecinos (None = extremo)
+    if anterior is None and siguiente is None:
+        return PASO_RANGO
+    if anterior is None:
+        return siguiente - PASO_RANGO
+    if siguiente is None:
+        return anterior + PASO_RANGO
+    return (anterior + siguiente) / 2
+
+
+def rango_en_indice(elementos: list, indice: int, tope: Optional[float] = None) -> float:
+    # `elementos` ordenados por posicion y sin el que se va a colocar; solo se miran los vecinos.
+    # `tope` es la posición del primer elemento que viene detrás y no está cargado (paginación)
+    anterior = elementos[indice - 1].posicion if indice > 0 else None
+    siguiente = elementos[indice].posicion if indice < len(elementos) else tope
+    return rango_entre(anterior, siguiente)
+
+
+def necesita_rebalanceo(elementos: list, indice: int, tope: Optional[float] = None) -> bool:
+    # Se mira el hueco alrededor del elemento ya colocado en `indice`; si es el último cargado,
+    # también el que queda hasta `tope`
+    vecinos = [e.posicion for e in elementos[max(indice - 1, 0):indice + 2]]
+    if tope is not None and indice >= len(elementos) - 1:
+        vecinos.append(tope)
+    return any(b - a < HUECO_MINIMO for a, b in zip(vecinos, vecinos[1:]))
+
+
+def rangos_repartidos(cantidad: int, tope: Optional[float] = None) -> List[float]:
+    # Con `tope` se reparten por debajo de él, para no chocar con lo que aún no está cargado
+    if tope is None:
+        return [PASO_RANGO * (i + 1) for i in range(cantidad)]
+    return [tope - PASO_RANGO * (cantidad - i) for i in range(cantidad)]
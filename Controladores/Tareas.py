@@ -0,0 +1,150 @@
+import itertools
+from typing import Any, Callable, Dict, Optional
+
+from PyQt5 import QtCore, QtWidgets
+
+
+class _SenalesTarea(QtCore.QObject):
+    terminada = QtCore.pyqtSignal(int, object)
+    fallida = QtCore.pyqtSignal(int, str)
+
+
+class _Tarea(QtCore.QRunnable):
+    def __init__(self, id_tarea: int, funcion: Callable, args: tuple, kwargs: dict, senales: _SenalesTarea, estado: dict):
+        super().__init__()
+        self.id_tarea = id_tarea
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.senales = senales
+        # Qt destruye el runnable al terminar, así que la cancelación se comparte en un dict aparte
+        self.estado = estado
+
+    def run(self):
+        if self.estado["cancelada"]:
+            return
+        try:
+            resultado = self.funcion(*self.args, **self.kwargs)
+        except Exception as e:
+            self.senales.fallida.emit(self.id_tarea, str(e))
+            return
+        self.senales.terminada.emit(self.id_tarea, resultado)
+
+
+class GestorTareas(QtCore.QObject):
+    # Ejecuta las llamadas a los controladores fuera del hilo de la interfaz.
+    # Los resultados vuelven por señales al hilo principal; si se lanza una tarea con
+    # la misma clave que otra pendiente, el resultado de la antigua se descarta.
+    ocupado = QtCore.pyqtSignal(bool)
+
+    def __init__(self, parent=None, pool: Optional[QtCore.QThreadPool] = None, cursor_ocupado: bool = True):
+        super().__init__(parent)
+        self.pool = pool or QtCore.QThreadPool.globalInstance()
+        # Las tareas periódicas en segundo plano no deben cambiar el cursor del usuario
+        self.cursor_ocupado = cursor_ocupado
+        self._ids = itertools.count(1)
+        self._activas: Dict[int, dict] = {}
+        self._vigentes: Dict[str, int] = {}
+
+        self._senales = _SenalesTarea(self)
+        self._senales.terminada.connect(self._al_terminar)
+        self._senales.fallida.connect(self._al_fallar)
+
+    def ejecutar(
+        self,
+        funcion: Callable,
+        *args,
+        clave: Optional[str] = None,
+        al_terminar: Optional[Callable[[Any], None]] = None,
+        al_fallar: Optional[Callable[[str], None]] = None,
+        **kwargs,
+    ) -> int:
+        id_tarea = next(self._ids)
+        estado = {"cancelada": False}
+        tarea = _Tarea(id_tarea, funcion, args, kwargs, self._senales, estado)
+
+        if clave is not None:
+            anterior = self._vigentes.get(clave)
+            if anterior is not None:
+                self.cancelar(anterior)
+            self._vigentes[clave] = id_tarea
+
+        estaba_ocupado = bool(self._activas)
+        self._activas[id_tarea] = {
+            "estado": estado,
+            "clave": clave,
+            "al_terminar": al_terminar,
+            "al_fallar": al_fallar,
+        }
+        if not estaba_ocupado:
+            self._cambiar_ocupado(True)
+
+        self.pool.start(tarea)
+        return id_tarea
+
+    def cancelar(self, id_o_clave) -> bool:
+        # Acepta el id devuelto por ejecutar() o la clave con la que se lanzó
+        id_tarea = self._vigentes.get(id_o_clave) if isinstance(id_o_clave, str) else id_o_clave
+        info = self._activas.get(id_tarea)
+        if not info:
+            return False
+        info["estado"]["cancelada"] = True
+        self._finalizar(id_tarea)
+        return True
+
+    def cancelar_todas(self):
+        for id_tarea in list(self._activas):
+            self.cancelar(id_tarea)
+
+    def pendientes(self) -> int:
+        return len(self._activas)
+
+    def esperar(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    def _finalizar(self, id_tarea: int) -> Optional[dict]:
+        info = self._activas.pop(id_tarea, None)
+        if info is None:
+            return None
+        clave = info["clave"]
+        if clave is not None and self._vigentes.get(clave) == id_tarea:
+            del self._vigentes[clave]
+        if not self._activas:
+            self._cambiar_ocupado(False)
+        return info
+
+    def _al_terminar(self, id_tarea: int, resultado):
+        info = self._finalizar(id_tarea)
+        # Cancelada o sustituida por una tarea más reciente
+        if info is None:
+            return
+        if info["al_terminar"]:
+            info["al_terminar"](resultado)
+
+    def _al_fallar(self, id_tarea: int, error: str):
+        info = self._finalizar(id_tarea)
+        if info is None:
+            return
+        if info["al_fallar"]:
+            info["al_fallar"](error)
+        else:
+            print(f"Error en tarea en segundo plano: {error}")
+
+    def _cambiar_ocupado(self, ocupado: bool):
+        if self.cursor_ocupado and QtWidgets.QApplication.instance():
+            if ocupado:
+                QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.BusyCursor)
+            else:
+                QtWidgets.QApplication.restoreOverrideCursor()
+        self.ocupado.emit(ocupado)
+
+
+_gestor: Optional[GestorTareas] = None
+
+
+def obtener_gestor_tareas() -> GestorTareas:
+    # Un único gestor por proceso, compartido por el login, la ventana principal y los diálogos
+    global _gestor
+    if _gestor is None:
+        _gestor = GestorTareas(QtWidgets.QApplication.instance())
+    return _gestor
@@ -0,0 +1,60 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Nombre del tema en la aplicación -> archivo .qss en estilos/
+ARCHIVOS_TEMA = {
+    "oscuro": "trello_oscuro.qss",
+    "claro": "trello_claro.qss",
+    "brutalista": "brutalista_salmon.qss",
+}
+TEMA_POR_DEFECTO = "brutalista"
+
+_TAMANO = re.compile(r"(font-size:\s*)(\d+(?:\.\d+)?)px")
+# Regla global "* { ... font-size: Npx ... }": su tamaño es la base a la que se escala el resto
+_TAMANO_BASE = re.compile(r"(?:^|[\s}])\*\s*\{[^}]*?font-size:\s*(\d+(?:\.\d+)?)px")
+
+
+def archivo_tema(nombre_tema: str) -> str:
+    return ARCHIVOS_TEMA.get(nombre_tema, ARCHIVOS_TEMA[TEMA_POR_DEFECTO])
+
+
+@lru_cache(maxsize=None)
+def _plantilla(ruta: str) -> Tuple[str, List[str], List[float], Optional[float]]:
+    # Se lee y se trocea una sola vez por archivo: el texto original, el texto fijo, los tamaños
+    # de letra que van entre medias y el tamaño base de la regla global (None si no la tiene)
+    with open(ruta, "r", encoding="utf-8") as f:
+        qss = f.read()
+    base = _TAMANO_BASE.search(qss)
+    trozos, tamanos, inicio = [], [], 0
+    for m in _TAMANO.finditer(qss):
+        trozos.append(qss[inicio:m.end(1)])
+        tamanos.append(float(m.group(2)))
+        inicio = m.end(2)
+    trozos.append(qss[inicio:])
+    return qss, trozos, tamanos, float(base.group(1)) if base else None
+
+
+@lru_cache(maxsize=64)
+def hoja_estilos(ruta: str, tamano_fuente: Optional[int] = None) -> str:
+    # Hoja del tema con todos los font-size escalados para que la regla global quede en
+    # `tamano_fuente` (sin tamaño, tal cual está en el archivo). Se guarda por (tema, tamaño).
+    qss, trozos, tamanos, base = _plantilla(ruta)
+    if tamano_fuente is None or tamano_fuente == base:
+        return qss
+    if base is None:
+        return qss + f"\n* {{ font-size: {tamano_fuente}px; }}"
+    escala = tamano_fuente / base
+    partes = [trozos[0]]
+    for tamano, trozo in zip(tamanos, trozos[1:]):
+        partes.append(str(max(1, round(tamano * escala))))
+        partes.append(trozo)
+    return "".join(partes)
+
+
+def aplicar_hoja(widget, hoja: str) -> bool:
+    # Si la hoja ya es la que tiene el widget no se vuelve a pulir nada
+    if widget.styleSheet() == hoja:
+        return False
+    widget.setStyleSheet(hoja)
+    return True
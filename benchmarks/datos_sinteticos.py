@@ -0,0 +1,68 @@
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from benchmarks.fake_supabase import BaseDatosFake
+
+INICIO = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PALABRAS = (
+    "revisar", "diseño", "factura", "cliente", "sprint", "migración", "informe", "reunión",
+    "pruebas", "despliegue", "presupuesto", "contrato", "incidencia", "móvil", "api", "backend",
+)
+
+
+def _texto(rnd: random.Random, n: int) -> str:
+    return " ".join(rnd.choice(PALABRAS) for _ in range(n))
+
+
+def sembrar(
+    bd: BaseDatosFake,
+    tableros: int,
+    listas: int,
+    tarjetas: int,
+    usuarios: int = 20,
+    asignados_max: int = 3,
+    eliminadas: float = 0.05,
+    semilla: int = 1,
+) -> List[str]:
+    # Rellena `bd` con `tableros` tableros de `listas` listas de `tarjetas` tarjetas cada una.
+    # Con la misma semilla los datos son idénticos entre ejecuciones. Devuelve los ids de tablero.
+    rnd = random.Random(semilla)
+    # Un segundo más por fila: con todas en la misma fecha el cursor de cambios las devolvería todas
+    segundos = itertools.count()
+
+    def fecha() -> str:
+        return (INICIO + timedelta(seconds=next(segundos))).isoformat()
+
+    ids_usuarios = [f"u{i}" for i in range(usuarios)]
+    bd.tablas["usuarios"].extend(
+        {"id": u, "username": f"usuario{i}", "created_at": fecha()} for i, u in enumerate(ids_usuarios)
+    )
+    ids_tableros = []
+    for t in range(tableros):
+        tid = f"t{t}"
+        ids_tableros.append(tid)
+        creado = fecha()
+        bd.tablas["tableros"].append({
+            "id": tid, "titulo": f"Tablero {t}", "es_publico": False, "eliminada": False,
+            "created_at": creado, "updated_at": creado,
+        })
+        for l in range(listas):
+            lid = f"{tid}l{l}"
+            creado = fecha()
+            bd.tablas["listas"].append({
+                "id": lid, "tablero_id": tid, "titulo": f"Lista {l}", "posicion": 1024.0 * (l + 1),
+                "eliminada": False, "created_at": creado, "updated_at": creado,
+            })
+            for c in range(tarjetas):
+                cid = f"{lid}c{c}"
+                creado = fecha()
+                bd.tablas["tarjetas"].append({
+                    "id": cid, "lista_id": lid, "titulo": _texto(rnd, 4), "descripcion": _texto(rnd, 30),
+                    "posicion": 1024.0 * (c + 1), "eliminada": rnd.random() < eliminadas,
+                    "created_at": creado, "updated_at": creado,
+                })
+                for u in rnd.sample(ids_usuarios, rnd.randint(0, min(asignados_max, usuarios))):
+                    bd.tablas["tarjeta_usuarios"].append({"tarjeta_id": cid, "usuario_id": u, "created_at": creado})
+    return ids_tableros
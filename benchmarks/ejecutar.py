@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from benchmarks.datos_sinteticos import sembrar
+from benchmarks.fake_supabase import BaseDatosFake, ClienteFake
+
+# (tableros, listas por tablero, tarjetas por lista)
+ESCENARIOS = {
+    "pequeno": (10, 4, 10),
+    "mediano": (50, 8, 60),
+    "grande": (200, 10, 500),
+}
+CONSULTAS_BUSQUEDA = ("rev", "cliente", "sprint pru", "migración api", "zzz")
+# Por encima de este empeoramiento de la mediana se marca como regresión al comparar
+UMBRAL_REGRESION = 0.10
+# ...siempre que además suba al menos esto: en operaciones de décimas de ms el ruido es mayor que el umbral
+DIFERENCIA_MINIMA_MS = 0.5
+
+
+def _commit() -> Optional[str]:
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, timeout=5
+        )
+        return salida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Medidor:
+    def __init__(self, bd: BaseDatosFake, repeticiones: int):
+        self.bd = bd
+        self.repeticiones = repeticiones
+        self.resultados: Dict[str, dict] = {}
+
+    def medir(self, nombre: str, funcion: Callable[[], object], preparar: Optional[Callable[[], None]] = None,
+              repeticiones: Optional[int] = None):
+        # Mediana, mínimo y p95 en ms, y peticiones al servidor por ejecución (deterministas:
+        # son lo primero que mirar si una operación empeora). La primera vuelta no cuenta:
+        # calienta cachés como el directorio de usuarios.
+        if preparar:
+            preparar()
+        funcion()
+        tiempos, peticiones = [], []
+        for _ in range(repeticiones or self.repeticiones):
+            if preparar:
+                preparar()
+            antes = self.bd.peticiones
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            peticiones.append(self.bd.peticiones - antes)
+        tiempos.sort()
+        self.resultados[nombre] = {
+            "mediana_ms": statistics.median(tiempos),
+            "min_ms": tiempos[0],
+            "p95_ms": tiempos[min(len(tiempos) - 1, int(0.95 * len(tiempos)))],
+            "peticiones": max(peticiones),
+            "repeticiones": len(tiempos),
+        }
+        print(f"  {nombre:<36}{self.resultados[nombre]['mediana_ms']:10.2f} ms  {max(peticiones):4d} pet.")
+
+
+def _controlador(bd: BaseDatosFake, almacen: str):
+    if almacen == "sqlite":
+        # Los mismos datos copiados a un fichero SQLite; no hay peticiones que contar
+        from Controladores.Almacen_SQLite import SQLiteController
+
+        db = SQLiteController(os.path.join(tempfile.mkdtemp(prefix="minitrello-bench-"), "bench.sqlite3"))
+        for tabla in ("usuarios", "tableros", "listas", "tarjetas", "tarjeta_usuarios"):
+            if not db.guardar_filas(tabla, bd.tablas[tabla]):
+                raise RuntimeError(f"No se pudo copiar {tabla} a SQLite: {db.ultimo_error}")
+        return db
+
+    from Controladores.Controller_BD import SupabaseController
+
+    db = SupabaseController(url=None, key=None)
+    db.client = ClienteFake(bd)
+    return db
+
+
+def medir_datos(m: Medidor, db, board_id: str):
+    from Controladores.Listas import ListasController
+    from Controladores.Modelos import Tablero
+
+    m.medir("db.obtener_tableros", db.obtener_tableros)
+    m.medir("db.obtener_listas", lambda: db.obtener_listas(board_id))
+    cursor = db.cursor_cambios(board_id)
+    m.medir("db.obtener_cambios (sin cambios)", lambda: db.obtener_cambios(board_id, cursor))
+
+    # Las mutaciones escriben en el acto (sin ColaEscritura): cada una es su viaje al servidor
+    tablero = Tablero(titulo="bench", id=board_id)
+    lc = ListasController(tablero, db)
+    lc.obtener_listas()
+    origen, destino = tablero.lists[0], tablero.lists[-1]
+    m.medir("listas.agregar_tarjeta", lambda: lc.agregar_tarjeta(origen.id, "bench nueva"))
+    m.medir("listas.renombrar_tarjeta", lambda: lc.renombrar_tarjeta(origen.id, origen.cards[0].id, "bench renombrada"))
+    m.medir("listas.mover_tarjeta", lambda: lc.mover_tarjeta(origen.id, destino.id, origen.cards[-1].id,
+                                                              len(destino.cards) // 2))
+    creada: List = []
+    m.medir(
+        "listas.eliminar_tarjeta",
+        lambda: lc.eliminar_tarjeta(origen.id, creada.pop().id),
+        preparar=lambda: creada.append(lc.agregar_tarjeta(origen.id, "bench borrar")),
+    )
+    usuario = db.obtener_todos_usuarios()[0]
+    veinte = [(l.id, c.id) for l in tablero.lists for c in l.cards][:20]
+    m.medir(
+        "listas.gestionar_asignaciones (20)",
+        lambda: lc.gestionar_asignaciones(veinte, usuario.id, True, usuario.username),
+        preparar=lambda: lc.gestionar_asignaciones(veinte, usuario.id, False),
+    )
+
+
+def medir_busqueda(m: Medidor, db, board_id: str):
+    from Controladores.Busqueda import IndiceBusqueda
+
+    tarjetas = [c for l in db.obtener_listas(board_id) for c in l.cards]
+    indice = IndiceBusqueda()
+    m.medir(f"busqueda.reindexar ({len(tarjetas)})", lambda: indice.reindexar(tarjetas))
+    for consulta in CONSULTAS_BUSQUEDA:
+        # Sin caché de prefijos: como la primera tecla tras un cambio
+        m.medir(f"busqueda.buscar '{consulta}'", lambda: indice.buscar(consulta), preparar=indice._cache_prefijos.clear)
+
+
+def medir_interfaz(m: Medidor, db, board_id: str):
+    from PyQt5 import QtWidgets
+    from Controladores.Listas import ListasController
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    import main
+
+    ventana = main.MainWindow(db)
+    ventana.resize(1600, 900)
+    ventana.show()
+    tablero = next(t for t in db.obtener_tableros() if t.id == board_id)
+    tablero.set_lists(db.obtener_listas(board_id))
+    ventana.current_tablero = tablero
+    ventana.listas_controller = ListasController(tablero, db, indice=ventana.indice_busqueda)
+    ventana.indice_busqueda.reindexar(c for l in tablero.lists for c in l.cards)
+    ventana.pestanasPrincipal.setCurrentIndex(1)
+
+    def pintar():
+        ventana.renderizar_columnas()
+        app.processEvents()
+
+    def desde_cero():
+        if hasattr(ventana, "_columnas_ui"):
+            del ventana._columnas_ui
+
+    m.medir("ui.renderizar_columnas (en frío)", pintar, preparar=desde_cero, repeticiones=max(3, m.repeticiones // 3))
+    m.medir("ui.renderizar_columnas (sin cambios)", pintar)
+    card = tablero.lists[0].cards[0]
+    m.medir("ui.renderizar_columnas (1 cambio)", pintar, preparar=lambda: setattr(card, "titulo", card.titulo + "!"))
+
+    def filtrar(texto):
+        ventana.filtro_texto = texto
+        ventana._aplicar_filtros()
+        app.processEvents()
+
+    m.medir("ui.filtro de búsqueda", lambda: filtrar("cliente"), preparar=lambda: filtrar(None))
+    ventana.close()
+
+
+def comparar(actual: dict, base: dict, umbral: float) -> int:
+    # Tabla de diferencias contra un informe anterior; devuelve el número de regresiones
+    regresiones = 0
+    print(f"\nComparado con {base.get('commit') or '?'} ({base.get('escenario')}):")
+    for nombre, r in actual["resultados"].items():
+        anterior = base.get("resultados", {}).get(nombre)
+        if anterior is None:
+            print(f"  {nombre:<36}{'nuevo':>10}")
+            continue
+        cambio = r["mediana_ms"] / anterior["mediana_ms"] - 1 if anterior["mediana_ms"] else 0.0
+        diferencia = r["mediana_ms"] - anterior["mediana_ms"]
+        peticiones = r["peticiones"] - anterior["peticiones"]
+        marca = ""
+        if (cambio > umbral and diferencia >= DIFERENCIA_MINIMA_MS) or peticiones > 0:
+            marca = "  <-- REGRESIÓN"
+            regresiones += 1
+        print(f"  {nombre:<36}{cambio:+10.1%}  {peticiones:+4d} pet.{marca}")
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de carga, pintado y búsqueda contra un Supabase en memoria")
+    parser.add_argument("--escenario", choices=ESCENARIOS, default="mediano")
+    parser.add_argument("--almacen", choices=("supabase", "sqlite"), default="supabase")
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="latencia simulada por petición")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--sin-ui", action="store_true", help="no medir el pintado con Qt")
+    parser.add_argument("--salida", help="guardar el informe en este JSON")
+    parser.add_argument("--comparar", help="informe JSON anterior con el que comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION)
+    args = parser.parse_args(argv)
+
+    # Qt sin pantalla y datos de usuario (caché, .ui compilados) fuera de los reales
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["XDG_DATA_HOME"] = os.environ["LOCALAPPDATA"] = tempfile.mkdtemp(prefix="minitrello-bench-")
+    os.chdir(RAIZ)
+
+    tableros, listas, tarjetas = ESCENARIOS[args.escenario]
+    bd = BaseDatosFake()
+    ids = sembrar(bd, tableros, listas, tarjetas)
+    bd.latencia = args.latencia_ms / 1000
+    db = _controlador(bd, args.almacen)
+    m = Medidor(bd, args.repeticiones)
+
+    print(f"Escenario {args.escenario} ({args.almacen}): {tableros} tableros x {listas} listas x {tarjetas} tarjetas, "
+          f"latencia {args.latencia_ms:g} ms")
+    medir_datos(m, db, ids[0])
+    medir_busqueda(m, db, ids[1 % len(ids)])
+    if not args.sin_ui:
+        medir_interfaz(m, db, ids[2 % len(ids)])
+
+    informe = {
+        "commit": _commit(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "escenario": args.escenario,
+        "almacen": args.almacen,
+        "tamano": {"tableros": tableros, "listas": listas, "tarjetas": tarjetas},
+        "latencia_ms": args.latencia_ms,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": m.resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            return 1 if comparar(informe, json.load(f), args.umbral) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,479 @@
+# Sustituto en memoria del cliente de supabase para medir sin un proyecto real.
+# Cubre la parte de table().select().eq().order().execute() que usa SupabaseController:
+# selects con recursos embebidos y alias, filtros con ruta (tarjetas.eliminada), order/limit
+# sobre tablas embebidas, count, insert/update/upsert/delete, or_ con and() y lo que usa el
+# login de auth. Cada execute() puede simular latencia de red y se cuentan las peticiones.
+import copy
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+# tabla -> {columna_fk: tabla_padre}
+RELACIONES = {
+    "listas": {"tablero_id": "tableros"},
+    "tarjetas": {"lista_id": "listas"},
+    "tarjeta_usuarios": {"tarjeta_id": "tarjetas", "usuario_id": "usuarios"},
+}
+
+COLUMNAS_POR_DEFECTO = {
+    "tableros": {"es_publico": False, "eliminada": False},
+    "listas": {"eliminada": False, "posicion": 0},
+    "tarjetas": {"eliminada": False, "posicion": 0, "descripcion": ""},
+}
+
+TABLAS_CON_ID = ("tableros", "listas", "tarjetas", "usuarios")
+
+
+def _ahora() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ErrorFake(Exception):
+    pass
+
+
+class Respuesta:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class BaseDatosFake:
+    # Almacén compartido: varios clientes sobre la misma instancia son varios usuarios
+    def __init__(self, latencia: float = 0.0):
+        self.latencia = latencia
+        self.tablas: Dict[str, List[dict]] = {
+            "tableros": [], "listas": [], "tarjetas": [], "tarjeta_usuarios": [], "usuarios": [],
+        }
+        self.peticiones = 0
+        self.lock = threading.RLock()
+
+    def esperar(self):
+        with self.lock:
+            self.peticiones += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+
+
+def _partir(texto: str) -> List[str]:
+    partes, nivel, actual = [], 0, ""
+    for ch in texto:
+        if ch == "(":
+            nivel += 1
+        elif ch == ")":
+            nivel -= 1
+        if ch == "," and nivel == 0:
+            partes.append(actual.strip())
+            actual = ""
+        else:
+            actual += ch
+    if actual.strip():
+        partes.append(actual.strip())
+    return partes
+
+
+def _parsear_select(texto: str) -> List[dict]:
+    campos = []
+    for parte in _partir(texto):
+        m = re.match(r"^(?:(\w+):)?(\w+)(!inner)?\((.*)\)$", parte, re.S)
+        if m:
+            alias, tabla, inner, interior = m.groups()
+            if interior.strip() == "count":
+                campos.append({"tipo": "count", "tabla": tabla, "alias": alias or tabla, "inner": False})
+            else:
+                campos.append({
+                    "tipo": "embed", "tabla": tabla, "alias": alias or tabla,
+                    "inner": bool(inner), "hijos": _parsear_select(interior),
+                })
+        else:
+            campos.append({"tipo": "col", "nombre": parte})
+    return campos
+
+
+def _relacion(padre: str, hija: str):
+    # ("uno", fk en el padre) o ("muchos", fk en la hija)
+    if hija in RELACIONES.get(padre, {}).values():
+        fk = next(k for k, v in RELACIONES[padre].items() if v == hija)
+        return "uno", fk
+    if padre in RELACIONES.get(hija, {}).values():
+        fk = next(k for k, v in RELACIONES[hija].items() if v == padre)
+        return "muchos", fk
+    raise ErrorFake(f"Sin relación entre {padre} y {hija}")
+
+
+def _comparar(valor, op: str, objetivo) -> bool:
+    if op == "eq":
+        return valor == objetivo
+    if op == "neq":
+        return valor != objetivo
+    if op == "in":
+        return valor in objetivo
+    if op == "is":
+        return valor is objetivo
+    if valor is None:
+        return False
+    if op == "gt":
+        return valor > objetivo
+    if op == "gte":
+        return valor >= objetivo
+    if op == "lt":
+        return valor < objetivo
+    if op == "lte":
+        return valor <= objetivo
+    raise ErrorFake(f"Operador no soportado: {op}")
+
+
+def _convertir(texto: str):
+    if texto == "true":
+        return True
+    if texto == "false":
+        return False
+    if texto == "null":
+        return None
+    for tipo in (int, float):
+        try:
+            return tipo(texto)
+        except ValueError:
+            pass
+    return texto
+
+
+def _parsear_or(texto: str) -> List[List[tuple]]:
+    grupos = []
+    for parte in _partir(texto):
+        m = re.match(r"^and\((.*)\)$", parte)
+        conds = _partir(m.group(1)) if m else [parte]
+        grupo = []
+        for c in conds:
+            col, op, val = c.split(".", 2)
+            grupo.append((col, op, _convertir(val)))
+        grupos.append(grupo)
+    return grupos
+
+
+class ConsultaFake:
+    def __init__(self, bd: BaseDatosFake, tabla: str):
+        self.bd = bd
+        self.tabla = tabla
+        self.operacion = "select"
+        self.campos = _parsear_select("*")
+        self.filtros: List[tuple] = []
+        self.grupos_or: List[List[List[tuple]]] = []
+        self.ordenes: Dict[str, List[tuple]] = {}
+        self.limites: Dict[str, tuple] = {}
+        self.con_count = False
+        self.valores: Any = None
+        self.on_conflict = "id"
+        self.ignorar_duplicados = False
+        # Índices (tabla, columna) -> {valor: filas} construidos una vez por execute()
+        self._indices: Dict[tuple, Dict[Any, List[dict]]] = {}
+
+    def select(self, *columnas, count=None):
+        self.campos = _parsear_select(",".join(columnas) if columnas else "*")
+        self.con_count = count is not None
+        return self
+
+    def insert(self, valores, **_):
+        self.operacion, self.valores = "insert", valores
+        return self
+
+    def upsert(self, valores, on_conflict: str = "id", ignore_duplicates: bool = False, **_):
+        self.operacion, self.valores = "upsert", valores
+        self.on_conflict = on_conflict
+        self.ignorar_duplicados = ignore_duplicates
+        return self
+
+    def update(self, valores, **_):
+        self.operacion, self.valores = "update", valores
+        return self
+
+    def delete(self, **_):
+        self.operacion = "delete"
+        return self
+
+    def _filtro(self, col, op, val):
+        self.filtros.append((col, op, val))
+        return self
+
+    def eq(self, col, val):
+        return self._filtro(col, "eq", val)
+
+    def neq(self, col, val):
+        return self._filtro(col, "neq", val)
+
+    def gt(self, col, val):
+        return self._filtro(col, "gt", val)
+
+    def gte(self, col, val):
+        return self._filtro(col, "gte", val)
+
+    def lt(self, col, val):
+        return self._filtro(col, "lt", val)
+
+    def lte(self, col, val):
+        return self._filtro(col, "lte", val)
+
+    def in_(self, col, valores):
+        return self._filtro(col, "in", list(valores))
+
+    def is_(self, col, val):
+        return self._filtro(col, "is", _convertir(val) if isinstance(val, str) else val)
+
+    def match(self, valores: dict):
+        for col, val in valores.items():
+            self._filtro(col, "eq", val)
+        return self
+
+    def or_(self, texto: str, **_):
+        self.grupos_or.append(_parsear_or(texto))
+        return self
+
+    def order(self, col, desc: bool = False, foreign_table: Optional[str] = None, **_):
+        self.ordenes.setdefault(foreign_table or "", []).append((col, desc))
+        return self
+
+    def limit(self, n: int, foreign_table: Optional[str] = None, **_):
+        self.limites[foreign_table or ""] = (0, n)
+        return self
+
+    def range(self, desde: int, hasta: int, foreign_table: Optional[str] = None, **_):
+        self.limites[foreign_table or ""] = (desde, hasta - desde + 1)
+        return self
+
+    def _filtros_en(self, ruta: str):
+        pref = ruta + "." if ruta else ""
+        propios = []
+        for col, op, val in self.filtros:
+            if ruta and col.startswith(pref) and "." not in col[len(pref):]:
+                propios.append((col[len(pref):], op, val))
+            elif not ruta and "." not in col:
+                propios.append((col, op, val))
+        return propios
+
+    def _cumple(self, fila: dict, filtros) -> bool:
+        return all(_comparar(fila.get(c), op, v) for c, op, v in filtros)
+
+    def _ordenar_y_cortar(self, filas: List[dict], ruta: str) -> List[dict]:
+        for col, desc in reversed(self.ordenes.get(ruta, [])):
+            filas.sort(key=lambda f: (f.get(col) is None, f.get(col)), reverse=desc)
+        if ruta in self.limites:
+            desde, n = self.limites[ruta]
+            filas = filas[desde:desde + n]
+        return filas
+
+    def _por_columna(self, tabla: str, columna: str) -> Dict[Any, List[dict]]:
+        indice = self._indices.get((tabla, columna))
+        if indice is None:
+            indice = self._indices[(tabla, columna)] = {}
+            for f in self.bd.tablas[tabla]:
+                indice.setdefault(f.get(columna), []).append(f)
+        return indice
+
+    def _proyectar(self, tabla: str, fila: dict, campos: List[dict], ruta: str):
+        # Fila proyectada, o None si un embed !inner la descarta
+        salida = {}
+        for campo in campos:
+            if campo["tipo"] == "col":
+                # Los valores de las filas son escalares: basta con copiar el dict
+                if campo["nombre"] == "*":
+                    salida.update(fila)
+                else:
+                    salida[campo["nombre"]] = fila.get(campo["nombre"])
+                continue
+            sub_ruta = f"{ruta}.{campo['alias']}" if ruta else campo["alias"]
+            tipo, fk = _relacion(tabla, campo["tabla"])
+            filtros = self._filtros_en(sub_ruta)
+            if tipo == "uno":
+                padre = next(iter(self._por_columna(campo["tabla"], "id").get(fila.get(fk), [])), None)
+                if padre is not None and not self._cumple(padre, filtros):
+                    padre = None
+                if campo["tipo"] == "count":
+                    salida[campo["alias"]] = [{"count": 1 if padre else 0}]
+                    continue
+                valor = self._proyectar(campo["tabla"], padre, campo["hijos"], sub_ruta) if padre else None
+                if valor is None and campo["inner"]:
+                    return None
+                salida[campo["alias"]] = valor
+            else:
+                hijos = self._por_columna(campo["tabla"], fk).get(fila.get("id"), [])
+                hijos = [h for h in hijos if self._cumple(h, filtros)]
+                if campo["tipo"] == "count":
+                    salida[campo["alias"]] = [{"count": len(hijos)}]
+                    continue
+                proyectados = []
+                for h in self._ordenar_y_cortar(hijos, sub_ruta):
+                    p = self._proyectar(campo["tabla"], h, campo["hijos"], sub_ruta)
+                    if p is not None:
+                        proyectados.append(p)
+                if not proyectados and campo["inner"]:
+                    return None
+                salida[campo["alias"]] = proyectados
+        return salida
+
+    def _filas_objetivo(self) -> List[dict]:
+        filtros = self._filtros_en("")
+        filas = [f for f in self.bd.tablas[self.tabla] if self._cumple(f, filtros)]
+        for grupos in self.grupos_or:
+            filas = [f for f in filas if any(self._cumple(f, g) for g in grupos)]
+        return filas
+
+    def execute(self):
+        self.bd.esperar()
+        with self.bd.lock:
+            self._indices = {}
+            r = getattr(self, "_ejecutar_" + self.operacion)()
+            # Como el trigger del README: asignar o desasignar toca tarjetas.updated_at
+            if self.tabla == "tarjeta_usuarios" and self.operacion != "select":
+                ids = {f.get("tarjeta_id") for f in r.data}
+                for f in self.bd.tablas["tarjetas"]:
+                    if f["id"] in ids:
+                        f["updated_at"] = _ahora()
+            return r
+
+    def _descartar_por_inner(self, filas: List[dict]) -> List[dict]:
+        # Un embed !inner a un padre filtrado deja fuera las filas de otros padres: se
+        # descartan antes de proyectar, que es lo caro (p. ej. tarjetas de otros tableros)
+        for campo in self.campos:
+            if campo["tipo"] == "col" or not campo["inner"]:
+                continue
+            tipo, fk = _relacion(self.tabla, campo["tabla"])
+            filtros = self._filtros_en(campo["alias"])
+            if tipo == "uno" and filtros:
+                validos = {p["id"] for p in self.bd.tablas[campo["tabla"]] if self._cumple(p, filtros)}
+                filas = [f for f in filas if f.get(fk) in validos]
+        return filas
+
+    def _ejecutar_select(self):
+        resultado = []
+        for fila in self._descartar_por_inner(self._filas_objetivo()):
+            p = self._proyectar(self.tabla, fila, self.campos, "")
+            if p is not None:
+                resultado.append((fila, p))
+        total = len(resultado)
+        filas = [p for _, p in resultado]
+        for col, desc in reversed(self.ordenes.get("", [])):
+            filas.sort(key=lambda f: (f.get(col) is None, f.get(col)), reverse=desc)
+        if "" in self.limites:
+            desde, n = self.limites[""]
+            filas = filas[desde:desde + n]
+        return Respuesta(filas, total if self.con_count else None)
+
+    def _nueva_fila(self, valores: dict) -> dict:
+        fila = dict(COLUMNAS_POR_DEFECTO.get(self.tabla, {}))
+        if self.tabla in TABLAS_CON_ID:
+            fila["id"] = str(uuid.uuid4())
+        fila["created_at"] = _ahora()
+        fila["updated_at"] = fila["created_at"]
+        fila.update(copy.deepcopy(valores))
+        return fila
+
+    def _comprobar_unica(self, fila: dict):
+        if self.tabla == "tarjeta_usuarios":
+            if (fila["tarjeta_id"], fila["usuario_id"]) in {
+                (f["tarjeta_id"], f["usuario_id"]) for f in self._por_columna(self.tabla, "tarjeta_id").get(fila["tarjeta_id"], [])
+            }:
+                raise ErrorFake("duplicate key value violates unique constraint")
+        elif "id" in fila and fila["id"] in self._por_columna(self.tabla, "id"):
+            raise ErrorFake("duplicate key value violates unique constraint")
+
+    def _ejecutar_insert(self):
+        filas = self.valores if isinstance(self.valores, list) else [self.valores]
+        nuevas = [self._nueva_fila(v) for v in filas]
+        for n in nuevas:
+            self._comprobar_unica(n)
+        self.bd.tablas[self.tabla].extend(nuevas)
+        return Respuesta(copy.deepcopy(nuevas))
+
+    def _ejecutar_upsert(self):
+        filas = self.valores if isinstance(self.valores, list) else [self.valores]
+        if len({tuple(sorted(f)) for f in filas}) > 1:
+            raise ErrorFake("All object keys must match")
+        if self.tabla == "tarjeta_usuarios" and self.on_conflict == "id":
+            self.on_conflict = "tarjeta_id,usuario_id"
+        columnas = [c.strip() for c in self.on_conflict.split(",")]
+        # Índice por la primera columna de la clave; el resto se compara entre los candidatos
+        existentes = self._por_columna(self.tabla, columnas[0])
+        salida = []
+        for valores in filas:
+            existente = next(
+                (f for f in existentes.get(valores.get(columnas[0]), [])
+                 if all(f.get(c) == valores.get(c) for c in columnas[1:])),
+                None,
+            )
+            if existente is not None:
+                if self.ignorar_duplicados:
+                    continue
+                existente.update(copy.deepcopy(valores))
+                existente["updated_at"] = _ahora()
+                salida.append(copy.deepcopy(existente))
+            else:
+                nueva = self._nueva_fila(valores)
+                self.bd.tablas[self.tabla].append(nueva)
+                existentes.setdefault(nueva.get(columnas[0]), []).append(nueva)
+                salida.append(copy.deepcopy(nueva))
+        return Respuesta(salida)
+
+    def _ejecutar_update(self):
+        salida = []
+        for fila in self._filas_objetivo():
+            fila.update(copy.deepcopy(self.valores))
+            fila["updated_at"] = _ahora()
+            salida.append(copy.deepcopy(fila))
+        return Respuesta(salida)
+
+    def _ejecutar_delete(self):
+        objetivo = self._filas_objetivo()
+        ids = {id(f) for f in objetivo}
+        self.bd.tablas[self.tabla] = [f for f in self.bd.tablas[self.tabla] if id(f) not in ids]
+        if self.tabla in ("tableros", "listas", "tarjetas"):
+            self._borrar_en_cascada(self.tabla, {f.get("id") for f in objetivo})
+        return Respuesta(copy.deepcopy(objetivo))
+
+    def _borrar_en_cascada(self, tabla: str, ids: set):
+        for hija, fks in RELACIONES.items():
+            for fk, padre in fks.items():
+                if padre == tabla:
+                    borradas = {f.get("id") for f in self.bd.tablas[hija] if f.get(fk) in ids}
+                    self.bd.tablas[hija] = [f for f in self.bd.tablas[hija] if f.get(fk) not in ids]
+                    if borradas - {None}:
+                        self._borrar_en_cascada(hija, borradas)
+
+
+class AuthFake:
+    def __init__(self, bd: BaseDatosFake):
+        self.bd = bd
+        self.cuentas: Dict[str, dict] = {}
+
+    def sign_up(self, datos: dict):
+        self.bd.esperar()
+        usuario = SimpleNamespace(
+            id=str(uuid.uuid4()), email=datos["email"],
+            user_metadata=datos.get("options", {}).get("data", {}),
+        )
+        self.cuentas[datos["email"]] = {"password": datos["password"], "user": usuario}
+        return SimpleNamespace(user=usuario, session=SimpleNamespace(access_token="fake"))
+
+    def sign_in_with_password(self, datos: dict):
+        self.bd.esperar()
+        cuenta = self.cuentas.get(datos["email"])
+        if not cuenta or cuenta["password"] != datos["password"]:
+            raise ErrorFake("Invalid login credentials")
+        return SimpleNamespace(user=cuenta["user"], session=SimpleNamespace(access_token="fake"))
+
+    def sign_out(self):
+        self.bd.esperar()
+
+
+class ClienteFake:
+    def __init__(self, bd: Optional[BaseDatosFake] = None):
+        self.bd = bd or BaseDatosFake()
+        self.auth = AuthFake(self.bd)
+
+    def table(self, nombre: str) -> ConsultaFake:
+        if nombre not in self.bd.tablas:
+            raise ErrorFake(f"relation \"{nombre}\" does not exist")
+        return ConsultaFake(self.bd, nombre)
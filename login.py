@@ -1,8 +1,12 @@
+from Controladores import Arranque
 import sys
 import os
-from PyQt5 import QtWidgets, uic, QtGui, QtCore
+from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtGui import QIcon
-from Controladores.Controller_BD import SupabaseController
+from Controladores.Carga_UI import cargar_ui
+from Controladores.Temas import hoja_estilos
+from Controladores.Almacen_Datos import obtener_controlador
+from Controladores.Tareas import obtener_gestor_tareas
 
 def resource_path(relative_path):
     try:
@@ -17,16 +21,19 @@ class LoginWindow(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         try:
-            uic.loadUi(ui_path, self)
+            with Arranque.medir("interfaz login"):
+                cargar_ui(self, ui_path)
         except FileNotFoundError:
             print(f"Error: Could not find UI file at {ui_path}")
             sys.exit(1)
         
         self.setWindowIcon(QIcon(resource_path("assets/logo.png")))
         self.setWindowTitle("Organizador de tareas - ALACSA Tecnología y BlockChain")
-        self.db_controller = SupabaseController()
+        self.db_controller = obtener_controlador()
+        self.tareas = obtener_gestor_tareas()
         
-        self.cargar_estilo()
+        with Arranque.medir("estilos login"):
+            self.cargar_estilo()
        
         self.configurar_logo_centrado()
         
@@ -71,9 +78,7 @@ class LoginWindow(QtWidgets.QWidget):
     def cargar_estilo(self):
         style_path = resource_path(os.path.join("estilos", "brutalista_salmon.qss"))
         try:
-            with open(style_path, "r", encoding="utf-8") as f:
-                style = f.read()
-                self.setStyleSheet(style)
+            self.setStyleSheet(hoja_estilos(style_path))
         except Exception as e:
             print(f"Error cargando estilo: {e}")
     
@@ -103,10 +108,22 @@ class LoginWindow(QtWidgets.QWidget):
         self.Primary.setEnabled(False)
         self.Primary.setText("Iniciando...")
         
-        resultado = self.db_controller.iniciar_sesion(email, password)
-        
+        def autenticar():
+            resultado = self.db_controller.iniciar_sesion(email, password)
+            if resultado["success"]:
+                resultado["usuario"] = self.db_controller.obtener_usuario_actual()
+            return resultado
+
+        self.tareas.ejecutar(
+            autenticar,
+            clave="login",
+            al_terminar=lambda resultado: self._al_iniciar_sesion(resultado, email),
+            al_fallar=lambda error: self._al_iniciar_sesion({"success": False, "error": error}, email),
+        )
+
+    def _al_iniciar_sesion(self, resultado, email):
         if resultado["success"]:
-            user = self.db_controller.obtener_usuario_actual()
+            user = resultado.get("usuario")
             username = user.username if user else email.split('@')[0]
             self.abrir_ventana_principal(username)
         else:
@@ -177,8 +194,16 @@ class LoginWindow(QtWidgets.QWidget):
             btn_crear.setEnabled(False)
             btn_crear.setText("Creando...")
             
-            resultado = self.db_controller.registrar_usuario(email, password, username)
-            
+            self.tareas.ejecutar(
+                self.db_controller.registrar_usuario,
+                email,
+                password,
+                username,
+                al_terminar=al_registrar,
+                al_fallar=lambda error: al_registrar({"success": False, "error": error}),
+            )
+
+        def al_registrar(resultado):
             if resultado["success"]:
                 QtWidgets.QMessageBox.information(
                     dialog, 
@@ -197,12 +222,9 @@ class LoginWindow(QtWidgets.QWidget):
     
     def abrir_ventana_principal(self, username, modo_invitado=False):
         from main import MainWindow
-        self.main_window = MainWindow()
-        
-        if not modo_invitado:
-            # Inyectar controlador y recargar datos
-            self.main_window.db_controller = self.db_controller
-            self.main_window.cargar_tableros()
+        # La ventana usa la misma sesión y pide los tableros una sola vez, ya autenticada
+        self.main_window = MainWindow(self.db_controller)
+        self.main_window.cargar_tableros()
         
         if hasattr(self.main_window, 'current_user'):
             self.main_window.current_user.username = username
@@ -218,7 +240,13 @@ class LoginWindow(QtWidgets.QWidget):
     
     def volver_al_login(self):
         if self.db_controller:
-            self.db_controller.cerrar_sesion()
+            # Lo pendiente de la ventana sale antes con la sesión aún abierta: se vacía la cola
+            # y el cierre de sesión va al mismo hilo de escrituras, detrás de ella
+            escrituras = self.tareas
+            if self.main_window:
+                self.main_window.cola_escritura.vaciar()
+                escrituras = self.main_window.escrituras
+            escrituras.ejecutar(self.db_controller.cerrar_sesion)
         
         if hasattr(self, 'txtUsuario'): self.txtUsuario.clear()
         if hasattr(self, 'Contrasena'): self.Contrasena.clear()
@@ -238,7 +266,9 @@ class LoginWindow(QtWidgets.QWidget):
             self.Error.show()
 
 if __name__ == "__main__":
+    Arranque.terminar("importaciones", desde_inicio=True)
     app = QtWidgets.QApplication(sys.argv)
     window = LoginWindow()
     window.show()
+    Arranque.terminar("login visible", desde_inicio=True)
     sys.exit(app.exec_())
\ No newline at end of file
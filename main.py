@@ -1,11 +1,24 @@
+from Controladores import Arranque
 import sys
 import os
-from PyQt5 import QtWidgets, uic, QtCore, QtGui, QtSvg
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import QSettings
 from PyQt5.QtGui import QIcon
 from Controladores.Modelos import User
 from Controladores.Listas import ListasController
-from Controladores.Controller_BD import SupabaseController
+from Controladores.Almacen_Datos import obtener_controlador
+from Controladores.Tareas import GestorTareas, obtener_gestor_tareas
+from Controladores.Cache_Local import CacheLocal, directorio_datos
+from Controladores.Cola_Escritura import ColaEscritura
+from Controladores.Diario_Offline import DiarioOffline
+from Controladores.Busqueda import IndiceBusqueda
+from Controladores.Carga_UI import cargar_ui
+from Controladores.Temas import aplicar_hoja, archivo_tema, hoja_estilos
+from Controladores.Metricas import obtener_instrumentacion
 
 def resource_path(relative_path):
     try:
@@ -17,28 +30,77 @@ def resource_path(relative_path):
 ui_path = resource_path(os.path.join("Pantallas", "App.ui"))
 
 
-def icono_svg(nombre_archivo: str, color: str = None) -> QtGui.QIcon:
+# Caché LRU de iconos ya rasterizados: (archivo, color, tamaño, devicePixelRatio) -> QIcon
+_CACHE_ICONOS = OrderedDict()
+MAX_ICONOS_CACHE = 256
+
+
+@lru_cache(maxsize=64)
+def _leer_svg(ruta: str) -> Optional[str]:
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _rasterizar_svg(ruta: str, color: str, tamano: int, dpr: float) -> QtGui.QIcon:
+    svg_content = _leer_svg(ruta)
+    if svg_content is None:
+        return QtGui.QIcon()
+
+    svg_colored = svg_content.replace("currentColor", color)
+    from PyQt5 import QtSvg
+
+    renderer = QtSvg.QSvgRenderer(QtCore.QByteArray(svg_colored.encode("utf-8")))
+    lado = int(round(tamano * dpr))
+    pixmap = QtGui.QPixmap(lado, lado)
+    pixmap.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(pixmap)
+    renderer.render(painter)
+    painter.end()
+    pixmap.setDevicePixelRatio(dpr)
+    return QtGui.QIcon(pixmap)
+
+
+def icono_svg(nombre_archivo: str, color: str = None, tamano: int = 24) -> QtGui.QIcon:
+    app = QtWidgets.QApplication.instance()
+    dpr = app.devicePixelRatio() if app else 1.0
+    clave = (nombre_archivo, color, tamano, dpr)
+
+    icono = _CACHE_ICONOS.get(clave)
+    if icono is not None:
+        _CACHE_ICONOS.move_to_end(clave)
+        return icono
+
     ruta = resource_path(os.path.join("assets", "icons", nombre_archivo))
     if not os.path.exists(ruta):
         return QtGui.QIcon()
 
     if color:
         try:
-            with open(ruta, "r", encoding="utf-8") as f:
-                svg_content = f.read()
-
-            svg_colored = svg_content.replace("currentColor", color)
-            renderer = QtSvg.QSvgRenderer(QtCore.QByteArray(svg_colored.encode("utf-8")))
-            pixmap = QtGui.QPixmap(24, 24)
-            pixmap.fill(QtCore.Qt.transparent)
-            painter = QtGui.QPainter(pixmap)
-            renderer.render(painter)
-            painter.end()
-            return QtGui.QIcon(pixmap)
+            icono = _rasterizar_svg(ruta, color, tamano, dpr)
         except Exception:
-            return QtGui.QIcon(ruta)
+            icono = QtGui.QIcon(ruta)
+    else:
+        icono = QtGui.QIcon(ruta)
 
-    return QtGui.QIcon(ruta)
+    _CACHE_ICONOS[clave] = icono
+    if len(_CACHE_ICONOS) > MAX_ICONOS_CACHE:
+        _CACHE_ICONOS.popitem(last=False)
+    return icono
+
+
+def precargar_iconos(colores=(None,)):
+    # Deja en caché todos los iconos de assets/icons para no tocar disco al pintar el tablero
+    carpeta = resource_path(os.path.join("assets", "icons"))
+    try:
+        nombres = [n for n in os.listdir(carpeta) if n.endswith(".svg")]
+    except OSError:
+        return
+    for nombre in nombres:
+        for color in colores:
+            icono_svg(nombre, color)
 
 
 class TarjetaDetalleDialog(QtWidgets.QDialog):
@@ -47,6 +109,7 @@ class TarjetaDetalleDialog(QtWidgets.QDialog):
         self.controller = controller
         self.tarjeta = tarjeta
         self.list_id = list_id
+        self.tareas = obtener_gestor_tareas()
 
         self.setWindowTitle("Detalles de la Tarjeta")
         self.setMinimumSize(500, 450)
@@ -72,12 +135,10 @@ class TarjetaDetalleDialog(QtWidgets.QDialog):
 
         add_layout = QtWidgets.QHBoxLayout()
         self.combo_users = QtWidgets.QComboBox()
+        self.combo_users.addItem("Cargando usuarios...", None)
+        self.combo_users.setEnabled(False)
 
-        users = self.controller.obtener_todos_usuarios()
-        for u in users:
-            self.combo_users.addItem(u.username, u.id)
-
-        btn_asignar = QtWidgets.QPushButton("Asignar")
+        self.btn_asignar = btn_asignar = QtWidgets.QPushButton("Asignar")
         btn_asignar.clicked.connect(self.asignar_usuario)
         btn_asignar.setStyleSheet("background-color: #e0e0e0; color: black; border-radius: 4px; padding: 5px;")
 
@@ -89,7 +150,7 @@ class TarjetaDetalleDialog(QtWidgets.QDialog):
         self.list_assigned.setFixedHeight(80)
         assign_layout.addWidget(self.list_assigned)
 
-        btn_quitar = QtWidgets.QPushButton("Quitar seleccionado")
+        self.btn_quitar = btn_quitar = QtWidgets.QPushButton("Quitar seleccionado")
         btn_quitar.clicked.connect(self.quitar_usuario)
         btn_quitar.setStyleSheet("color: red; border: 1px solid #ffcccc; border-radius: 4px;")
         assign_layout.addWidget(btn_quitar)
@@ -113,6 +174,37 @@ class TarjetaDetalleDialog(QtWidgets.QDialog):
         btn_layout.addWidget(self.btn_guardar)
         main_layout.addLayout(btn_layout)
 
+        self.tareas.ejecutar(
+            self.controller.obtener_todos_usuarios,
+            clave="detalle_usuarios",
+            al_terminar=self._cargar_usuarios,
+        )
+        # La descripción no viene con el tablero: se pide ahora y queda guardada en la tarjeta
+        if not tarjeta.descripcion_cargada:
+            self.txt_descripcion.setEnabled(False)
+            self.txt_descripcion.setPlaceholderText("Cargando descripcion...")
+            self.tareas.ejecutar(
+                self.controller.leer_descripcion,
+                tarjeta.id,
+                clave="detalle_descripcion",
+                al_terminar=self._cargar_descripcion,
+            )
+
+    def _cargar_descripcion(self, descripcion):
+        if descripcion is None:
+            self.txt_descripcion.setPlaceholderText("No se pudo cargar la descripcion")
+            return
+        self.controller.recordar_descripcion(self.tarjeta.id, descripcion)
+        self.txt_descripcion.setPlainText(descripcion)
+        self.txt_descripcion.setPlaceholderText("Anade una descripcion...")
+        self.txt_descripcion.setEnabled(True)
+
+    def _cargar_usuarios(self, users):
+        self.combo_users.clear()
+        for u in users:
+            self.combo_users.addItem(u.username, u.id)
+        self.combo_users.setEnabled(True)
+
     def refrescar_lista_asignados(self):
         self.list_assigned.clear()
         for u in getattr(self.tarjeta, "assignees", []):
@@ -126,14 +218,7 @@ class TarjetaDetalleDialog(QtWidgets.QDialog):
         if any(u.id == uid for u in getattr(self.tarjeta, "assignees", [])):
             return
 
-        if self.controller.gestionar_asignacion(self.list_id, self.tarjeta.id, uid, True):
-            self.tarjeta.assignees = self.controller.db.obtener_asignados_tarjeta(self.tarjeta.id)
-            self.refrescar_lista_asignados()
-
-            if self.parent() and hasattr(self.parent(), "recargar_tablero"):
-                self.parent().recargar_tablero()
-            if self.parent() and hasattr(self.parent(), "renderizar_columnas"):
-                self.parent().renderizar_columnas()
+        self._gestionar_asignacion(uid, True)
 
     def quitar_usuario(self):
         row = self.list_assigned.currentRow()
@@ -141,42 +226,451 @@ class TarjetaDetalleDialog(QtWidgets.QDialog):
             return
 
         user = self.tarjeta.assignees[row]
-        if self.controller.gestionar_asignacion(self.list_id, self.tarjeta.id, user.id, False):
-            self.tarjeta.assignees = self.controller.db.obtener_asignados_tarjeta(self.tarjeta.id)
+        self._gestionar_asignacion(user.id, False)
+
+    def _gestionar_asignacion(self, user_id, asignar):
+        username = self.combo_users.currentText() if asignar else "?"
+        if self.controller.gestionar_asignacion(self.list_id, self.tarjeta.id, user_id, asignar, username):
             self.refrescar_lista_asignados()
+            if self.parent() and hasattr(self.parent(), "_tras_cambio_local"):
+                self.parent()._tras_cambio_local()
 
-            if self.parent() and hasattr(self.parent(), "recargar_tablero"):
-                self.parent().recargar_tablero()
-            if self.parent() and hasattr(self.parent(), "renderizar_columnas"):
-                self.parent().renderizar_columnas()
+    def done(self, resultado):
+        self.tareas.cancelar("detalle_usuarios")
+        self.tareas.cancelar("detalle_descripcion")
+        super().done(resultado)
 
     def get_data(self):
-        return self.txt_titulo.text(), self.txt_descripcion.toPlainText()
+        # Descripción None si no llegó a cargarse: entonces solo se guarda el título
+        descripcion = self.txt_descripcion.toPlainText() if self.txt_descripcion.isEnabled() else None
+        return self.txt_titulo.text(), descripcion
 
 
-class ListaDragDrop(QtWidgets.QListWidget):
-    cardMoved = QtCore.pyqtSignal(str, str, str)
+MIME_TARJETA = "application/x-minitrello-tarjeta"
+# Cada cuánto se piden al servidor los cambios de otros clientes sobre el tablero abierto
+INTERVALO_SINCRONIZACION_MS = 5000
+# Mientras se arrastra el slider de fuente el estilo se aplica como mucho una vez por intervalo
+INTERVALO_FUENTE_MS = 120
+
+
+class ModeloTarjetas(QtCore.QAbstractListModel):
+    # Modelo de una columna sobre lista.cards; la vista solo pide datos de las filas visibles
+    RolTarjeta = QtCore.Qt.UserRole + 1
+    # La vista ha llegado al final y el servidor tiene más tarjetas de esta lista
+    pedirMas = QtCore.pyqtSignal(str)
 
     def __init__(self, list_id, parent=None):
         super().__init__(parent)
         self.list_id = list_id
+        self.tarjetas = []
+        self._firmas = []
+        self.hay_mas = False
+        self.cargando = False
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.tarjetas)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.tarjetas):
+            return None
+        card = self.tarjetas[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return str(card.titulo)
+        if role == QtCore.Qt.UserRole:
+            return card.id
+        if role == self.RolTarjeta:
+            return card
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.ItemIsDropEnabled
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsDragEnabled
+
+    def mimeTypes(self):
+        return [MIME_TARJETA]
+
+    def mimeData(self, indexes):
+        mime = QtCore.QMimeData()
+        if indexes:
+            mime.setData(MIME_TARJETA, QtCore.QByteArray(str(indexes[0].data(QtCore.Qt.UserRole)).encode("utf-8")))
+        return mime
+
+    def supportedDragActions(self):
+        return QtCore.Qt.MoveAction
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self.hay_mas and not self.cargando
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        # Las filas llegan después con actualizar(); aquí solo se pide la página una vez
+        if self.canFetchMore(parent):
+            self.cargando = True
+            self.pedirMas.emit(self.list_id)
+
+    def supportedDropActions(self):
+        return QtCore.Qt.MoveAction
+
+    @staticmethod
+    def _firma(card):
+        return str(card.titulo), tuple((u.id, u.username) for u in getattr(card, "assignees", [])[:3])
+
+    def actualizar(self, cards, hay_mas=False):
+        # Diff por id contra el contenido actual: quita, mueve, inserta o marca como
+        # cambiadas solo las filas necesarias, sin resetear el modelo
+        self.hay_mas, self.cargando = hay_mas, False
+        destino = {c.id: i for i, c in enumerate(cards)}
+        for fila in range(len(self.tarjetas) - 1, -1, -1):
+            if self.tarjetas[fila].id not in destino:
+                self.beginRemoveRows(QtCore.QModelIndex(), fila, fila)
+                del self.tarjetas[fila]
+                del self._firmas[fila]
+                self.endRemoveRows()
+
+        # Las filas que ya siguen el orden nuevo (la subsecuencia creciente más larga) no se
+        # mueven: llevar una tarjeta del principio al final es un solo movimiento, no uno por fila
+        fijas = {self.tarjetas[f].id for f in _subsecuencia_creciente([destino[c.id] for c in self.tarjetas])}
+        filas = {c.id: f for f, c in enumerate(self.tarjetas)}
+        for idx, card in enumerate(cards):
+            fila = filas.get(card.id)
+            if fila is None:
+                self.beginInsertRows(QtCore.QModelIndex(), idx, idx)
+                self.tarjetas.insert(idx, card)
+                self._firmas.insert(idx, self._firma(card))
+                self.endInsertRows()
+                self._renumerar(filas, idx)
+                continue
+
+            if card.id in fijas:
+                # Delante solo puede haber filas que aún no están en su sitio: se apartan al final
+                for _ in range(fila - idx):
+                    self._mover(filas, idx, len(self.tarjetas))
+            elif fila != idx:
+                self._mover(filas, fila, idx)
+
+            self.tarjetas[idx] = card
+            firma = self._firma(card)
+            if firma != self._firmas[idx]:
+                self._firmas[idx] = firma
+                indice = self.index(idx)
+                self.dataChanged.emit(indice, indice)
+
+    def _mover(self, filas, desde, hasta):
+        # `hasta` como en beginMoveRows: la fila delante de la que se deja, contada antes de quitarla
+        self.beginMoveRows(QtCore.QModelIndex(), desde, desde, QtCore.QModelIndex(), hasta)
+        nueva = hasta if hasta < desde else hasta - 1
+        self.tarjetas.insert(nueva, self.tarjetas.pop(desde))
+        self._firmas.insert(nueva, self._firmas.pop(desde))
+        self.endMoveRows()
+        self._renumerar(filas, min(desde, nueva), max(desde, nueva) + 1)
+
+    def _renumerar(self, filas, inicio, fin=None):
+        for f in range(inicio, len(self.tarjetas) if fin is None else fin):
+            filas[self.tarjetas[f].id] = f
+
+
+def _subsecuencia_creciente(valores):
+    # Índices de una subsecuencia creciente de longitud máxima (patience sorting, O(n log n))
+    colas, indices_colas, anterior = [], [], [None] * len(valores)
+    for i, v in enumerate(valores):
+        k = bisect_left(colas, v)
+        anterior[i] = indices_colas[k - 1] if k else None
+        if k == len(colas):
+            colas.append(v)
+            indices_colas.append(i)
+        else:
+            colas[k] = v
+            indices_colas[k] = i
+    resultado, i = [], indices_colas[-1] if indices_colas else None
+    while i is not None:
+        resultado.append(i)
+        i = anterior[i]
+    return resultado
+
+
+class DelegadoTarjeta(QtWidgets.QStyledItemDelegate):
+    # Pinta cada tarjeta (título, avatares y botones de acción) sin crear widgets por fila
+    MARGEN_H = 15
+    MARGEN_V = 10
+    TAM_BOTON = 36
+    TAM_ICONO = 16
+    TAM_AVATAR = 26
+    PASO_AVATAR = 18
+    ALTO_MINIMO = 80
+
+    def __init__(self, vista):
+        super().__init__(vista)
+        self.vista = vista
+        self.icono_editar = icono_svg("edit.svg")
+        self.icono_eliminar = icono_svg("trash.svg")
+
+    def _zonas(self, rect, card):
+        r = rect.adjusted(self.MARGEN_H, self.MARGEN_V, -self.MARGEN_H, -self.MARGEN_V)
+        y_boton = r.center().y() - self.TAM_BOTON // 2
+        eliminar = QtCore.QRect(r.right() - self.TAM_BOTON + 1, y_boton, self.TAM_BOTON, self.TAM_BOTON)
+        editar = eliminar.translated(-(self.TAM_BOTON + 4), 0)
+
+        n_avatares = len(getattr(card, "assignees", [])[:3])
+        ancho_avatares = self.TAM_AVATAR + self.PASO_AVATAR * (n_avatares - 1) if n_avatares else 0
+        avatares = QtCore.QRect(
+            editar.left() - 8 - ancho_avatares, r.center().y() - self.TAM_AVATAR // 2, ancho_avatares, self.TAM_AVATAR
+        )
+
+        derecha_titulo = (avatares.left() if n_avatares else editar.left()) - 8
+        titulo = QtCore.QRect(r.left(), r.top(), max(10, derecha_titulo - r.left()), r.height())
+        return {"titulo": titulo, "avatares": avatares, "editar": editar, "eliminar": eliminar}
+
+    def _fuente_titulo(self, option):
+        fuente = QtGui.QFont(option.font)
+        fuente.setWeight(QtGui.QFont.DemiBold)
+        return fuente
+
+    def sizeHint(self, option, index):
+        card = index.data(ModeloTarjetas.RolTarjeta)
+        ancho = self.vista.viewport().width() - 2 * self.vista.spacing()
+        zonas = self._zonas(QtCore.QRect(0, 0, ancho, self.ALTO_MINIMO), card)
+        fm = QtGui.QFontMetrics(self._fuente_titulo(option))
+        alto_texto = fm.boundingRect(zonas["titulo"], QtCore.Qt.TextWordWrap, str(card.titulo)).height()
+        return QtCore.QSize(ancho, max(self.ALTO_MINIMO, alto_texto + 2 * self.MARGEN_V))
+
+    def paint(self, painter, option, index):
+        card = index.data(ModeloTarjetas.RolTarjeta)
+        if card is None:
+            return
+
+        opt = QtWidgets.QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        estilo = self.vista.style()
+        # Fondo de la tarjeta según las reglas #listaTarjetas::item del tema
+        estilo.drawPrimitive(QtWidgets.QStyle.PE_PanelItemViewItem, opt, painter, self.vista)
+
+        zonas = self._zonas(option.rect, card)
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+
+        painter.setFont(self._fuente_titulo(option))
+        painter.setPen(self.vista.palette().color(QtGui.QPalette.Text))
+        painter.drawText(
+            zonas["titulo"], QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft | QtCore.Qt.TextWordWrap, str(card.titulo)
+        )
+
+        fuente_avatar = QtGui.QFont(option.font)
+        fuente_avatar.setBold(True)
+        fuente_avatar.setPixelSize(11)
+        painter.setFont(fuente_avatar)
+        for i, u in enumerate(getattr(card, "assignees", [])[:3]):
+            circulo = QtCore.QRect(
+                zonas["avatares"].left() + i * self.PASO_AVATAR, zonas["avatares"].top(), self.TAM_AVATAR, self.TAM_AVATAR
+            )
+            painter.setPen(QtGui.QPen(QtCore.Qt.white, 1))
+            painter.setBrush(self.vista.colorAvatar)
+            painter.drawEllipse(circulo)
+            painter.drawText(circulo, QtCore.Qt.AlignCenter, u.username[0].upper() if u.username else "?")
+
+        raton = self.vista.posicion_raton()
+        for nombre, icono in (("editar", self.icono_editar), ("eliminar", self.icono_eliminar)):
+            zona = zonas[nombre]
+            encima = raton is not None and zona.contains(raton)
+            color = self.vista.colorAccionHover if encima else self.vista.colorAccion
+            if color.alpha():
+                painter.setPen(QtCore.Qt.NoPen)
+                painter.setBrush(color)
+                painter.drawRoundedRect(zona, 6, 6)
+            icono.paint(painter, zona.adjusted(
+                (self.TAM_BOTON - self.TAM_ICONO) // 2, (self.TAM_BOTON - self.TAM_ICONO) // 2,
+                -(self.TAM_BOTON - self.TAM_ICONO) // 2, -(self.TAM_BOTON - self.TAM_ICONO) // 2,
+            ))
+        painter.restore()
+
+    def accion_en(self, rect, card, pos):
+        zonas = self._zonas(rect, card)
+        for nombre in ("editar", "eliminar"):
+            if zonas[nombre].contains(pos):
+                return nombre
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() in (QtCore.QEvent.MouseButtonRelease, QtCore.QEvent.MouseButtonDblClick):
+            if event.button() == QtCore.Qt.LeftButton:
+                card = index.data(ModeloTarjetas.RolTarjeta)
+                accion = self.accion_en(option.rect, card, event.pos()) if card else None
+                if accion:
+                    if event.type() == QtCore.QEvent.MouseButtonRelease:
+                        senal = self.vista.editarTarjeta if accion == "editar" else self.vista.eliminarTarjeta
+                        senal.emit(self.vista.list_id, card.id)
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+
+class ListaDragDrop(QtWidgets.QListView):
+    cardMoved = QtCore.pyqtSignal(str, str, str, int)
+    editarTarjeta = QtCore.pyqtSignal(str, str)
+    eliminarTarjeta = QtCore.pyqtSignal(str, str)
+
+    def __init__(self, list_id, parent=None):
+        super().__init__(parent)
+        self.list_id = list_id
+        self._color_accion = QtGui.QColor(QtCore.Qt.transparent)
+        self._color_accion_hover = QtGui.QColor("#e4e6ea")
+        self._color_avatar = QtGui.QColor("#172b4d")
+        self._raton = None
+        self._fila_drop = None
+
+        self.modelo = ModeloTarjetas(list_id, self)
+        self.setModel(self.modelo)
+        self.delegado = DelegadoTarjeta(self)
+        self.setItemDelegate(self.delegado)
+
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
         self.setDragDropMode(QtWidgets.QAbstractItemView.DragDrop)
         self.setDefaultDropAction(QtCore.Qt.MoveAction)
+        self.setMouseTracking(True)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setResizeMode(QtWidgets.QListView.Adjust)
+        self.setLayoutMode(QtWidgets.QListView.Batched)
+        self.setBatchSize(100)
+        # Ctrl/Mayús para seleccionar varias tarjetas y asignarlas de una vez (menú contextual)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        # Qt pide la siguiente página al tocar fondo; se adelanta cuando falta una pantalla
+        self.verticalScrollBar().valueChanged.connect(self._precargar)
+
+    def _precargar(self, valor):
+        barra = self.verticalScrollBar()
+        if barra.maximum() - valor <= self.viewport().height() and self.modelo.canFetchMore():
+            self.modelo.fetchMore()
+
+    # Colores de los botones y avatares, configurables desde el .qss con qproperty-*
+    def _get_color_accion(self):
+        return self._color_accion
+
+    def _set_color_accion(self, color):
+        self._color_accion = QtGui.QColor(color)
+
+    def _get_color_accion_hover(self):
+        return self._color_accion_hover
+
+    def _set_color_accion_hover(self, color):
+        self._color_accion_hover = QtGui.QColor(color)
+
+    def _get_color_avatar(self):
+        return self._color_avatar
+
+    def _set_color_avatar(self, color):
+        self._color_avatar = QtGui.QColor(color)
+
+    colorAccion = QtCore.pyqtProperty(QtGui.QColor, _get_color_accion, _set_color_accion)
+    colorAccionHover = QtCore.pyqtProperty(QtGui.QColor, _get_color_accion_hover, _set_color_accion_hover)
+    colorAvatar = QtCore.pyqtProperty(QtGui.QColor, _get_color_avatar, _set_color_avatar)
+
+    def posicion_raton(self):
+        return self._raton
+
+    def mouseMoveEvent(self, event):
+        self._raton = event.pos()
+        index = self.indexAt(event.pos())
+        card = index.data(ModeloTarjetas.RolTarjeta) if index.isValid() else None
+        sobre_accion = card is not None and self.delegado.accion_en(self.visualRect(index), card, event.pos())
+        self.viewport().setCursor(QtCore.Qt.PointingHandCursor if sobre_accion else QtCore.Qt.ArrowCursor)
+        self.viewport().update()
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self._raton = None
+        self.viewport().update()
+        super().leaveEvent(event)
+
+    def _acepta(self, event):
+        return isinstance(event.source(), ListaDragDrop) and event.mimeData().hasFormat(MIME_TARJETA)
+
+    def dragEnterEvent(self, event):
+        if self._acepta(event):
+            event.setDropAction(QtCore.Qt.MoveAction)
+            event.accept()
+        else:
+            event.ignore()
+
+    def dragMoveEvent(self, event):
+        if not self._acepta(event):
+            event.ignore()
+            return
+        fila = self._fila_destino(event.pos())
+        if fila != self._fila_drop:
+            self._fila_drop = fila
+            self.viewport().update()
+        event.setDropAction(QtCore.Qt.MoveAction)
+        event.accept()
+
+    def dragLeaveEvent(self, event):
+        self._fila_drop = None
+        self.viewport().update()
+        super().dragLeaveEvent(event)
+
+    def _fila_destino(self, pos):
+        index = self.indexAt(pos)
+        if index.isValid():
+            return index.row() + (1 if pos.y() > self.visualRect(index).center().y() else 0)
+        # En el hueco entre tarjetas o por debajo de la última
+        for fila in range(self.modelo.rowCount()):
+            if not self.isRowHidden(fila) and self.visualRect(self.modelo.index(fila)).center().y() > pos.y():
+                return fila
+        return self.modelo.rowCount()
+
+    def _y_linea_drop(self, fila):
+        # Borde superior de la primera fila visible desde `fila`, o inferior de la última
+        for f in range(fila, self.modelo.rowCount()):
+            if not self.isRowHidden(f):
+                return self.visualRect(self.modelo.index(f)).top() - self.spacing() // 2
+        for f in range(min(fila, self.modelo.rowCount()) - 1, -1, -1):
+            if not self.isRowHidden(f):
+                return self.visualRect(self.modelo.index(f)).bottom() + self.spacing() // 2
+        return self.spacing()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._fila_drop is None:
+            return
+        y = self._y_linea_drop(self._fila_drop)
+        painter = QtGui.QPainter(self.viewport())
+        painter.setPen(QtGui.QPen(self.palette().color(QtGui.QPalette.Highlight), 3))
+        painter.drawLine(6, y, self.viewport().width() - 6, y)
+        painter.end()
+
+    def startDrag(self, acciones):
+        # Con varias seleccionadas se arrastra solo la tarjeta pulsada
+        indice = self.currentIndex()
+        if not indice.isValid():
+            return
+        drag = QtGui.QDrag(self)
+        drag.setMimeData(self.modelo.mimeData([indice]))
+        drag.setPixmap(self.viewport().grab(self.visualRect(indice)))
+        drag.exec_(QtCore.Qt.MoveAction)
 
     def dropEvent(self, event):
         source_widget = event.source()
-        if not isinstance(source_widget, ListaDragDrop):
+        if not self._acepta(event):
             event.ignore()
             return
 
-        item = source_widget.currentItem()
-        if item:
-            card_id = item.data(QtCore.Qt.UserRole)
-            if source_widget != self:
-                self.cardMoved.emit(source_widget.list_id, self.list_id, card_id)
-
+        card_id = bytes(event.mimeData().data(MIME_TARJETA)).decode("utf-8")
+        fila = self._fila_destino(event.pos())
+        if card_id and source_widget is self:
+            # La fila se cuenta con la tarjeta aún en su sitio; se pasa a índice final
+            origen = next((i for i, c in enumerate(self.modelo.tarjetas) if c.id == card_id), None)
+            if origen is not None and fila > origen:
+                fila -= 1
+            if origen is not None and fila != origen:
+                self.cardMoved.emit(self.list_id, self.list_id, card_id, fila)
+        elif card_id:
+            self.cardMoved.emit(source_widget.list_id, self.list_id, card_id, fila)
+
+        # El modelo no implementa removeRows: la tarjeta se mueve al repintar desde el tablero
+        self._fila_drop = None
+        self.viewport().update()
+        event.setDropAction(QtCore.Qt.MoveAction)
         event.accept()
 
 
@@ -216,6 +710,8 @@ class PapeleraTablerosDialog(QtWidgets.QDialog):
     def __init__(self, db_controller, parent=None):
         super().__init__(parent)
         self.db = db_controller
+        self.tareas = obtener_gestor_tareas()
+        self.tableros = []
         self.setWindowTitle("Papelera de tableros")
         self.setMinimumSize(400, 300)
         self.setStyleSheet("background-color: white;")
@@ -244,7 +740,12 @@ class PapeleraTablerosDialog(QtWidgets.QDialog):
 
     def cargar(self):
         self.lista.clear()
-        self.tableros = self.db.obtener_papelera_tableros()
+        self.lista.addItem("Cargando...")
+        self.tareas.ejecutar(self.db.obtener_papelera_tableros, clave="papelera_tableros", al_terminar=self._mostrar)
+
+    def _mostrar(self, tableros):
+        self.lista.clear()
+        self.tableros = tableros
         if not self.tableros:
             self.lista.addItem("Papelera vacia")
             return
@@ -261,11 +762,14 @@ class PapeleraTablerosDialog(QtWidgets.QDialog):
 
         if confirmar_accion(self, "Confirmar", "Quieres restaurar este tablero?", "Si, restaurar"):
             tid = self.lista.currentItem().data(QtCore.Qt.UserRole)
-            if self.db.restaurar_tablero(tid):
-                self.cargar()
-                if self.parent() and hasattr(self.parent(), "cargar_tableros"):
-                    self.parent().cargar_tableros()
-                QtWidgets.QMessageBox.information(self, "Listo", "Tablero restaurado")
+            self.tareas.ejecutar(self.db.restaurar_tablero, tid, al_terminar=self._al_restaurar)
+
+    def _al_restaurar(self, exito):
+        if exito:
+            self.cargar()
+            if self.parent() and hasattr(self.parent(), "cargar_tableros"):
+                self.parent().cargar_tableros()
+            QtWidgets.QMessageBox.information(self, "Listo", "Tablero restaurado")
 
     def borrar_final(self):
         row = self.lista.currentRow()
@@ -281,8 +785,15 @@ class PapeleraTablerosDialog(QtWidgets.QDialog):
             "Cancelar",
         ):
             tid = self.lista.currentItem().data(QtCore.Qt.UserRole)
-            if self.db.eliminar_tablero_definitivamente(tid):
-                self.cargar()
+            self.tareas.ejecutar(
+                self.db.eliminar_tablero_definitivamente,
+                tid,
+                al_terminar=lambda exito: exito and self.cargar(),
+            )
+
+    def done(self, resultado):
+        self.tareas.cancelar("papelera_tableros")
+        super().done(resultado)
 
 
 class PapeleraListasDialog(QtWidgets.QDialog):
@@ -290,6 +801,8 @@ class PapeleraListasDialog(QtWidgets.QDialog):
         super().__init__(parent)
         self.controller = controller
         self.board_id = board_id
+        self.tareas = obtener_gestor_tareas()
+        self.items_data = []
 
         self.setWindowTitle("Papelera de columnas")
         self.setMinimumSize(500, 400)
@@ -333,8 +846,15 @@ class PapeleraListasDialog(QtWidgets.QDialog):
 
     def cargar_datos(self):
         self.lista_papelera.clear()
+        self.lista_papelera.addItem("Cargando...")
+        self.btn_restaurar.setEnabled(False)
+        self.btn_borrar.setEnabled(False)
         # Este método sirve para obtener las listas eliminadas usando el controller que ya conoce el tablero actual
-        self.items_data = self.controller.obtener_papelera_listas()
+        self.tareas.ejecutar(self.controller.obtener_papelera_listas, clave="papelera_listas", al_terminar=self._mostrar_datos)
+
+    def _mostrar_datos(self, items):
+        self.lista_papelera.clear()
+        self.items_data = items
 
         if not self.items_data:
             self.lista_papelera.addItem("La papelera esta vacia")
@@ -357,15 +877,18 @@ class PapeleraListasDialog(QtWidgets.QDialog):
             return
 
         if confirmar_accion(self, "Restaurar", "Quieres devolver esta columna al tablero?", "Si, restaurar"):
-            list_id = self.lista_papelera.currentItem().data(QtCore.Qt.UserRole)
-
-            if self.controller.restaurar_lista_papelera(list_id):
+            lista = self.items_data[row]
+            if self.controller.restaurar_lista_papelera(lista.id, lista):
+                self._quitar_fila(row)
                 QtWidgets.QMessageBox.information(self, "Exito", "Columna restaurada")
-                self.cargar_datos()
-                if self.parent() and hasattr(self.parent(), "recargar_tablero"):
-                    self.parent().recargar_tablero()
-                if self.parent() and hasattr(self.parent(), "renderizar_columnas"):
-                    self.parent().renderizar_columnas()
+                if self.parent() and hasattr(self.parent(), "_tras_cambio_local"):
+                    self.parent()._tras_cambio_local(actualizar_filtros=True)
+
+    def _quitar_fila(self, row):
+        self.items_data.pop(row)
+        self.lista_papelera.takeItem(row)
+        if not self.items_data:
+            self._mostrar_datos([])
 
     def borrar_seleccionada(self):
         row = self.lista_papelera.currentRow()
@@ -382,14 +905,17 @@ class PapeleraListasDialog(QtWidgets.QDialog):
         ):
             list_id = self.lista_papelera.currentItem().data(QtCore.Qt.UserRole)
 
-            if self.controller.eliminar_lista_definitivamente(list_id):
-                self.cargar_datos()
-                if self.parent() and hasattr(self.parent(), "recargar_tablero"):
-                    self.parent().recargar_tablero()
-                if self.parent() and hasattr(self.parent(), "renderizar_columnas"):
-                    self.parent().renderizar_columnas()
-            else:
-                QtWidgets.QMessageBox.warning(self, "Error", "No se pudo eliminar")
+            self.tareas.ejecutar(self.controller.eliminar_lista_definitivamente, list_id, al_terminar=self._al_borrar)
+
+    def _al_borrar(self, exito):
+        if exito:
+            self.cargar_datos()
+        else:
+            QtWidgets.QMessageBox.warning(self, "Error", "No se pudo eliminar")
+
+    def done(self, resultado):
+        self.tareas.cancelar("papelera_listas")
+        super().done(resultado)
 
 
 class PapeleraDialog(QtWidgets.QDialog):
@@ -397,6 +923,8 @@ class PapeleraDialog(QtWidgets.QDialog):
         super().__init__(parent)
         self.controller = controller
         self.board_id = board_id
+        self.tareas = obtener_gestor_tareas()
+        self.items_data = []
 
         self.setWindowTitle("Papelera de tarjetas")
         self.setMinimumSize(500, 400)
@@ -440,8 +968,15 @@ class PapeleraDialog(QtWidgets.QDialog):
 
     def cargar_datos(self):
         self.lista_papelera.clear()
+        self.lista_papelera.addItem("Cargando...")
+        self.btn_restaurar.setEnabled(False)
+        self.btn_borrar.setEnabled(False)
         # Este método sirve para obtener las tarjetas eliminadas usando el controller que ya tiene el contexto del tablero
-        self.items_data = self.controller.obtener_papelera()
+        self.tareas.ejecutar(self.controller.obtener_papelera, clave="papelera_tarjetas", al_terminar=self._mostrar_datos)
+
+    def _mostrar_datos(self, items):
+        self.lista_papelera.clear()
+        self.items_data = items
 
         if not self.items_data:
             self.lista_papelera.addItem("La papelera esta vacia")
@@ -464,15 +999,18 @@ class PapeleraDialog(QtWidgets.QDialog):
             return
 
         if confirmar_accion(self, "Restaurar", "Quieres devolver esta tarjeta al tablero?", "Si, restaurar"):
-            card_id = self.lista_papelera.currentItem().data(QtCore.Qt.UserRole)
-
-            if self.controller.restaurar_tarjeta(card_id):
+            card = self.items_data[row]
+            if self.controller.restaurar_tarjeta(card.id, card):
+                self._quitar_fila(row)
                 QtWidgets.QMessageBox.information(self, "Exito", "Tarjeta restaurada")
-                self.cargar_datos()
-                if self.parent() and hasattr(self.parent(), "recargar_tablero"):
-                    self.parent().recargar_tablero()
-                if self.parent() and hasattr(self.parent(), "renderizar_columnas"):
-                    self.parent().renderizar_columnas()
+                if self.parent() and hasattr(self.parent(), "_tras_cambio_local"):
+                    self.parent()._tras_cambio_local()
+
+    def _quitar_fila(self, row):
+        self.items_data.pop(row)
+        self.lista_papelera.takeItem(row)
+        if not self.items_data:
+            self._mostrar_datos([])
 
     def borrar_seleccionada(self):
         row = self.lista_papelera.currentRow()
@@ -489,23 +1027,116 @@ class PapeleraDialog(QtWidgets.QDialog):
         ):
             card_id = self.lista_papelera.currentItem().data(QtCore.Qt.UserRole)
 
-            if self.controller.eliminar_definitivamente(card_id):
-                self.cargar_datos()
-                if self.parent() and hasattr(self.parent(), "recargar_tablero"):
-                    self.parent().recargar_tablero()
-                if self.parent() and hasattr(self.parent(), "renderizar_columnas"):
-                    self.parent().renderizar_columnas()
-            else:
-                QtWidgets.QMessageBox.warning(self, "Error", "No se pudo eliminar")
+            self.tareas.ejecutar(self.controller.eliminar_definitivamente, card_id, al_terminar=self._al_borrar)
+
+    def _al_borrar(self, exito):
+        if exito:
+            self.cargar_datos()
+        else:
+            QtWidgets.QMessageBox.warning(self, "Error", "No se pudo eliminar")
+
+    def done(self, resultado):
+        self.tareas.cancelar("papelera_tarjetas")
+        super().done(resultado)
+
+
+class DiagnosticoDialog(QtWidgets.QDialog):
+    # Panel oculto (Ctrl+Mayús+D) con la latencia de cada operación de la capa de datos
+    COLUMNAS = ("Operación", "Llamadas", "Errores", "Filas/llamada", "p50 ms", "p95 ms", "p99 ms", "Máx ms", "Total ms")
+
+    def __init__(self, instrumentacion, parent=None):
+        super().__init__(parent)
+        self.instrumentacion = instrumentacion
+        self.setWindowTitle("Diagnóstico")
+        self.setMinimumSize(820, 420)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.lblEstado = QtWidgets.QLabel()
+        layout.addWidget(self.lblEstado)
+
+        self.tabla = QtWidgets.QTableWidget(0, len(self.COLUMNAS))
+        self.tabla.setHorizontalHeaderLabels(self.COLUMNAS)
+        self.tabla.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.tabla)
+
+        btn_layout = QtWidgets.QHBoxLayout()
+        self.btn_activar = QtWidgets.QPushButton()
+        self.btn_activar.clicked.connect(self.alternar)
+        btn_reiniciar = QtWidgets.QPushButton("Reiniciar")
+        btn_reiniciar.clicked.connect(self.reiniciar)
+        btn_exportar = QtWidgets.QPushButton("Exportar JSON")
+        btn_exportar.clicked.connect(self.exportar)
+        btn_cerrar = QtWidgets.QPushButton("Cerrar")
+        btn_cerrar.clicked.connect(self.reject)
+        btn_layout.addWidget(self.btn_activar)
+        btn_layout.addWidget(btn_reiniciar)
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_exportar)
+        btn_layout.addWidget(btn_cerrar)
+        layout.addLayout(btn_layout)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refrescar)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refrescar()
+        self._timer.start()
+
+    def refrescar(self):
+        activa = self.instrumentacion.activa
+        self.btn_activar.setText("Dejar de medir" if activa else "Empezar a medir")
+        self.lblEstado.setText("Midiendo" if activa else "Medición desactivada")
+
+        filas = self.instrumentacion.registro.resumen()
+        self.tabla.setRowCount(len(filas))
+        for fila, datos in enumerate(filas):
+            valores = (
+                datos["operacion"],
+                str(datos["llamadas"]),
+                f"{datos['errores']} ({datos['tasa_error']:.0%})",
+                f"{datos['filas_por_llamada']:.1f}",
+                *(f"{datos[k]:.1f}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms", "total_ms")),
+            )
+            for columna, valor in enumerate(valores):
+                self.tabla.setItem(fila, columna, QtWidgets.QTableWidgetItem(valor))
+
+    def alternar(self):
+        if self.instrumentacion.activa:
+            self.instrumentacion.desactivar()
+        else:
+            self.instrumentacion.activar()
+        self.refrescar()
+
+    def reiniciar(self):
+        self.instrumentacion.registro.reiniciar()
+        self.refrescar()
+
+    def exportar(self):
+        ruta, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Exportar métricas", "metricas.json", "JSON (*.json)")
+        if not ruta:
+            return
+        try:
+            self.instrumentacion.registro.exportar_json(ruta, {"arranque_ms": {f: s * 1000 for f, s in Arranque.tiempos()}})
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Error", f"No se pudo exportar: {e}")
+
+    def done(self, resultado):
+        self._timer.stop()
+        super().done(resultado)
 
 
 class MainWindow(QtWidgets.QWidget):
     sesion_cerrada = QtCore.pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, db_controller=None):
         super().__init__()
         try:
-            uic.loadUi(ui_path, self)
+            with Arranque.medir("interfaz principal"):
+                cargar_ui(self, ui_path)
         except FileNotFoundError:
             print(f"Error: Could not find UI file at {ui_path}")
             sys.exit(1)
@@ -523,17 +1154,57 @@ class MainWindow(QtWidgets.QWidget):
         self.setWindowTitle("Organizador de tareas - ALACSA Tecnología y BlockChain")
         self.settings = QSettings("MiniTrello", "App")
 
-        self.tema_actual = "brutalista"
-        self.cargar_tema(self.tema_actual)
+        precargar_iconos(colores=(None, "#D32F2F"))
 
-        self.db_controller = SupabaseController()
+        self.tamano_fuente = self.settings.value("tamano_fuente", 14, type=int)
+        self.tema_actual = "brutalista"
+        with Arranque.medir("estilos principal"):
+            self.cargar_tema(self.tema_actual)
+        self._timer_fuente = QtCore.QTimer(self)
+        self._timer_fuente.setSingleShot(True)
+        self._timer_fuente.setInterval(INTERVALO_FUENTE_MS)
+        self._timer_fuente.timeout.connect(lambda: self.aplicar_tamano_fuente(self.tamano_fuente))
+
+        self.db_controller = db_controller or obtener_controlador()
+        self.instrumentacion = obtener_instrumentacion()
+        self.tareas = obtener_gestor_tareas()
+        # Las escrituras de los cambios optimistas van por un único hilo para respetar su orden
+        pool_escrituras = QtCore.QThreadPool(self)
+        pool_escrituras.setMaxThreadCount(1)
+        self.escrituras = GestorTareas(self, pool=pool_escrituras)
+        self.sincronizacion = GestorTareas(self, cursor_ocupado=False)
+        self.cola_escritura = ColaEscritura(self.db_controller, self.escrituras, parent=self)
         self.current_user = User(username="UsuarioDemo")
+        self.tableros = []
+
+        self._tableros_sin_guardar = {}
+        self._timer_cache = QtCore.QTimer(self)
+        self._timer_cache.setSingleShot(True)
+        self._timer_cache.setInterval(500)
+        self._timer_cache.timeout.connect(self._guardar_cache_pendiente)
+
+        # Sincronización incremental: cursor updated_at del tablero abierto y versión de los
+        # cambios locales, para descartar respuestas que ya no reflejan lo que hay en memoria
+        self._cursor_cambios = None
+        self._version_local = 0
+        self._timer_sincronizacion = QtCore.QTimer(self)
+        self._timer_sincronizacion.setInterval(INTERVALO_SINCRONIZACION_MS)
+        self._timer_sincronizacion.timeout.connect(self.sincronizar_tablero)
 
         self.filtro_usuario = None
         self.filtro_columna = None
         self.filtro_texto = None
-
-        self.tamano_fuente = self.settings.value("tamano_fuente", 14, type=int)
+        self.indice_busqueda = IndiceBusqueda()
+        # Ids que casan con filtro_texto; None cuando no se está buscando
+        self._ids_busqueda = None
+        # Tarjetas ocultas por los filtros tal y como están ahora en pantalla
+        self._ids_ocultos = set()
+        self._texto_aplicado = None
+
+        self._timer_filtros = QtCore.QTimer(self)
+        self._timer_filtros.setSingleShot(True)
+        self._timer_filtros.setInterval(200)
+        self._timer_filtros.timeout.connect(self._aplicar_filtros)
 
         self.pestanasPrincipal.setUsesScrollButtons(True)
         self.pestanasPrincipal.setElideMode(QtCore.Qt.ElideNone)
@@ -541,22 +1212,19 @@ class MainWindow(QtWidgets.QWidget):
 
         self.configurar_conexiones()
         self.pestanasPrincipal.setCurrentIndex(0)
-        self.cargar_tableros()
 
         self.aplicar_tamano_fuente(self.tamano_fuente)
 
     def cargar_tema(self, nombre_tema):
-        filename = (
-            "trello_oscuro.qss"
-            if nombre_tema == "oscuro"
-            else "trello_claro.qss"
-            if nombre_tema == "claro"
-            else "brutalista_salmon.qss"
-        )
-        path = resource_path(os.path.join("estilos", filename))
+        self.tema_actual = nombre_tema
+        self._aplicar_hoja_estilos()
+
+    def _aplicar_hoja_estilos(self):
+        # La hoja de (tema, tamaño de fuente) sale ya compilada de la caché de Temas; los diálogos
+        # hijos la heredan de la ventana
+        path = resource_path(os.path.join("estilos", archivo_tema(self.tema_actual)))
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                self.setStyleSheet(f.read())
+            aplicar_hoja(self, hoja_estilos(path, self.tamano_fuente))
         except Exception as e:
             print(f"Error cargando tema: {e}")
 
@@ -603,6 +1271,17 @@ class MainWindow(QtWidgets.QWidget):
         self.btnNuevaTarjeta.clicked.connect(self.crear_nueva_tarjeta)
         self.btnGuardarTablero.clicked.connect(self.guardar_tablero)
 
+        self.lblGuardando = QtWidgets.QLabel("")
+        self.lblGuardando.setObjectName("lblGuardando")
+        self.btnGuardarTablero.parentWidget().layout().insertWidget(0, self.lblGuardando)
+        self.cola_escritura.pendientes_cambiado.connect(self._mostrar_estado_guardado)
+        self.cola_escritura.conflictos_diario.connect(self._mostrar_conflictos_diario)
+
+        self.atajoRecargar = QtWidgets.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_F5), self)
+        self.atajoRecargar.activated.connect(self.refrescar_tablero)
+        self.atajoDiagnostico = QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Shift+D"), self)
+        self.atajoDiagnostico.activated.connect(self.abrir_diagnostico)
+
         if not hasattr(self, "btnPapeleraTableros"):
             parent_layout = self.btnNuevoTablero.parentWidget().layout()
 
@@ -634,7 +1313,7 @@ class MainWindow(QtWidgets.QWidget):
         self.sliderFuente.setMaximum(24)
         self.sliderFuente.setValue(self.tamano_fuente)
         self.sliderFuente.setFixedWidth(150)
-        self.sliderFuente.valueChanged.connect(self.aplicar_tamano_fuente)
+        self.sliderFuente.valueChanged.connect(self._al_mover_fuente)
         fuente_layout.addWidget(self.sliderFuente)
 
         btn_mas = QtWidgets.QPushButton("+")
@@ -654,6 +1333,14 @@ class MainWindow(QtWidgets.QWidget):
         nuevo = max(10, min(24, nuevo))
         self.sliderFuente.setValue(nuevo)
 
+    def _al_mover_fuente(self, size):
+        # La etiqueta sigue al slider al momento; el estilo, como mucho cada INTERVALO_FUENTE_MS
+        self.tamano_fuente = size
+        if hasattr(self, "lblFuenteValor"):
+            self.lblFuenteValor.setText(f"{size}px")
+        if not self._timer_fuente.isActive():
+            self._timer_fuente.start()
+
     def aplicar_tamano_fuente(self, size):
         self.tamano_fuente = size
         self.settings.setValue("tamano_fuente", size)
@@ -661,15 +1348,7 @@ class MainWindow(QtWidgets.QWidget):
         if hasattr(self, "lblFuenteValor"):
             self.lblFuenteValor.setText(f"{size}px")
 
-        current_style = self.styleSheet()
-        font_style = f"\n* {{ font-size: {size}px; }}"
-
-        import re
-        if re.search(r"\*\s*\{[^}]*font-size:", current_style):
-            current_style = re.sub(r"(\*\s*\{[^}]*font-size:)\s*\d+px", f"\\1 {size}px", current_style)
-            self.setStyleSheet(current_style)
-        else:
-            self.setStyleSheet(current_style + font_style)
+        self._aplicar_hoja_estilos()
 
         # Usando el tamaño de fuente calculamos las dimensiones de las pestañas para hacerlas responsivas
         tab_h = max(28, int(size * 2.2))
@@ -679,9 +1358,11 @@ class MainWindow(QtWidgets.QWidget):
         self.pestanasPrincipal.tabBar().setIconSize(QtCore.QSize(int(size * 1.2), int(size * 1.2)))
 
         # Opcional: si quieres que se note el “padding” al cambiar fuente
-        self.pestanasPrincipal.tabBar().setStyleSheet(
+        estilo_pestanas = (
             f"QTabBar::tab {{ padding: {max(6, int(size*0.6))}px {max(10, int(size*1.1))}px; min-width: {tab_w}px; }}"
         )
+        if self.pestanasPrincipal.tabBar().styleSheet() != estilo_pestanas:
+            self.pestanasPrincipal.tabBar().setStyleSheet(estilo_pestanas)
 
 
     def _crear_controles_filtros(self):
@@ -719,20 +1400,18 @@ class MainWindow(QtWidgets.QWidget):
             return
 
         usuario_actual = self.comboFiltroUsuario.currentData()
-        columna_actual = self.comboFiltroColumna.currentData()
-
-        self.comboFiltroUsuario.blockSignals(True)
-        self.comboFiltroUsuario.clear()
-        self.comboFiltroUsuario.addItem("Todos los usuarios", None)
 
-        for u in self.db_controller.obtener_todos_usuarios():
-            self.comboFiltroUsuario.addItem(f"{u.username}", u.id)
+        self.tareas.ejecutar(
+            self.db_controller.obtener_todos_usuarios,
+            clave="usuarios_filtro",
+            al_terminar=lambda usuarios: self._cargar_usuarios_filtro(usuarios, usuario_actual),
+        )
+        self._cargar_filtro_columnas()
 
-        if usuario_actual:
-            idx = self.comboFiltroUsuario.findData(usuario_actual)
-            if idx >= 0:
-                self.comboFiltroUsuario.setCurrentIndex(idx)
-        self.comboFiltroUsuario.blockSignals(False)
+    def _cargar_filtro_columnas(self):
+        if not hasattr(self, "comboFiltroColumna"):
+            return
+        columna_actual = self.comboFiltroColumna.currentData()
 
         self.comboFiltroColumna.blockSignals(True)
         self.comboFiltroColumna.clear()
@@ -748,15 +1427,27 @@ class MainWindow(QtWidgets.QWidget):
                 self.comboFiltroColumna.setCurrentIndex(idx)
         self.comboFiltroColumna.blockSignals(False)
 
+    def _cargar_usuarios_filtro(self, usuarios, usuario_actual):
+        self.comboFiltroUsuario.blockSignals(True)
+        self.comboFiltroUsuario.clear()
+        self.comboFiltroUsuario.addItem("Todos los usuarios", None)
+
+        for u in usuarios:
+            self.comboFiltroUsuario.addItem(f"{u.username}", u.id)
+
+        if usuario_actual:
+            idx = self.comboFiltroUsuario.findData(usuario_actual)
+            if idx >= 0:
+                self.comboFiltroUsuario.setCurrentIndex(idx)
+        self.comboFiltroUsuario.blockSignals(False)
+
     def _aplicar_filtro_usuario(self, _index: int):
         self.filtro_usuario = self.comboFiltroUsuario.currentData()
-        if hasattr(self, "listas_controller"):
-            self.renderizar_columnas()
+        self._timer_filtros.start()
 
     def _aplicar_filtro_columna(self, _index: int):
         self.filtro_columna = self.comboFiltroColumna.currentData()
-        if hasattr(self, "listas_controller"):
-            self.renderizar_columnas()
+        self._timer_filtros.start()
 
     def _limpiar_filtros(self):
         if hasattr(self, "comboFiltroUsuario"):
@@ -769,54 +1460,327 @@ class MainWindow(QtWidgets.QWidget):
         self.filtro_usuario = None
         self.filtro_columna = None
         self.filtro_texto = None
-
-        if hasattr(self, "listas_controller"):
-            self.renderizar_columnas()
+        self._aplicar_filtros()
+
+    def _cache_local(self):
+        # Una caché por usuario para no mezclar tableros entre cuentas en el mismo equipo.
+        # Con un almacén local sería otra copia de lo mismo: no se usa.
+        if self.db_controller.es_local:
+            return None
+        usuario = getattr(self.db_controller, "current_user", None)
+        clave = getattr(usuario, "id", None) or "invitado"
+        if getattr(self, "_cache_clave", None) != clave:
+            self._cache_clave = clave
+            try:
+                self._cache = CacheLocal(os.path.join(directorio_datos(), f"cache_{clave}.sqlite3"))
+            except Exception as e:
+                print(f"Error abriendo caché local: {e}")
+                self._cache = None
+        return self._cache
+
+    def _diario_offline(self):
+        # Como la caché: uno por usuario, y sin sentido con un almacén local (no hay red que perder)
+        if self.db_controller.es_local:
+            return None
+        usuario = getattr(self.db_controller, "current_user", None)
+        clave = getattr(usuario, "id", None) or "invitado"
+        if getattr(self, "_diario_clave", None) != clave:
+            self._diario_clave = clave
+            try:
+                self._diario = DiarioOffline(os.path.join(directorio_datos(), f"diario_{clave}.jsonl"))
+            except Exception as e:
+                print(f"Error abriendo diario offline: {e}")
+                self._diario = None
+        return self._diario
 
     def cargar_tableros(self):
-        self.listaTableros.clear()
-        try:
-            self.tableros = self.db_controller.obtener_tableros()
-            if not self.tableros:
-                self.listaTableros.addItem("No hay tableros. Crea uno nuevo.")
-            else:
-                for tablero in self.tableros:
-                    self.listaTableros.addItem(f"{tablero.titulo} ({tablero.get_card_count()} tarjetas)")
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Error", f"Error al cargar tableros: {e}")
+        # Se pinta al instante lo que haya en la caché local y se revalida en segundo plano
+        Arranque.empezar("primeros datos")
+        cache = self._cache_local()
+        cacheados = cache.cargar_tableros() if cache else None
+        if cacheados is not None:
+            self._mostrar_tableros(cacheados)
+        else:
             self.tableros = []
+            self.listaTableros.clear()
+            self.listaTableros.addItem("Cargando tableros...")
+
+        # Tras el login ya se sabe de quién es el diario: lo que quedara de otra sesión se reproduce
+        self.cola_escritura.db = self.db_controller
+        self.cola_escritura.usar_diario(self._diario_offline())
+        db = self.db_controller
+
+        def revalidar():
+            # Sin cliente o con error no hay datos fiables: se conserva lo que hay
+            if not db.disponible():
+                return None
+            db.limpiar_error()
+            tableros = db.obtener_tableros()
+            return None if db.ultimo_error is not None else tableros
+
+        self.tareas.ejecutar(
+            revalidar,
+            clave="tableros",
+            al_terminar=lambda tableros: self._al_revalidar_tableros(tableros, cache),
+            al_fallar=self._error_cargar_tableros,
+        )
+
+    def _al_revalidar_tableros(self, tableros, cache):
+        # La caché se escribe aquí y no en la tarea para que un resultado descartado no la pise
+        if tableros is not None:
+            if cache:
+                cache.guardar_tableros(tableros)
+            self._mostrar_tableros(tableros)
+        elif not self.tableros:
+            self._mostrar_tableros([])
+
+    def _mostrar_tableros(self, tableros):
+        row = self.listaTableros.currentRow()
+        seleccionado = self.tableros[row].id if 0 <= row < len(self.tableros) else None
+
+        self.listaTableros.clear()
+        self.tableros = tableros
+        if not self.tableros:
+            self.listaTableros.addItem("No hay tableros. Crea uno nuevo.")
+        else:
+            for idx, tablero in enumerate(self.tableros):
+                self.listaTableros.addItem(f"{tablero.titulo} ({tablero.get_card_count()} tarjetas)")
+                if tablero.id == seleccionado:
+                    self.listaTableros.setCurrentRow(idx)
+        Arranque.terminar("primeros datos")
+        Arranque.publicar()
+
+    def _error_cargar_tableros(self, error):
+        self.listaTableros.clear()
+        self.tableros = []
+        QtWidgets.QMessageBox.warning(self, "Error", f"Error al cargar tableros: {error}")
 
     def crear_tablero(self):
         titulo, ok = QtWidgets.QInputDialog.getText(self, "Nuevo tablero", "Nombre del tablero:")
         if ok and titulo:
-            tablero = self.db_controller.crear_tablero(titulo)
-            if tablero:
-                self.cargar_tableros()
-                QtWidgets.QMessageBox.information(self, "Exito", f"Tablero '{titulo}' creado correctamente")
-            else:
-                QtWidgets.QMessageBox.warning(self, "Error", "No se pudo crear el tablero. Verifica la conexion a la BD.")
+            self.tareas.ejecutar(
+                self.db_controller.crear_tablero,
+                titulo,
+                al_terminar=lambda tablero: self._al_crear_tablero(tablero, titulo),
+            )
+
+    def _al_crear_tablero(self, tablero, titulo):
+        if tablero:
+            self.cargar_tableros()
+            QtWidgets.QMessageBox.information(self, "Exito", f"Tablero '{titulo}' creado correctamente")
+        else:
+            QtWidgets.QMessageBox.warning(self, "Error", "No se pudo crear el tablero. Verifica la conexion a la BD.")
 
     def abrir_tablero_seleccionado(self):
         row = self.listaTableros.currentRow()
         if 0 <= row < len(self.tableros):
             self.mostrar_tablero(self.tableros[row])
 
-    def recargar_tablero(self):
+    def refrescar_tablero(self):
+        # Recarga pedida por el usuario: también se vuelve a leer el directorio de usuarios
+        if self.pestanasPrincipal.currentIndex() == 1:
+            self.db_controller.invalidar_usuarios()
+            self.recargar_tablero(actualizar_filtros=True)
+
+    def recargar_tablero(self, actualizar_filtros: bool = False):
         if not hasattr(self, "current_tablero") or not self.current_tablero:
             return
-        self.current_tablero.lists = self.db_controller.obtener_listas(self.current_tablero.id)
+        tablero = self.current_tablero
+        db = self.db_controller
+        cache = self._cache_local()
+        # Con escrituras pendientes la lectura se encola detrás para no pisar cambios locales
+        self.cola_escritura.vaciar()
+        gestor = self.escrituras if self.escrituras.pendientes() else self.tareas
+        version = self._version_local
+
+        def revalidar():
+            if not db.disponible():
+                return None
+            db.limpiar_error()
+            # El cursor se toma antes de leer: lo que cambie entre medias llegará en la siguiente sincronización
+            cursor = db.cursor_cambios(tablero.id)
+            listas = db.obtener_listas(tablero.id)
+            return None if db.ultimo_error is not None else (listas, cursor)
+
+        # Una recarga más reciente sustituye a la anterior, así que nunca se pinta un tablero viejo
+        gestor.ejecutar(
+            revalidar,
+            clave="tablero",
+            al_terminar=lambda r: self._al_recargar_tablero(tablero, version, r, actualizar_filtros, cache),
+        )
+
+    def _al_recargar_tablero(self, tablero, version, resultado, actualizar_filtros, cache):
+        # None: la revalidación falló y se mantiene lo que ya hay en pantalla
+        if tablero is not self.current_tablero or resultado is None:
+            return
+        if version != self._version_local:
+            # Hubo cambios locales durante la lectura: la foto es anterior a ellos y los borraría.
+            # Se repite; ahora va detrás de sus escrituras en la cola
+            self.recargar_tablero(actualizar_filtros)
+            return
+        listas, self._cursor_cambios = resultado
+        if cache:
+            cache.guardar_listas(tablero.id, listas)
+        tablero.set_lists(listas)
+        self._reindexar_busqueda()
+        if actualizar_filtros:
+            self._cargar_opciones_filtros()
+        self.renderizar_columnas()
+
+    def _reindexar_busqueda(self):
+        # El índice se construye en segundo plano sobre una foto de las tarjetas; lo que
+        # cambie mientras tanto se vuelve a aplicar al adoptarlo
+        tablero = self.current_tablero
+        tarjetas = [c for l in tablero.lists for c in l.cards]
+        self.indice_busqueda.empezar_reconstruccion()
+
+        def construir():
+            nuevo = IndiceBusqueda()
+            nuevo.reindexar(tarjetas)
+            return nuevo
+
+        self.tareas.ejecutar(
+            construir,
+            clave="indice_busqueda",
+            al_terminar=lambda nuevo: self._al_reindexar_busqueda(tablero, nuevo),
+        )
+
+    def _al_reindexar_busqueda(self, tablero, nuevo):
+        if tablero is not self.current_tablero:
+            return
+        self.indice_busqueda.adoptar(nuevo, tablero)
+        if self.filtro_texto:
+            self._aplicar_filtros()
+
+    def cargar_mas_tarjetas(self, list_id):
+        # Siguiente página de una columna larga, a partir de la última posición cargada
+        lista = self.current_tablero.get_list(list_id) if self.current_tablero else None
+        if lista is None or not lista.hay_mas():
+            return
+        tablero, desde = self.current_tablero, lista.cursor_siguiente()
+        self.sincronizacion.ejecutar(
+            self.db_controller.obtener_pagina_tarjetas,
+            list_id,
+            desde,
+            clave=f"pagina_{list_id}",
+            al_terminar=lambda pagina: self._al_cargar_pagina(tablero, list_id, desde, pagina),
+        )
+
+    def _al_cargar_pagina(self, tablero, list_id, desde, pagina):
+        if tablero is not self.current_tablero:
+            return
+        if pagina is None:
+            # Si falla no se reintenta hasta el próximo pintado de la columna
+            return
+        if not self.listas_controller.agregar_pagina(list_id, desde, *pagina):
+            columna = self._columnas_ui.get(list_id)
+            if columna:
+                columna["list_widget"].modelo.cargando = False
+            return
+        self.renderizar_columnas()
+
+    def sincronizar_tablero(self):
+        # Pide solo lo cambiado desde el cursor; con escrituras propias en curso se espera a la próxima
+        if (
+            self._cursor_cambios is None
+            or self.pestanasPrincipal.currentIndex() != 1
+            or self.cola_escritura.pendientes()
+        ):
+            return
+        tablero, db, desde, version = self.current_tablero, self.db_controller, self._cursor_cambios, self._version_local
+        self.sincronizacion.ejecutar(
+            db.obtener_cambios,
+            tablero.id,
+            desde,
+            clave="sincronizar",
+            al_terminar=lambda cambios: self._al_sincronizar(tablero, desde, version, cambios),
+        )
+
+    def _al_sincronizar(self, tablero, desde, version, cambios):
+        # Se descarta si entretanto hubo una recarga o un cambio local: esas filas pueden ser viejas
+        if (
+            cambios is None
+            or tablero is not self.current_tablero
+            or desde != self._cursor_cambios
+            or version != self._version_local
+            or self.cola_escritura.pendientes()
+        ):
+            return
+        self._cursor_cambios = cambios.cursor
+        if not cambios.vacio() and self.listas_controller.aplicar_cambios(cambios):
+            self._tras_cambio_local(actualizar_filtros=True, tablero=tablero)
+
+    def _mostrar_estado_guardado(self, pendientes):
+        en_diario = self.cola_escritura.en_diario()
+        if en_diario:
+            self.lblGuardando.setText(f"Sin conexión: {en_diario} cambios guardados en este equipo")
+        else:
+            self.lblGuardando.setText("Guardando..." if pendientes else "")
+
+    def _mostrar_conflictos_diario(self, conflictos):
+        # Donde ganó el servidor la vista tiene la versión local: se recarga para mostrar la buena
+        QtWidgets.QMessageBox.warning(
+            self,
+            "Cambios sin conexión",
+            "Algunos cambios hechos sin conexión no se han aplicado:\n" + "\n".join(conflictos),
+        )
+        self.recargar_tablero(actualizar_filtros=True)
+
+    def _tras_cambio_local(self, actualizar_filtros: bool = False, tablero=None):
+        # Tras un cambio optimista (o su deshacer) se repinta sin pedir el tablero al servidor
+        self._version_local += 1
+        tablero = tablero or self.current_tablero
+        if tablero is self.current_tablero:
+            if actualizar_filtros:
+                self._cargar_filtro_columnas()
+            self.renderizar_columnas()
+        self._tableros_sin_guardar[tablero.id] = tablero
+        self._timer_cache.start()
+
+    def _guardar_cache_pendiente(self):
+        pendientes, self._tableros_sin_guardar = self._tableros_sin_guardar, {}
+        cache = self._cache_local()
+        if cache:
+            for tablero in pendientes.values():
+                cache.guardar_listas(tablero.id, tablero.lists)
+
+    def _error_escritura(self, mensaje):
+        # Un lote fallido deshace varias operaciones a la vez: se avisa con un único mensaje
+        if not getattr(self, "_errores_escritura", None):
+            self._errores_escritura = []
+            QtCore.QTimer.singleShot(0, self._mostrar_errores_escritura)
+        if mensaje not in self._errores_escritura:
+            self._errores_escritura.append(mensaje)
+
+    def _mostrar_errores_escritura(self):
+        mensajes, self._errores_escritura = self._errores_escritura, []
+        QtWidgets.QMessageBox.warning(self, "Error", "\n".join(mensajes) + "\nSe han deshecho los cambios.")
 
     def mostrar_tablero(self, tablero):
         self.current_tablero = tablero
-        self.listas_controller = ListasController(self.current_tablero, self.db_controller)
+        self._cursor_cambios = None
+        self._timer_sincronizacion.start()
+        # Se pinta la copia local si existe; las listas de obtener_tableros solo sirven para contar tarjetas
+        cache = self._cache_local()
+        self.current_tablero.set_lists((cache.cargar_listas(tablero.id) if cache else None) or [])
+        self._reindexar_busqueda()
+        # El login puede sustituir db_controller después de crear la ventana
+        self.cola_escritura.db = self.db_controller
+        self.cola_escritura.usar_diario(self._diario_offline())
+        self.listas_controller = ListasController(
+            self.current_tablero,
+            self.db_controller,
+            cola=self.cola_escritura,
+            al_cambio=lambda: self._tras_cambio_local(actualizar_filtros=True, tablero=tablero),
+            al_error=self._error_escritura,
+            indice=self.indice_busqueda,
+        )
 
-        self.recargar_tablero()
+        self.recargar_tablero(actualizar_filtros=True)
 
         self.lblNombreTablero.setText(f"Tablero: {tablero.titulo}")
         self.pestanasPrincipal.setCurrentIndex(1)
 
-        self._cargar_opciones_filtros()
-
         if not hasattr(self, "btnPapelera"):
             parent_layout = self.btnVolverATableros.parentWidget().layout()
 
@@ -838,29 +1802,65 @@ class MainWindow(QtWidgets.QWidget):
             )
             self.btnPapeleraColumnas.clicked.connect(self.abrir_papelera_columnas)
 
+            self.btnRecargarTablero = QtWidgets.QPushButton("Recargar")
+            self.btnRecargarTablero.setCursor(QtCore.Qt.PointingHandCursor)
+            self.btnRecargarTablero.setToolTip("Volver a pedir el tablero al servidor (F5)")
+            self.btnRecargarTablero.clicked.connect(self.refrescar_tablero)
+
             parent_layout.insertWidget(parent_layout.count() - 1, self.btnPapelera)
             parent_layout.insertWidget(parent_layout.count() - 1, self.btnPapeleraColumnas)
+            parent_layout.insertWidget(parent_layout.count() - 1, self.btnRecargarTablero)
 
         self.renderizar_columnas()
 
     def volver_a_tableros(self):
+        self.cola_escritura.vaciar()
+        self._timer_sincronizacion.stop()
         self.pestanasPrincipal.setCurrentIndex(0)
         self.cargar_tableros()
 
     def renderizar_columnas(self):
-        while self.layoutColumnas.count():
-            item = self.layoutColumnas.takeAt(0)
-            if item.widget():
-                item.widget().setParent(None)
-
-        for lista in getattr(self.current_tablero, "lists", []):
-            if self.filtro_columna and lista.id != self.filtro_columna:
-                continue
-            self.agregar_columna_ui(lista)
-
-        self.layoutColumnas.addItem(
-            QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
-        )
+        # Reconciliación por id: solo se crean, actualizan, mueven o quitan los widgets
+        # cuya lista o tarjeta ha cambiado desde el último pintado
+        if not hasattr(self, "_columnas_ui"):
+            while self.layoutColumnas.count():
+                item = self.layoutColumnas.takeAt(0)
+                if item.widget():
+                    item.widget().setParent(None)
+            self._columnas_ui = {}
+            self._espaciador_columnas = QtWidgets.QSpacerItem(
+                20, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum
+            )
+            self.layoutColumnas.addItem(self._espaciador_columnas)
+
+        listas = getattr(self.current_tablero, "lists", [])
+        ids = {l.id for l in listas}
+        self._actualizar_busqueda()
+        self._ids_ocultos = self._calcular_ocultas()
+
+        for list_id in [lid for lid in self._columnas_ui if lid not in ids]:
+            columna = self._columnas_ui.pop(list_id)
+            self.layoutColumnas.removeWidget(columna["frame"])
+            columna["frame"].setParent(None)
+            columna["frame"].deleteLater()
+
+        for idx, lista in enumerate(listas):
+            columna = self._columnas_ui.get(lista.id)
+            if columna is None:
+                columna = self.agregar_columna_ui(lista)
+                self._columnas_ui[lista.id] = columna
+            elif columna["lbl"].text() != lista.titulo:
+                columna["lbl"].setText(lista.titulo)
+            total = str(lista.total_tarjetas())
+            if columna["lblTotal"].text() != total:
+                columna["lblTotal"].setText(total)
+
+            if self.layoutColumnas.indexOf(columna["frame"]) != idx:
+                self.layoutColumnas.removeWidget(columna["frame"])
+                self.layoutColumnas.insertWidget(idx, columna["frame"])
+
+            self._aplicar_filtro_columna_ui(lista.id, columna)
+            self._reconciliar_tarjetas(columna, lista)
 
     def agregar_columna_ui(self, lista):
         frame = QtWidgets.QFrame()
@@ -878,13 +1878,19 @@ class MainWindow(QtWidgets.QWidget):
         lbl.setObjectName("lblColumnaHeader")
         header.addWidget(lbl)
 
+        # Total real de la lista, aunque solo esté cargada la primera página
+        lbl_total = QtWidgets.QLabel(str(lista.total_tarjetas()))
+        lbl_total.setObjectName("lblColumnaTotal")
+        header.addWidget(lbl_total)
+        header.addStretch()
+
         btn_edit = QtWidgets.QPushButton()
         btn_edit.setFixedSize(40, 40)
         btn_edit.setCursor(QtCore.Qt.PointingHandCursor)
         btn_edit.setObjectName("btnColumnaHeader")
         btn_edit.setIcon(icono_svg("edit.svg"))
         btn_edit.setIconSize(QtCore.QSize(18, 18))
-        btn_edit.clicked.connect(lambda _, l=lista: self.renombrar_lista_ui(l))
+        btn_edit.clicked.connect(lambda _, l_id=lista.id: self._con_lista(l_id, self.renombrar_lista_ui))
         header.addWidget(btn_edit)
 
         btn_del = QtWidgets.QPushButton()
@@ -893,7 +1899,7 @@ class MainWindow(QtWidgets.QWidget):
         btn_del.setObjectName("btnColumnaHeader")
         btn_del.setIcon(icono_svg("trash.svg"))
         btn_del.setIconSize(QtCore.QSize(18, 18))
-        btn_del.clicked.connect(lambda _, l=lista: self.eliminar_lista_ui(l))
+        btn_del.clicked.connect(lambda _, l_id=lista.id: self._con_lista(l_id, self.eliminar_lista_ui))
         header.addWidget(btn_del)
 
         layout.addLayout(header)
@@ -902,144 +1908,217 @@ class MainWindow(QtWidgets.QWidget):
         list_widget.setSpacing(10)
         list_widget.setObjectName("listaTarjetas")
         list_widget.cardMoved.connect(self.procesar_movimiento_tarjeta)
-        list_widget.itemDoubleClicked.connect(self.abrir_detalles_tarjeta)
+        list_widget.doubleClicked.connect(self.abrir_detalles_tarjeta)
+        list_widget.editarTarjeta.connect(lambda l_id, c_id: self._con_tarjeta(l_id, c_id, self.renombrar_tarjeta_ui))
+        list_widget.eliminarTarjeta.connect(self.eliminar_tarjeta_ui)
+        list_widget.pressed.connect(lambda _, lw=list_widget: self._al_pulsar_tarjeta(lw))
+        list_widget.customContextMenuRequested.connect(
+            lambda pos, lw=list_widget: self._menu_tarjetas(lw, pos)
+        )
+        list_widget.modelo.pedirMas.connect(self.cargar_mas_tarjetas)
 
         list_widget.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         list_widget.setMinimumHeight(200)
-        list_widget.setUniformItemSizes(False)
-
-        for card in lista.cards:
-            assignees = getattr(card, "assignees", [])
-
-            if self.filtro_usuario:
-                asignado_ids = [u.id for u in assignees]
-                if self.filtro_usuario not in asignado_ids:
-                    continue
-
-            if self.filtro_texto:
-                titulo_lower = str(card.titulo).lower()
-                if self.filtro_texto not in titulo_lower:
-                    continue
-
-            item = QtWidgets.QListWidgetItem()
-            item.setData(QtCore.Qt.UserRole, card.id)
-            item.setText("")
-
-            card_widget = QtWidgets.QFrame()
-            card_widget.setObjectName("cardBody")
-            card_widget.setMinimumHeight(80)
-
-            card_layout = QtWidgets.QHBoxLayout(card_widget)
-            card_layout.setContentsMargins(15, 10, 15, 10)
-
-            lbl_card = QtWidgets.QLabel(str(card.titulo))
-            lbl_card.setWordWrap(True)
-            lbl_card.setObjectName("lblCardTitle")
-            card_layout.addWidget(lbl_card, 1)
-
-            if assignees:
-                assign_layout = QtWidgets.QHBoxLayout()
-                assign_layout.setSpacing(-8)
-                for u in assignees[:3]:
-                    inicial = u.username[0].upper() if u.username else "?"
-                    lbl_user = QtWidgets.QLabel(inicial)
-                    lbl_user.setFixedSize(26, 26)
-                    lbl_user.setAlignment(QtCore.Qt.AlignCenter)
-                    lbl_user.setStyleSheet(
-                        "background-color: #172b4d; color: white; border-radius: 13px; font-weight: bold; font-size: 11px; border: 1px solid white;"
-                    )
-                    assign_layout.addWidget(lbl_user)
-                card_layout.addLayout(assign_layout)
-
-            btn_edit_c = QtWidgets.QPushButton()
-            btn_edit_c.setFixedSize(40, 40)
-            btn_edit_c.setCursor(QtCore.Qt.PointingHandCursor)
-            btn_edit_c.setObjectName("btnCardAction")
-            btn_edit_c.setIcon(icono_svg("edit.svg"))
-            btn_edit_c.setIconSize(QtCore.QSize(16, 16))
-            btn_edit_c.clicked.connect(lambda _, l_id=lista.id, c=card: self.renombrar_tarjeta_ui(l_id, c))
-            card_layout.addWidget(btn_edit_c)
-
-            btn_del_c = QtWidgets.QPushButton()
-            btn_del_c.setFixedSize(40, 40)
-            btn_del_c.setCursor(QtCore.Qt.PointingHandCursor)
-            btn_del_c.setObjectName("btnCardAction")
-            btn_del_c.setIcon(icono_svg("trash.svg"))
-            btn_del_c.setIconSize(QtCore.QSize(16, 16))
-            btn_del_c.clicked.connect(lambda _, l_id=lista.id, c_id=card.id: self.eliminar_tarjeta_ui(l_id, c_id))
-            card_layout.addWidget(btn_del_c)
-
-            item.setSizeHint(card_widget.sizeHint())
-            list_widget.addItem(item)
-            list_widget.setItemWidget(item, card_widget)
 
         layout.addWidget(list_widget)
-        self.layoutColumnas.addWidget(frame)
+        return {"frame": frame, "lbl": lbl, "lblTotal": lbl_total, "list_widget": list_widget}
+
+    def _tarjeta_visible(self, card):
+        if self.filtro_usuario:
+            asignado_ids = [u.id for u in getattr(card, "assignees", [])]
+            if self.filtro_usuario not in asignado_ids:
+                return False
+
+        if self._ids_busqueda is not None and card.id not in self._ids_busqueda:
+            return False
+        return True
+
+    def _actualizar_busqueda(self):
+        self._ids_busqueda = self.indice_busqueda.coincidencias(self.filtro_texto) if self.filtro_texto else None
+
+    def _calcular_ocultas(self):
+        if self._ids_busqueda is None and not self.filtro_usuario:
+            return set()
+        return {
+            c.id for l in getattr(self.current_tablero, "lists", []) for c in l.cards
+            if not self._tarjeta_visible(c)
+        }
 
-    def abrir_detalles_tarjeta(self, item):
-        card_id = item.data(QtCore.Qt.UserRole)
+    def _reconciliar_tarjetas(self, columna, lista):
+        list_widget = columna["list_widget"]
+        list_widget.modelo.actualizar(lista.cards, lista.hay_mas())
+
+        for fila, card in enumerate(list_widget.modelo.tarjetas):
+            oculta = card.id in self._ids_ocultos
+            if list_widget.isRowHidden(fila) != oculta:
+                list_widget.setRowHidden(fila, oculta)
+
+    def _aplicar_filtro_columna_ui(self, list_id, columna):
+        visible = not self.filtro_columna or list_id == self.filtro_columna
+        if columna["frame"].isVisibleTo(self) != visible:
+            columna["frame"].setVisible(visible)
+
+    def _aplicar_filtros(self):
+        # Los filtros no repintan columnas: se calcula qué tarjetas deben estar ocultas y
+        # solo se tocan las filas que cambian respecto a lo que ya hay en pantalla
+        self._timer_filtros.stop()
+        if not hasattr(self, "listas_controller") or not hasattr(self, "_columnas_ui"):
+            return
+        for list_id, columna in self._columnas_ui.items():
+            self._aplicar_filtro_columna_ui(list_id, columna)
+
+        self._actualizar_busqueda()
+        ocultas = self._calcular_ocultas()
+        cambiadas, self._ids_ocultos = ocultas ^ self._ids_ocultos, ocultas
+        por_lista = {}
+        for card_id in cambiadas:
+            lista = self.current_tablero.get_list_of_card(card_id)
+            if lista is not None:
+                por_lista.setdefault(lista.id, set()).add(card_id)
+        for list_id, ids in por_lista.items():
+            columna = self._columnas_ui.get(list_id)
+            if columna is not None:
+                self._aplicar_visibilidad_filas(columna["list_widget"], ids)
+
+        if self.filtro_texto and self.filtro_texto != self._texto_aplicado:
+            self._mostrar_mejor_resultado()
+        self._texto_aplicado = self.filtro_texto
+
+    def _aplicar_visibilidad_filas(self, list_widget, ids):
+        for fila, card in enumerate(list_widget.modelo.tarjetas):
+            if card.id in ids:
+                list_widget.setRowHidden(fila, card.id in self._ids_ocultos)
+
+    def _buscar_lista(self, list_id):
+        tablero = getattr(self, "current_tablero", None)
+        return tablero.get_list(list_id) if tablero else None
+
+    def _con_lista(self, list_id, accion):
+        # Los botones guardan ids: tras una recarga los objetos del tablero son otros
+        lista = self._buscar_lista(list_id)
+        if lista:
+            accion(lista)
+
+    def _con_tarjeta(self, list_id, card_id, accion):
+        lista = self._buscar_lista(list_id)
+        card = lista.get_card(card_id) if lista else None
+        if card:
+            accion(list_id, card)
+
+    def abrir_detalles_tarjeta(self, index):
+        card_id = index.data(QtCore.Qt.UserRole)
         list_id = self.sender().list_id
 
-        lista_obj = next((l for l in self.current_tablero.lists if l.id == list_id), None)
+        lista_obj = self._buscar_lista(list_id)
         if not lista_obj:
             return
 
-        tarjeta_obj = next((c for c in lista_obj.cards if c.id == card_id), None)
+        tarjeta_obj = lista_obj.get_card(card_id)
         if not tarjeta_obj:
             return
 
         dialog = TarjetaDetalleDialog(tarjeta_obj, self.listas_controller, list_id, self)
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
             title, desc = dialog.get_data()
-            if title != tarjeta_obj.titulo or desc != tarjeta_obj.descripcion:
+            if desc is None:
+                if title != tarjeta_obj.titulo and self.listas_controller.renombrar_tarjeta(list_id, card_id, title):
+                    self._tras_cambio_local()
+            elif title != tarjeta_obj.titulo or desc != tarjeta_obj.descripcion:
                 if self.listas_controller.actualizar_contenido_tarjeta(list_id, card_id, title, desc):
-                    self.recargar_tablero()
-                    self._cargar_opciones_filtros()
-                    self.renderizar_columnas()
+                    self._tras_cambio_local()
 
-    def procesar_movimiento_tarjeta(self, sid, did, cid):
-        if self.listas_controller.mover_tarjeta(sid, did, cid):
-            self.recargar_tablero()
-            self.renderizar_columnas()
+    def procesar_movimiento_tarjeta(self, sid, did, cid, indice=-1):
+        if sid == did:
+            hecho = self.listas_controller.reordenar_tarjeta(sid, cid, indice)
         else:
-            QtWidgets.QMessageBox.warning(self, "Error", "Fallo al mover")
+            hecho = self.listas_controller.mover_tarjeta(sid, did, cid, indice if indice >= 0 else None)
+        if hecho:
+            self._tras_cambio_local()
 
     def renombrar_lista_ui(self, lista):
         new_name, ok = QtWidgets.QInputDialog.getText(self, "Renombrar", "Nombre:", text=lista.titulo)
-        if ok and new_name and self.listas_controller.renombrar_lista(lista.id, new_name):
-            self.recargar_tablero()
-            self._cargar_opciones_filtros()
-            self.renderizar_columnas()
+        if ok and new_name:
+            if self.listas_controller.renombrar_lista(lista.id, new_name):
+                self._tras_cambio_local(actualizar_filtros=True)
 
     def eliminar_lista_ui(self, lista):
         if confirmar_accion(self, "Eliminar", f"Eliminar lista '{lista.titulo}'?", "Si, eliminar"):
             if self.listas_controller.eliminar_lista(lista.id):
-                self.recargar_tablero()
-                self._cargar_opciones_filtros()
-                self.renderizar_columnas()
+                self._tras_cambio_local(actualizar_filtros=True)
 
     def renombrar_tarjeta_ui(self, lid, card):
         new, ok = QtWidgets.QInputDialog.getText(self, "Renombrar", "Titulo:", text=card.titulo)
-        if ok and new and self.listas_controller.renombrar_tarjeta(lid, card.id, new):
-            self.recargar_tablero()
-            self.renderizar_columnas()
+        if ok and new:
+            if self.listas_controller.renombrar_tarjeta(lid, card.id, new):
+                self._tras_cambio_local()
 
     def eliminar_tarjeta_ui(self, lid, cid):
         if confirmar_accion(self, "Eliminar", "Eliminar tarjeta?", "Si, eliminar"):
             if self.listas_controller.eliminar_tarjeta(lid, cid):
-                self.recargar_tablero()
-                self.renderizar_columnas()
+                self._tras_cambio_local()
+
+    def _al_pulsar_tarjeta(self, list_widget):
+        # Un clic sin Ctrl/Mayús empieza una selección nueva también en las demás columnas
+        modificadores = QtWidgets.QApplication.keyboardModifiers()
+        if modificadores & (QtCore.Qt.ControlModifier | QtCore.Qt.ShiftModifier):
+            return
+        for columna in self._columnas_ui.values():
+            if columna["list_widget"] is not list_widget:
+                columna["list_widget"].clearSelection()
+
+    def _tarjetas_seleccionadas(self):
+        seleccion = []
+        for columna in self._columnas_ui.values():
+            list_widget = columna["list_widget"]
+            if not columna["frame"].isVisibleTo(self):
+                continue
+            for indice in sorted(list_widget.selectionModel().selectedIndexes(), key=lambda i: i.row()):
+                if not list_widget.isRowHidden(indice.row()):
+                    seleccion.append((list_widget.list_id, indice.data(QtCore.Qt.UserRole)))
+        return seleccion
+
+    def _menu_tarjetas(self, list_widget, pos):
+        indice = list_widget.indexAt(pos)
+        if indice.isValid() and not list_widget.selectionModel().isSelected(indice):
+            self._al_pulsar_tarjeta(list_widget)
+            list_widget.setCurrentIndex(indice)
+        seleccion = self._tarjetas_seleccionadas()
+        if not seleccion:
+            return
+
+        menu = QtWidgets.QMenu(self)
+        accion_asignar = menu.addAction(f"Asignar usuario ({len(seleccion)} tarjetas)")
+        accion_quitar = menu.addAction(f"Quitar usuario ({len(seleccion)} tarjetas)")
+        elegida = menu.exec_(list_widget.viewport().mapToGlobal(pos))
+        if elegida in (accion_asignar, accion_quitar):
+            asignar = elegida is accion_asignar
+            self.tareas.ejecutar(
+                self.db_controller.obtener_todos_usuarios,
+                clave="usuarios_seleccion",
+                al_terminar=lambda usuarios: self._asignar_seleccion(seleccion, asignar, usuarios),
+            )
+
+    def _asignar_seleccion(self, seleccion, asignar, usuarios):
+        if not usuarios:
+            return
+        titulo = "Asignar usuario" if asignar else "Quitar usuario"
+        nombre, ok = QtWidgets.QInputDialog.getItem(
+            self, titulo, f"Usuario para {len(seleccion)} tarjetas:", [u.username for u in usuarios], 0, False
+        )
+        if not ok:
+            return
+        usuario = next(u for u in usuarios if u.username == nombre)
+        # Una sola escritura para todas las tarjetas seleccionadas
+        if self.listas_controller.gestionar_asignaciones(seleccion, usuario.id, asignar, usuario.username):
+            self._tras_cambio_local()
 
     def crear_nueva_lista(self):
         if not hasattr(self, "current_tablero"):
             return
         name, ok = QtWidgets.QInputDialog.getText(self, "Nueva lista", "Nombre:")
         if ok and name:
-            lista = self.listas_controller.crear_lista(name)
-            if lista:
-                self.recargar_tablero()
-                self._cargar_opciones_filtros()
-                self.renderizar_columnas()
+            if self.listas_controller.crear_lista(name):
+                self._tras_cambio_local(actualizar_filtros=True)
 
     def crear_nueva_tarjeta(self):
         if not hasattr(self, "listas_controller"):
@@ -1060,8 +2139,7 @@ class MainWindow(QtWidgets.QWidget):
         title, ok = QtWidgets.QInputDialog.getText(self, "Nueva tarjeta", "Titulo:")
         if ok and title:
             if self.listas_controller.agregar_tarjeta(tlist.id, title):
-                self.recargar_tablero()
-                self.renderizar_columnas()
+                self._tras_cambio_local()
 
     def abrir_papelera(self):
         if not hasattr(self, "listas_controller"):
@@ -1077,37 +2155,55 @@ class MainWindow(QtWidgets.QWidget):
         dialog = PapeleraListasDialog(self.listas_controller, self.current_tablero.id, self)
         dialog.exec_()
 
+    def abrir_diagnostico(self):
+        # No modal, para ver las cifras mientras se usa el tablero
+        if getattr(self, "_diagnostico", None) is None:
+            self._diagnostico = DiagnosticoDialog(self.instrumentacion, self)
+        self._diagnostico.show()
+        self._diagnostico.raise_()
+
     def abrir_papelera_tableros(self):
         dialog = PapeleraTablerosDialog(self.db_controller, self)
         dialog.exec_()
 
     def al_cambiar_tema(self, index):
         temas = ["oscuro", "claro", "brutalista"]
-        self.tema_actual = temas[index]
-        self.cargar_tema(self.tema_actual)
-        self._refrescar_estilos()
-
-    def _refrescar_estilos(self):
-        self.style().unpolish(self)
-        self.style().polish(self)
-        self.update()
+        self.cargar_tema(temas[index])
 
     def borrar_tablero_seleccionado(self):
         row = self.listaTableros.currentRow()
         if row < 0:
             QtWidgets.QMessageBox.warning(self, "Aviso", "Selecciona un tablero primero")
             return
+        if row >= len(self.tableros):
+            return
         if confirmar_accion(self, "Borrar tablero", "Borrar este tablero?", "Si, borrar"):
-            if self.db_controller.eliminar_tablero(self.tableros[row].id):
-                self.cargar_tableros()
+            self.tareas.ejecutar(
+                self.db_controller.eliminar_tablero,
+                self.tableros[row].id,
+                al_terminar=lambda exito: exito and self.cargar_tableros(),
+            )
 
     def guardar_tablero(self):
         pass
 
     def buscar_tarjetas(self, txt):
-        self.filtro_texto = txt.strip().lower() if txt.strip() else None
-        if hasattr(self, "listas_controller"):
-            self.renderizar_columnas()
+        # Mientras se teclea solo se reinicia el temporizador; se filtra al parar
+        self.filtro_texto = txt.strip() or None
+        self._timer_filtros.start()
+
+    def _mostrar_mejor_resultado(self):
+        # Se ordena solo dentro de lo que ya ha filtrado _actualizar_busqueda, sin volver a buscar
+        for card_id in self.indice_busqueda.buscar(self.filtro_texto, 1, self._ids_busqueda):
+            lista = self.current_tablero.get_list_of_card(card_id)
+            columna = self._columnas_ui.get(lista.id) if lista else None
+            if columna is None:
+                return
+            list_widget = columna["list_widget"]
+            fila = next((f for f, c in enumerate(list_widget.modelo.tarjetas) if c.id == card_id), None)
+            if fila is not None and not list_widget.isRowHidden(fila):
+                list_widget.scrollTo(list_widget.modelo.index(fila), QtWidgets.QAbstractItemView.EnsureVisible)
+                self.scrollColumnas.ensureWidgetVisible(columna["frame"])
 
     def cerrar_sesion(self):
         if confirmar_accion(self, "Salir", "Cerrar sesion?", "Si, cerrar"):
@@ -1117,10 +2213,20 @@ class MainWindow(QtWidgets.QWidget):
     def alternar_autoguardado(self, state):
         pass
 
+    def closeEvent(self, event):
+        # Lo que quede en la cola se envía antes de cerrar
+        self.cola_escritura.vaciar()
+        self.escrituras.esperar(5000)
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
+    Arranque.terminar("importaciones", desde_inicio=True)
+    # login importa "main" al entrar: que reciba este mismo módulo en vez de ejecutarlo otra vez
+    sys.modules.setdefault("main", sys.modules[__name__])
     app = QtWidgets.QApplication(sys.argv)
     from login import LoginWindow
     window = LoginWindow()
     window.show()
+    Arranque.terminar("login visible", desde_inicio=True)
     sys.exit(app.exec_())
\ No newline at end of file
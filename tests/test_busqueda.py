@@ -0,0 +1,70 @@
+import pytest
+
+from benchmarks.datos_sinteticos import sembrar
+from benchmarks.fake_supabase import BaseDatosFake
+from Controladores.Busqueda import PESO_DESCRIPCION, PESO_EXACTO, PESO_TITULO, IndiceBusqueda, terminos
+from Controladores.Modelos import Tarjeta
+
+
+@pytest.fixture(scope="module")
+def tarjetas():
+    bd = BaseDatosFake()
+    sembrar(bd, 1, 4, 200)
+    return {
+        f["id"]: Tarjeta(titulo=f["titulo"], lista_id=f["lista_id"], descripcion=f["descripcion"], id=f["id"])
+        for f in bd.tablas["tarjetas"]
+    }
+
+
+def _puntos(card: Tarjeta, prefijos) -> int:
+    # Referencia directa: la misma regla de relevancia, tarjeta a tarjeta
+    en_titulo, en_descripcion = set(terminos(card.titulo)), set(terminos(card.descripcion))
+    puntos = 0
+    for p in prefijos:
+        if any(t.startswith(p) for t in en_titulo):
+            puntos += PESO_TITULO - PESO_DESCRIPCION
+        if p in en_titulo or p in en_descripcion:
+            puntos += PESO_EXACTO
+    return puntos
+
+
+@pytest.mark.parametrize("consulta", ["re", "rev", "revisar", "mig api", "migración api", "factura cliente", "zzz"])
+def test_orden_por_relevancia(tarjetas, consulta):
+    indice = IndiceBusqueda()
+    indice.reindexar(tarjetas.values())
+    prefijos = terminos(consulta)
+    esperadas = {
+        i for i, c in tarjetas.items()
+        if all(any(t.startswith(p) for t in terminos(c.titulo) + terminos(c.descripcion)) for p in prefijos)
+    }
+    assert (indice.coincidencias(consulta) or set()) == esperadas
+
+    ordenadas = indice.buscar(consulta)
+    assert sorted(ordenadas) == sorted(esperadas)
+    puntos = [_puntos(tarjetas[i], prefijos) for i in ordenadas]
+    assert puntos == sorted(puntos, reverse=True)
+    for limite in (1, 5):
+        primeras = indice.buscar(consulta, limite, indice.coincidencias(consulta))
+        assert [_puntos(tarjetas[i], prefijos) for i in primeras] == puntos[:limite]
+
+
+def test_consulta_de_una_letra(tarjetas):
+    indice = IndiceBusqueda()
+    indice.reindexar(tarjetas.values())
+    for consulta in ("r", "a revisar"):
+        prefijos = terminos(consulta)
+        esperadas = {
+            i for i, c in tarjetas.items()
+            if all(any(t.startswith(p) for t in terminos(c.titulo) + terminos(c.descripcion)) for p in prefijos)
+        }
+        assert indice.coincidencias(consulta) == esperadas and sorted(indice.buscar(consulta)) == sorted(esperadas)
+    assert indice.coincidencias("r") != set(tarjetas)
+
+    # Las iniciales siguen a las altas, cambios y bajas
+    card = next(iter(tarjetas.values()))
+    indice.indexar_tarjeta(Tarjeta(titulo="xilófono", lista_id=card.lista_id, id="nueva"))
+    assert indice.coincidencias("x") == {"nueva"}
+    indice.indexar_tarjeta(Tarjeta(titulo="zzz", lista_id=card.lista_id, id="nueva"))
+    assert indice.coincidencias("x") == set() and "nueva" in indice.coincidencias("z")
+    indice.quitar_tarjeta("nueva")
+    assert "nueva" not in (indice.coincidencias("z") or set())
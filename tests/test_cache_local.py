@@ -0,0 +1,39 @@
+import sqlite3
+
+from Controladores.Cache_Local import CacheLocal
+from Controladores.Modelos import TrelloLista, Tarjeta
+
+
+def _lista_a_medias() -> TrelloLista:
+    lista = TrelloLista(titulo="L", tablero_id="t", posicion=1024.0, id="l")
+    lista.set_cards([Tarjeta(titulo=f"c{i}", lista_id="l", posicion=1024.0 * (i + 1), id=f"c{i}") for i in range(3)])
+    lista.fijar_siguiente((4096.0, "c3"))
+    lista.tarjetas_sin_cargar = 40
+    return lista
+
+
+def test_lista_paginada_vuelve_paginada(tmp_path):
+    cache = CacheLocal(str(tmp_path / "cache.sqlite3"))
+    cache.guardar_listas("t", [_lista_a_medias(), TrelloLista(titulo="Entera", tablero_id="t", posicion=2048.0, id="e")])
+
+    a_medias, entera = cache.cargar_listas("t")
+    assert [c.id for c in a_medias.cards] == ["c0", "c1", "c2"]
+    assert a_medias.hay_mas() and a_medias.cursor_siguiente() == (4096.0, "c3")
+    assert a_medias.total_tarjetas() == 43 and not a_medias.admite_posicion(5000.0)
+    assert not entera.hay_mas() and entera.tarjetas_sin_cargar == 0
+
+
+def test_cache_anterior_recibe_las_columnas(tmp_path):
+    ruta = str(tmp_path / "vieja.sqlite3")
+    conexion = sqlite3.connect(ruta)
+    conexion.execute(
+        "CREATE TABLE listas (id TEXT PRIMARY KEY, tablero_id TEXT NOT NULL, titulo TEXT NOT NULL, "
+        "posicion REAL NOT NULL DEFAULT 0, created_at TEXT)"
+    )
+    conexion.execute("INSERT INTO listas VALUES ('l', 't', 'L', 1.0, NULL)")
+    conexion.commit()
+    conexion.close()
+
+    cache = CacheLocal(ruta)
+    cache.guardar_listas("t", [_lista_a_medias()])
+    assert cache.cargar_listas("t")[0].cursor_siguiente() == (4096.0, "c3")
@@ -0,0 +1,85 @@
+from benchmarks.datos_sinteticos import sembrar
+from benchmarks.fake_supabase import BaseDatosFake, ClienteFake
+from Controladores import Directorio_Usuarios
+from Controladores.Controller_BD import SupabaseController
+from Controladores.Directorio_Usuarios import DirectorioUsuarios
+from Controladores.Modelos import User
+
+
+class _Tabla:
+    def __init__(self, *ids):
+        self.usuarios = [User(id=i, username=i) for i in ids]
+        self.lecturas = 0
+
+    def cargar(self):
+        self.lecturas += 1
+        return list(self.usuarios)
+
+
+def test_desconocido_relee_una_vez_y_con_limite(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr(Directorio_Usuarios.time, "monotonic", lambda: reloj[0])
+    tabla = _Tabla("u1")
+    directorio = DirectorioUsuarios(tabla.cargar)
+    assert directorio.obtener("u1").username == "u1" and tabla.lecturas == 1
+
+    # Registrado después de llenar la caché: se encuentra sin esperar al TTL
+    tabla.usuarios.append(User(id="u2", username="u2"))
+    assert directorio.obtener("u2").username == "u2" and tabla.lecturas == 2
+
+    # Uno que no existe no relee en cada llamada
+    assert directorio.obtener("nadie") is None and tabla.lecturas == 2
+    reloj[0] += Directorio_Usuarios.RECARGA_DESCONOCIDO_S
+    assert directorio.obtener("nadie") is None and tabla.lecturas == 3
+    assert directorio.obtener("nadie") is None and tabla.lecturas == 3
+    reloj[0] += Directorio_Usuarios.RECARGA_DESCONOCIDO_S
+    assert directorio.obtener("nadie") is None and tabla.lecturas == 4
+
+
+def test_asignado_desconocido_no_se_pierde():
+    bd = BaseDatosFake()
+    board_id = sembrar(bd, 1, 1, 3, eliminadas=0)[0]
+    db = SupabaseController(url=None, key=None)
+    db.client = ClienteFake(bd)
+    tarjeta = db.obtener_listas(board_id)[0].cards[0]
+    db.obtener_todos_usuarios()
+
+    bd.tablas["tarjeta_usuarios"].append({"tarjeta_id": tarjeta.id, "usuario_id": "fantasma"})
+    asignados = db.obtener_asignados_tarjeta(tarjeta.id)
+    assert [(u.id, u.username) for u in asignados if u.id == "fantasma"] == [("fantasma", "?")]
+
+
+
+class _SinUsuarios(ClienteFake):
+    def table(self, nombre):
+        if nombre == "usuarios":
+            raise ConnectionError("sin red")
+        return super().table(nombre)
+
+
+def test_fallo_del_directorio_no_invalida_el_tablero():
+    bd = BaseDatosFake()
+    board_id = sembrar(bd, 1, 1, 3, eliminadas=0)[0]
+    db = SupabaseController(url=None, key=None)
+    db.client = _SinUsuarios(bd)
+
+    db.limpiar_error()
+    listas = db.obtener_listas(board_id)
+    assert db.ultimo_error is None and len(listas[0].cards) == 3
+    asignados = [u for c in listas[0].cards for u in c.assignees]
+    assert asignados and all(u.username == "?" for u in asignados)
+
+
+def test_sin_cliente_no_se_guarda_un_directorio_vacio(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr(Directorio_Usuarios.time, "monotonic", lambda: reloj[0])
+    bd = BaseDatosFake()
+    sembrar(bd, 1, 1, 1, eliminadas=0)
+    db = SupabaseController(url=None, key=None)
+    db.client = None
+    assert db.obtener_todos_usuarios() == []
+
+    # Cuenta como fallo: se reintenta pasado REINTENTO_USUARIOS_S, no al caducar el TTL
+    db.client = ClienteFake(bd)
+    reloj[0] += Directorio_Usuarios.REINTENTO_USUARIOS_S
+    assert len(db.obtener_todos_usuarios()) == len(bd.tablas["usuarios"]) > 0
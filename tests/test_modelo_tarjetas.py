@@ -0,0 +1,63 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5.QtTest import QAbstractItemModelTester
+
+from Controladores.Modelos import Tarjeta
+
+
+@pytest.fixture(scope="module")
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    import main
+    yield main
+    del app
+
+
+def _tarjetas(n, prefijo="c"):
+    return [Tarjeta(titulo=f"{prefijo}{i}", lista_id="l", id=f"{prefijo}{i}") for i in range(n)]
+
+
+def _modelo(main, tarjetas):
+    modelo = main.ModeloTarjetas("l")
+    modelo.tester = QAbstractItemModelTester(modelo, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    modelo.actualizar(tarjetas)
+    movimientos = []
+    modelo.rowsMoved.connect(lambda *args: movimientos.append(args))
+    return modelo, movimientos
+
+
+@pytest.mark.parametrize("orden", [
+    lambda t: t[1:] + t[:1],
+    lambda t: t[-1:] + t[:-1],
+    lambda t: t[:10] + t[11:150] + [t[10]] + t[150:],
+])
+def test_mover_una_tarjeta_es_un_movimiento(main, orden):
+    tarjetas = _tarjetas(300)
+    modelo, movimientos = _modelo(main, tarjetas)
+    nuevas = orden(tarjetas)
+    modelo.actualizar(nuevas)
+    assert [c.id for c in modelo.tarjetas] == [c.id for c in nuevas]
+    assert 1 <= len(movimientos) <= 2
+
+
+def test_cambios_al_azar(main):
+    rnd = random.Random(7)
+    tarjetas = _tarjetas(40)
+    modelo, _ = _modelo(main, tarjetas)
+    for vuelta in range(200):
+        tarjetas = list(tarjetas)
+        if vuelta % 3 == 0:
+            rnd.shuffle(tarjetas)
+        else:
+            for _ in range(rnd.randrange(4)):
+                if tarjetas:
+                    tarjetas.pop(rnd.randrange(len(tarjetas)))
+            for nueva in _tarjetas(rnd.randrange(4), prefijo=f"n{vuelta}_"):
+                tarjetas.insert(rnd.randrange(len(tarjetas) + 1), nueva)
+        modelo.actualizar(tarjetas)
+        assert [c.id for c in modelo.tarjetas] == [c.id for c in tarjetas]
@@ -0,0 +1,73 @@
+import pytest
+
+from benchmarks.datos_sinteticos import sembrar
+from benchmarks.fake_supabase import BaseDatosFake, ClienteFake
+from Controladores.Almacen_Datos import TAM_PAGINA_TARJETAS
+from Controladores.Almacen_SQLite import SQLiteController
+from Controladores.Controller_BD import SupabaseController
+from Controladores.Listas import ListasController
+from Controladores.Modelos import Tablero
+
+
+def _abrir(tarjetas_por_lista: int):
+    bd = BaseDatosFake()
+    board_id = sembrar(bd, 1, 1, tarjetas_por_lista, eliminadas=0)[0]
+    db = SupabaseController(url=None, key=None)
+    db.client = ClienteFake(bd)
+    lc = ListasController(Tablero(titulo="x", id=board_id), db)
+    lc.obtener_listas()
+    return bd, db, lc
+
+
+def _recorrer(db: SupabaseController, list_id: str) -> list:
+    # Todas las tarjetas de la lista, página a página como las pide la interfaz
+    tarjetas, cursor = [], None
+    for _ in range(100):
+        pagina, cursor, _ = db.obtener_pagina_tarjetas(list_id, cursor)
+        tarjetas.extend(pagina)
+        if cursor is None:
+            return tarjetas
+    raise AssertionError("el cursor de páginas no avanza")
+
+
+def test_altas_en_lista_a_medias_no_alcanzan_la_pagina_siguiente():
+    bd, db, lc = _abrir(TAM_PAGINA_TARJETAS * 2)
+    lista = lc.tablero.lists[0]
+    assert lista.hay_mas()
+
+    nuevas = [lc.agregar_tarjeta(lista.id, f"nueva {i}").id for i in range(120)]
+    posiciones = [c.posicion for c in lista.cards]
+    assert posiciones == sorted(posiciones) and len(set(posiciones)) == len(posiciones)
+    assert all(lista.admite_posicion(p) for p in posiciones)
+
+    # En el servidor cada tarjeta sale una sola vez y las nuevas quedan antes de la página siguiente
+    ids = [c.id for c in _recorrer(db, lista.id)]
+    assert len(ids) == len(set(ids)) == TAM_PAGINA_TARJETAS * 2 + len(nuevas)
+    assert ids[TAM_PAGINA_TARJETAS:TAM_PAGINA_TARJETAS + len(nuevas)] == nuevas
+
+
+def _sqlite(bd: BaseDatosFake, tmp_path) -> SQLiteController:
+    db = SQLiteController(str(tmp_path / "almacen.sqlite3"))
+    for tabla in ("usuarios", "tableros", "listas", "tarjetas", "tarjeta_usuarios"):
+        assert db.guardar_filas(tabla, bd.tablas[tabla]), db.ultimo_error
+    return db
+
+
+@pytest.mark.parametrize("almacen", ["supabase", "sqlite"])
+def test_posiciones_repetidas_en_la_frontera(almacen, tmp_path):
+    # Más de una página con la misma posición (p. ej. posiciones enteras antiguas que chocan)
+    bd, db, _ = _abrir(TAM_PAGINA_TARJETAS * 3)
+    filas = [f for f in bd.tablas["tarjetas"]]
+    for i, f in enumerate(filas):
+        f["posicion"] = 1.0 if TAM_PAGINA_TARJETAS // 2 <= i < TAM_PAGINA_TARJETAS * 2 else float(i)
+    if almacen == "sqlite":
+        db = _sqlite(bd, tmp_path)
+
+    ids = [c.id for c in _recorrer(db, filas[0]["lista_id"])]
+    esperados = [f["id"] for f in sorted(filas, key=lambda f: (f["posicion"], f["id"]))]
+    assert ids == esperados
+
+    lista = db.obtener_listas(bd.tablas["listas"][0]["tablero_id"])[0]
+    assert lista.cursor_siguiente() == (1.0, esperados[TAM_PAGINA_TARJETAS])
+    assert lista.admite_posicion(1.0, esperados[TAM_PAGINA_TARJETAS - 1])
+    assert not lista.admite_posicion(1.0, esperados[TAM_PAGINA_TARJETAS])
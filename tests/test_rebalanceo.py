@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from benchmarks.datos_sinteticos import sembrar
+from benchmarks.fake_supabase import BaseDatosFake, ClienteFake
+from Controladores.Cola_Escritura import ColaEscritura
+from Controladores.Controller_BD import SupabaseController
+from Controladores.Listas import ListasController
+from Controladores.Modelos import Tablero
+from Controladores.Tareas import GestorTareas
+
+
+class _FallaLaSegunda(SupabaseController):
+    def __init__(self, bd):
+        super().__init__(url=None, key=None)
+        self.client = ClienteFake(bd)
+        self.escrituras = 0
+
+    def guardar_filas(self, tabla, filas):
+        self.escrituras += 1
+        if self.escrituras == 2:
+            self._registrar_error("Error simulado", RuntimeError("rechazado"))
+            return False
+        return super().guardar_filas(tabla, filas)
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def _esperar(app, cola, gestor):
+    for _ in range(200):
+        app.processEvents()
+        gestor.esperar(50)
+        QtCore.QThread.msleep(5)
+        app.processEvents()
+        if not cola.pendientes():
+            return
+    raise AssertionError("la cola no termina")
+
+
+def test_rebalanceo_de_mas_de_un_lote_se_deshace_entero(app):
+    bd = BaseDatosFake()
+    board_id = sembrar(bd, 1, 2, 60, eliminadas=0)[0]
+    # Huecos ya agotados: cualquier movimiento obliga a repartir la lista
+    for i, f in enumerate(f for f in bd.tablas["tarjetas"] if f["lista_id"].endswith("l1")):
+        f["posicion"] = 1024.0 + i * 1e-7
+    db = _FallaLaSegunda(bd)
+
+    pool = QtCore.QThreadPool()
+    pool.setMaxThreadCount(1)
+    gestor = GestorTareas(None, pool=pool)
+    cola = ColaEscritura(db, gestor, intervalo_ms=10, max_entradas=50)
+    errores = []
+    lc = ListasController(Tablero(titulo="x", id=board_id), db, cola=cola, al_error=errores.append)
+    lc.obtener_listas()
+    origen, destino = lc.tablero.lists
+
+    assert lc.mover_tarjeta(origen.id, destino.id, origen.cards[0].id, 10)
+    assert len(destino.cards) > cola.max_entradas
+    _esperar(app, cola, gestor)
+
+    # El movimiento (primera escritura) se guardó; el reparto (segunda) falló y se deshizo entero
+    assert db.escrituras == 2 and errores == ["No se pudo reordenar la lista"]
+    servidor = {f["id"]: f["posicion"] for f in bd.tablas["tarjetas"]}
+    assert all(c.posicion == servidor[c.id] for c in destino.cards)
@@ -0,0 +1,113 @@
+import pytest
+
+from benchmarks.datos_sinteticos import sembrar
+from benchmarks.fake_supabase import BaseDatosFake, ClienteFake
+from Controladores.Controller_BD import SupabaseController
+from Controladores.Listas import ListasController
+from Controladores.Modelos import Tablero
+
+
+def _cliente(bd: BaseDatosFake) -> SupabaseController:
+    db = SupabaseController(url=None, key=None)
+    db.client = ClienteFake(bd)
+    return db
+
+
+def _abrir(db: SupabaseController, board_id: str) -> ListasController:
+    lc = ListasController(Tablero(titulo="x", id=board_id), db)
+    lc.obtener_listas()
+    return lc
+
+
+def _firma(tablero: Tablero) -> list:
+    return [
+        (l.id, l.titulo, l.posicion, [(c.id, c.titulo, c.lista_id, c.posicion, sorted(u.id for u in c.assignees)) for c in l.cards])
+        for l in tablero.lists
+    ]
+
+
+@pytest.fixture
+def bd():
+    bd = BaseDatosFake()
+    bd.ids_tableros = sembrar(bd, 1, 3, 8, eliminadas=0)
+    return bd
+
+
+def _sincronizar(db: SupabaseController, lc: ListasController, cursor):
+    cambios = db.obtener_cambios(lc.tablero.id, cursor)
+    assert cambios is not None, db.ultimo_error
+    lc.aplicar_cambios(cambios)
+    return cambios
+
+
+def test_b_recibe_los_cambios_de_a(bd):
+    board_id = bd.ids_tableros[0]
+    db_a, db_b = _cliente(bd), _cliente(bd)
+    a, b = _abrir(db_a, board_id), _abrir(db_b, board_id)
+    cursor = db_b.cursor_cambios(board_id)
+    l0, l1, l2 = (l.id for l in a.tablero.lists)
+    usuario, otro = db_a.obtener_todos_usuarios()[:2]
+
+    # Listas: crear, renombrar, borrar (a la papelera) y restaurar
+    nueva_lista = a.crear_lista("Nueva")
+    assert a.renombrar_lista(nueva_lista.id, "Renombrada")
+    assert a.eliminar_lista(l2)
+    borrada = a.crear_lista("Efímera")
+    assert a.eliminar_lista(borrada.id) and a.restaurar_lista_papelera(borrada.id, borrada)
+
+    # Tarjetas: crear, renombrar, reordenar, mover, borrar y restaurar
+    nueva = a.agregar_tarjeta(nueva_lista.id, "hola")
+    assert a.renombrar_tarjeta(nueva_lista.id, nueva.id, "adiós")
+    primera = a.tablero.lists[0].cards[0].id
+    assert a.reordenar_tarjeta(l0, primera, 4)
+    movida = a.tablero.get_list(l1).cards[2].id
+    assert a.mover_tarjeta(l1, nueva_lista.id, movida, 0)
+    eliminada = a.tablero.get_list(l1).cards[0].id
+    assert a.eliminar_tarjeta(l1, eliminada)
+    restaurada = a.tablero.get_list(l0).cards[1]
+    assert a.eliminar_tarjeta(l0, restaurada.id) and a.restaurar_tarjeta(restaurada.id, restaurada)
+
+    # Asignaciones
+    a.gestionar_asignaciones([(nueva_lista.id, nueva.id), (l0, primera)], usuario.id, True, usuario.username)
+    a.gestionar_asignaciones([(nueva_lista.id, nueva.id)], otro.id, True, otro.username)
+    a.gestionar_asignaciones([(l0, primera)], usuario.id, False, usuario.username)
+    assert db_a.ultimo_error is None
+
+    cambios = _sincronizar(db_b, b, cursor)
+    assert cambios.cursor > cursor
+    assert _firma(b.tablero) == _firma(a.tablero)
+    # Y lo que ven los dos es lo que hay en el servidor
+    assert _firma(_abrir(_cliente(bd), board_id).tablero) == _firma(a.tablero)
+
+
+def test_sin_cambios_el_cursor_no_avanza(bd):
+    board_id = bd.ids_tableros[0]
+    db_a, db_b = _cliente(bd), _cliente(bd)
+    a, b = _abrir(db_a, board_id), _abrir(db_b, board_id)
+    a.renombrar_tarjeta(a.tablero.lists[0].id, a.tablero.lists[0].cards[0].id, "otra vez")
+
+    cursor = db_b.cursor_cambios(board_id)
+    cambios = _sincronizar(db_b, b, cursor)
+    # Con >= vuelve la fila del propio cursor, ya aplicada: nada cambia
+    assert cambios.cursor == cursor
+    assert not b.aplicar_cambios(cambios)
+    cambios = _sincronizar(db_b, b, cambios.cursor)
+    assert cambios.cursor == cursor
+
+
+def test_restaurar_lista_que_ya_estaba_y_falla_no_la_quita(bd):
+    # La sincronización ya trajo la lista restaurada desde otro equipo: el fallo de esta
+    # restauración no es motivo para quitar la columna
+    board_id = bd.ids_tableros[0]
+    db = _cliente(bd)
+    lc = _abrir(db, board_id)
+    lista = lc.tablero.lists[0]
+    db.restaurar_lista = lambda list_id: False
+    assert lc.restaurar_lista_papelera(lista.id, lista)
+    assert lc.tablero.get_list(lista.id) is lista
+
+    # La que sí añadió se quita al deshacer
+    borrada = lc.crear_lista("Efímera")
+    assert lc.eliminar_lista(borrada.id) and lc.tablero.get_list(borrada.id) is None
+    assert lc.restaurar_lista_papelera(borrada.id, borrada)
+    assert lc.tablero.get_list(borrada.id) is None